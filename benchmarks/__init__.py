@@ -0,0 +1,6 @@
+"""
+Benchmarks sub-package.
+
+End-to-end benchmarks for cabrita, using synthetic docker compose
+stacks and fake docker, docker-compose and git executables.
+"""
@@ -0,0 +1,197 @@
+"""
+Benchmark module.
+
+Runs cabrita against synthetic stacks with 10, 100 and 1000 services,
+using the fake docker, docker-compose and git executables from the
+'fakes' folder, and reports for each stack:
+
+* **first frame**: seconds from CabritaCommand start to the first
+  rendered frame, with all boxes updated.
+* **refresh**: mean seconds for a full refresh of all boxes and watchers.
+* **calls**: mean subprocess calls for each full refresh.
+* **peak rss**: peak resident memory of the benchmark process, in MB.
+
+Each stack runs in a separate process, so memory measures don't mix.
+
+Usage::
+
+    $ python -m benchmarks.bench
+    $ python -m benchmarks.bench --sizes 10 100 --latency 0.01 --refreshes 5
+    $ python -m benchmarks.bench --json > before.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List
+
+BASE_PATH = os.path.dirname(os.path.abspath(__file__))
+FAKES_PATH = os.path.join(BASE_PATH, "fakes")
+
+
+def _count_calls(log_path: str) -> int:
+    """Return number of fake executable calls in log."""
+    if not os.path.exists(log_path):
+        return 0
+    with open(log_path) as file:
+        return sum(1 for _ in file)
+
+
+def run_stack(size: int, refreshes: int) -> dict:
+    """Run benchmark for one stack size, inside current process.
+
+    The environment must already be prepared by the 'run' function.
+
+    :param size: number of services in stack
+
+    :param refreshes: number of full refreshes to measure
+
+    :return: dict
+    """
+    from blessed import Terminal
+
+    from benchmarks.stack import generate_stack
+    from cabrita.command import CabritaCommand
+    from cabrita.components.renderer import Renderer
+    from cabrita.run import initialize_folder
+
+    work_path = os.environ["HOME"]
+    log_path = os.environ["BENCH_CALL_LOG"]
+    stack_path = os.path.join(work_path, "stack{}".format(size))
+    config_path = generate_stack(stack_path, size)
+    os.environ["BENCH_CONTAINERS"] = os.path.join(stack_path, "containers.txt")
+    term = Terminal(kind="xterm-256color", stream=io.StringIO(), force_styling=True)
+    renderer = Renderer(term, stream=io.StringIO())
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        initialize_folder(["need_image", "need_update"])
+        command = CabritaCommand(
+            cabrita_path=config_path, compose_path=(), version="bench"
+        )
+        command.read_compose_files()
+        command.prepare_dashboard()
+    dashboard = command.dashboard
+    dashboard.collect_once()
+    renderer.render(dashboard._get_layout(term))
+    first_frame = time.perf_counter() - start
+
+    timings = []  # type: List[float]
+    calls = []  # type: List[int]
+    try:
+        for _ in range(refreshes):
+            calls_before = _count_calls(log_path)
+            start = time.perf_counter()
+            dashboard.collect_once()
+            timings.append(time.perf_counter() - start)
+            calls.append(_count_calls(log_path) - calls_before)
+    finally:
+        dashboard.close_collector()
+
+    return {
+        "services": size,
+        "first_frame": round(first_frame, 3),
+        "refresh": round(sum(timings) / len(timings), 3) if timings else None,
+        "calls": round(sum(calls) / len(calls)) if calls else None,
+        "peak_rss_mb": round(
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1
+        ),
+    }
+
+
+def run(size: int, refreshes: int, latency: float) -> dict:
+    """Run benchmark for one stack size, in a new process.
+
+    The new process uses a temporary HOME folder and finds the
+    fake executables first in PATH.
+
+    :param size: number of services in stack
+
+    :param refreshes: number of full refreshes to measure
+
+    :param latency: seconds each fake executable call waits
+
+    :return: dict
+    """
+    with tempfile.TemporaryDirectory(prefix="cabrita-bench-") as work_path:
+        env = dict(
+            os.environ,
+            HOME=work_path,
+            PATH=os.pathsep.join([FAKES_PATH, os.environ.get("PATH", "")]),
+            BENCH_CALL_LOG=os.path.join(work_path, "calls.log"),
+            BENCH_LATENCY=str(latency),
+            # No engine socket: docker data comes from the fake executable.
+            DOCKER_HOST="unix://{}".format(os.path.join(work_path, "docker.sock")),
+        )
+        ret = subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "benchmarks.bench",
+                "--worker",
+                str(size),
+                "--refreshes",
+                str(refreshes),
+            ],
+            cwd=os.path.dirname(BASE_PATH),
+            env=env,
+            stdout=subprocess.PIPE,
+            check=True,
+        )
+    result = json.loads(ret.stdout.decode("utf-8").splitlines()[-1])
+    result["latency"] = latency
+    return result
+
+
+def print_table(results: List[dict]) -> None:
+    """Print benchmark results as a table."""
+    from tabulate import tabulate
+
+    headers = ["Services", "First frame (s)", "Refresh (s)", "Calls", "Peak RSS (MB)"]
+    lines = [
+        [
+            result["services"],
+            result["first_frame"],
+            result["refresh"],
+            result["calls"],
+            result["peak_rss_mb"],
+        ]
+        for result in results
+    ]
+    print(tabulate(lines, headers))
+
+
+def main() -> None:
+    """Parse arguments and run benchmarks."""
+    parser = argparse.ArgumentParser(description="Cabrita end-to-end benchmarks.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--refreshes", type=int, default=3)
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.005,
+        help="seconds each fake docker/git call waits",
+    )
+    parser.add_argument("--json", action="store_true", help="print results as json")
+    parser.add_argument("--worker", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_stack(args.worker, args.refreshes)))
+        return
+
+    results = [run(size, args.refreshes, args.latency) for size in args.sizes]
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_table(results)
+
+
+if __name__ == "__main__":
+    main()
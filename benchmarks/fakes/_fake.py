@@ -0,0 +1,24 @@
+"""Shared helpers for the fake docker, docker-compose and git executables.
+
+Each call is appended to the file in the BENCH_CALL_LOG environment
+variable and waits BENCH_LATENCY seconds before answering.
+"""
+
+import os
+import sys
+import time
+
+
+def start(tool: str) -> list:
+    """Log the call, apply the configured latency and return the arguments."""
+    args = sys.argv[1:]
+    log_path = os.environ.get("BENCH_CALL_LOG")
+    if log_path:
+        line = "{} {}\n".format(tool, " ".join(args)).encode("utf-8")
+        fd = os.open(log_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+    time.sleep(float(os.environ.get("BENCH_LATENCY", "0")))
+    return args
@@ -0,0 +1,87 @@
+"""
+Stack module.
+
+Generates synthetic docker compose stacks and the matching
+cabrita.yml files for the benchmarks.
+"""
+import os
+from typing import Dict
+
+import yaml
+
+KINDS = ["api", "worker", "db", "cache"]
+BUILD_KINDS = ["api", "worker"]
+
+
+def generate_stack(path: str, size: int) -> str:
+    """Generate docker-compose.yml and cabrita.yml files in path.
+
+    Services are named '<kind><number>'. The 'api' and 'worker' services
+    are built from a local folder and the 'db' and 'cache' services use
+    images. Services with numbers ending in 7 have exited containers.
+    The container names are saved in the 'containers.txt' file, used
+    by the fake 'docker ps' command.
+
+    :param path: stack folder (also the compose project name)
+
+    :param size: number of services in stack
+
+    :return: cabrita.yml full path
+    """
+    os.makedirs(path, exist_ok=True)
+    services = {}  # type: Dict[str, dict]
+    for number in range(size):
+        kind = KINDS[number % len(KINDS)]
+        name = "{}{}".format(kind, number)
+        service = {"ports": ["{}:8000".format(10000 + number)]}  # type: dict
+        if kind in BUILD_KINDS:
+            build_path = os.path.join(path, "src", name)
+            os.makedirs(build_path, exist_ok=True)
+            with open(os.path.join(build_path, "requirements.txt"), "w") as file:
+                file.write("django\n")
+            service["build"] = "./src/{}".format(name)
+        else:
+            service["image"] = "{}:latest".format(kind)
+        services[name] = service
+
+    with open(os.path.join(path, "docker-compose.yml"), "w") as file:
+        yaml.safe_dump({"version": "3", "services": services}, file)
+
+    project = os.path.basename(path).lower()
+    with open(os.path.join(path, "containers.txt"), "w") as file:
+        for name in services:
+            file.write("{}_{}_1\n".format(project, name))
+
+    # Intervals are zero, so each refresh runs every inspection.
+    box_defaults = {
+        "interval": 0,
+        "git_fetch_interval": 0,
+        "timeout": 600,
+        "watch_for_build_using_files": ["requirements.txt"],
+    }
+    config = {
+        "version": 2,
+        "title": "Benchmark {} services".format(size),
+        "compose_files": [os.path.join(path, "docker-compose.yml")],
+        "boxes": {
+            "main": dict(
+                box_defaults,
+                main=True,
+                name="Services",
+                show_revision=True,
+                port_view="column",
+            ),
+            "apis": dict(
+                box_defaults,
+                name="APIs",
+                size="small",
+                includes=["api"],
+                watch_branch="origin/main",
+            ),
+            "workers": dict(box_defaults, name="Workers", includes=["worker"]),
+        },
+    }
+    config_path = os.path.join(path, "cabrita.yml")
+    with open(config_path, "w") as file:
+        yaml.safe_dump(config, file)
+    return config_path
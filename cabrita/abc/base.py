@@ -14,17 +14,26 @@ Base class for the Inspector template object.
 This template will process docker and git status for compose services
 Subclasses are: DockerInspect and GitInspect
 
+StateStore
+^^^^^^^^^^
+
+Thread-safe store for the data inspected from services.
+The inspectors write in this store from collector threads and
+the boxes read from it when rendering.
+
 """
 import os
 import sys
+import threading
 from abc import ABC, abstractmethod
-from datetime import datetime, timedelta
 from typing import Any, Dict, List, Tuple
 
 import yaml
 from buzio import console
 
-from cabrita.abc.utils import get_path, run_command
+from cabrita.abc.runner import runner
+from cabrita.abc.scheduler import Scheduler
+from cabrita.abc.utils import get_path
 
 
 class ConfigTemplate(ABC):
@@ -214,6 +223,56 @@ class ConfigTemplate(ABC):
                 target[key] = source[key]
 
 
+class StateStore:
+    """Lock-protected dictionary shared between threads."""
+
+    def __init__(self) -> None:
+        """Initialize class.
+
+        :param
+            _lock: lock for read and write operations.
+        :param
+            _data: dictionary with stored data.
+        """
+        self._lock = threading.Lock()
+        self._data = {}  # type: Dict[Any, Any]
+
+    def __getitem__(self, key: Any) -> Any:
+        """Return value for key."""
+        with self._lock:
+            return self._data[key]
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        """Set value for key."""
+        with self._lock:
+            self._data[key] = value
+
+    def __contains__(self, key: Any) -> bool:
+        """Check if key exists in store."""
+        with self._lock:
+            return key in self._data
+
+    def __len__(self) -> int:
+        """Return number of keys in store."""
+        with self._lock:
+            return len(self._data)
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        """Return value for key or default if key not found."""
+        with self._lock:
+            return self._data.get(key, default)
+
+    def pop(self, key: Any, default: Any = None) -> Any:
+        """Remove key from store and return his value."""
+        with self._lock:
+            return self._data.pop(key, default)
+
+    def items(self) -> List[Tuple[Any, Any]]:
+        """Return a copy of the stored items."""
+        with self._lock:
+            return list(self._data.items())
+
+
 class InspectTemplate(ABC):
     """Abstract class for compose service inspectors."""
 
@@ -229,16 +288,17 @@ class InspectTemplate(ABC):
         :param
             interval: interval in seconds for new inspection
         :param
-            last_update: last update for the inspector
+            scheduler: scheduler for the inspection of each service.
+            Replaced by the dashboard scheduler when the box is scheduled.
         :param
             default_data: pydashing default widget
 
         """
-        self.run = run_command
+        self.run = runner.run
         self.compose = compose
-        self._status = {}  # type: dict
+        self._status = StateStore()
         self.interval = interval
-        self.last_update = datetime.now() - timedelta(seconds=self.interval)
+        self.scheduler = Scheduler()
         self.default_data = {}  # type: dict
 
     @abstractmethod
@@ -246,23 +306,80 @@ class InspectTemplate(ABC):
         """Run inspect code."""
         pass
 
-    @property
-    def can_update(self) -> bool:
-        """Check if inspector can inspect again."""
-        seconds_elapsed = (datetime.now() - self.last_update).total_seconds()
-        return seconds_elapsed >= self.interval
+    def can_update(self, task: str) -> bool:
+        """Check if inspector task is due in scheduler.
+
+        Tasks not registered yet (never started) are due.
+
+        :param task:
+            task name (usually the docker service name)
+        :return:
+            bool
+        """
+        key = (self, task)
+        return not self.scheduler.is_registered(key) or self.scheduler.is_due(key)
+
+    def _start(self, task: str) -> bool:
+        """Mark inspector task as running, if it is due.
+
+        Each service inspection is a separate task, registered in
+        scheduler on first start. A task already running in another
+        collector thread (ex.: the git inspector shared by the watchers)
+        is not started again.
+
+        :param task:
+            task name (usually the docker service name)
+        :return:
+            bool
+        """
+        key = (self, task)
+        self.scheduler.register(key, self.interval, group="inspectors")
+        return self.scheduler.is_due(key) and self.scheduler.start(key)
+
+    def _done(self, task: str) -> None:
+        """Mark inspector task as done and schedule his next run.
+
+        :param task:
+            task name (usually the docker service name)
+        :return:
+            None
+        """
+        self.scheduler.done((self, task))
+
+    def collect(self, service: str) -> None:
+        """Inspect service, if his interval has elapsed.
+
+        This method is called from the collector threads.
+
+        :param service:
+            docker service name
+        :return:
+            None
+        """
+        if self._start(service):
+            try:
+                self.inspect(service)
+            finally:
+                self._done(service)
+
+    def has_status(self, service: str) -> bool:
+        """Check if service was already inspected.
+
+        :param service:
+            docker service name
+        :return:
+            bool
+        """
+        return service in self._status
 
     def status(self, service):
-        """Return service status.
+        """Return last inspected service status.
 
-        If can update, start fetching new data calling self.inspect method.
+        Does not inspect the service: data is fetched by the collect method.
 
         :param service:
             docker service name
         :return:
             dict or dashing obj. If not fetch data yet send default widget.
         """
-        if self.can_update:
-            self.inspect(service)
-
         return self._status.get(service, self.default_data)
@@ -0,0 +1,390 @@
+"""Engine module.
+
+Small client for the Docker Engine API, used instead of the docker
+command line to avoid the docker binary startup on each call.
+
+The client talks HTTP over the docker unix socket (or the tcp address
+in DOCKER_HOST) using one keep-alive connection. When the engine is
+not available, requests return None and the callers fall back to the
+docker command line. The docker events stream uses a second connection,
+kept open while cabrita is running, and each followed container log
+uses his own connection too.
+"""
+import http.client
+import json
+import os
+import socket
+import struct
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import quote, urlencode, urlparse
+
+DEFAULT_HOST = "unix:///var/run/docker.sock"
+DEFAULT_TIMEOUT = 5.0
+RETRY_INTERVAL = 30.0
+MAX_LINE = 4096
+FRAME_HEADER = struct.Struct(">BxxxL")
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTP connection over a unix socket."""
+
+    def __init__(self, socket_path: str, timeout: float) -> None:
+        """Init class.
+
+        :param socket_path: unix socket path
+
+        :param timeout: timeout in seconds for socket operations.
+        """
+        super(UnixHTTPConnection, self).__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self) -> None:
+        """Connect to the unix socket."""
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.socket_path)
+        except OSError:
+            sock.close()
+            raise
+        self.sock = sock
+
+
+class EventStream:
+    """Docker events stream.
+
+    Iterate over the stream to receive each event as a dict.
+    Iteration ends when the engine closes the connection or
+    the stream is closed.
+    """
+
+    def __init__(
+        self, connection: http.client.HTTPConnection, response: http.client.HTTPResponse
+    ) -> None:
+        """Init class.
+
+        :param connection: connection used only by this stream.
+
+        :param response: events response, after the headers are read.
+        """
+        self.connection = connection
+        self.response = response
+
+    def __iter__(self) -> Iterator[dict]:
+        """Return decoded events, one per line."""
+        while True:
+            try:
+                line = self.response.readline()
+            except (http.client.HTTPException, OSError, ValueError):
+                return
+            if not line:
+                return
+            try:
+                yield json.loads(line.decode("utf-8"))
+            except ValueError:
+                continue
+
+    def close(self) -> None:
+        """Close the stream connection.
+
+        :return: None
+        """
+        if self.connection.sock:
+            try:
+                # Wake up the thread blocked reading the stream.
+                self.connection.sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        self.connection.close()
+
+
+class LogStream(EventStream):
+    """Docker container log stream.
+
+    Iterate over the stream to receive each log line as a string.
+    Lines longer than 4096 characters are truncated, so a container
+    writing without line breaks can not fill the memory.
+    """
+
+    def __init__(
+        self,
+        connection: http.client.HTTPConnection,
+        response: http.client.HTTPResponse,
+        tty: bool,
+    ) -> None:
+        """Init class.
+
+        :param tty: if container uses a TTY. Without TTY, the engine
+            sends stdout and stderr data in frames with an 8 bytes header.
+        """
+        super(LogStream, self).__init__(connection, response)
+        self.tty = tty
+
+    def _chunks(self) -> Iterator[bytes]:
+        """Return log data, without frame headers."""
+        while True:
+            if self.tty:
+                chunk = self.response.readline(MAX_LINE)
+                if not chunk:
+                    return
+                yield chunk
+                continue
+            header = self.response.read(FRAME_HEADER.size)
+            if len(header) < FRAME_HEADER.size:
+                return
+            _, size = FRAME_HEADER.unpack(header)
+            while size > 0:
+                chunk = self.response.read(min(size, MAX_LINE))
+                if not chunk:
+                    return
+                size -= len(chunk)
+                yield chunk
+
+    def __iter__(self) -> Iterator[str]:  # type: ignore
+        """Return decoded log lines."""
+        partial = b""
+        try:
+            for chunk in self._chunks():
+                lines = (partial + chunk).split(b"\n")
+                partial = lines.pop()[:MAX_LINE]
+                for line in lines:
+                    yield line[:MAX_LINE].decode("utf-8", "replace").rstrip("\r")
+        except (http.client.HTTPException, OSError, ValueError):
+            pass
+        if partial:
+            yield partial.decode("utf-8", "replace").rstrip("\r")
+
+
+class EngineClient:
+    """Docker Engine API client."""
+
+    def __init__(
+        self,
+        host: Optional[str] = None,
+        timeout: float = DEFAULT_TIMEOUT,
+        clock=time.monotonic,
+    ) -> None:
+        """Init class.
+
+        :param host: engine address (ex.: unix:///var/run/docker.sock).
+            Default: DOCKER_HOST environment variable or the default socket.
+
+        :param timeout: timeout in seconds for each request.
+
+        :param clock: function which returns current time in seconds.
+        """
+        self.host = host or os.getenv("DOCKER_HOST") or DEFAULT_HOST
+        self.timeout = timeout
+        self.clock = clock
+        self.requests = 0
+        self._connection = None  # type: Optional[http.client.HTTPConnection]
+        self._lock = threading.Lock()
+        self._failed_at = None  # type: Optional[float]
+
+    def _connect(self) -> Optional[http.client.HTTPConnection]:
+        """Return a new connection for engine address.
+
+        :return: HTTPConnection or None if address is not supported.
+        """
+        address = urlparse(self.host)
+        if address.scheme == "unix":
+            return UnixHTTPConnection(address.path, self.timeout)
+        if address.scheme in ["tcp", "http"] and address.hostname:
+            return http.client.HTTPConnection(
+                address.hostname, address.port or 2375, timeout=self.timeout
+            )
+        return None
+
+    def _close(self) -> None:
+        """Close current connection."""
+        if self._connection:
+            self._connection.close()
+        self._connection = None
+
+    def _request(self, url: str) -> Optional[bytes]:
+        """Send GET request using the persistent connection.
+
+        Requests sent over a connection closed by engine are retried
+        once in a new connection.
+
+        :param url: request url
+
+        :return: response body or None if status code is not 200.
+        """
+        for attempt in range(2):
+            if not self._connection:
+                self._connection = self._connect()
+                if not self._connection:
+                    raise OSError("Unsupported docker host: {}".format(self.host))
+            try:
+                self._connection.request("GET", url)
+                response = self._connection.getresponse()
+                body = response.read()
+            except (http.client.HTTPException, OSError):
+                self._close()
+                if attempt:
+                    raise
+                continue
+            if response.will_close:
+                self._close()
+            return body if response.status == 200 else None
+        return None
+
+    def get(self, path: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """Get data from engine API.
+
+        After a connection failure, new requests are skipped for
+        30 seconds, so callers can use the docker command line instead.
+
+        :param path: API path (ex.: "/containers/json")
+
+        :param params: query string parameters
+
+        :return: decoded json data or None if request fails.
+        """
+        url = path
+        if params:
+            url += "?" + urlencode(params)
+        with self._lock:
+            if not self.available:
+                return None
+            self._failed_at = None
+            self.requests += 1
+            try:
+                body = self._request(url)
+            except (http.client.HTTPException, OSError):
+                self._failed_at = self.clock()
+                return None
+        if body is None:
+            return None
+        try:
+            return json.loads(body.decode("utf-8"))
+        except ValueError:
+            return None
+
+    @property
+    def available(self) -> bool:
+        """Return if engine API can be used.
+
+        Engine is not available in the 30 seconds after a connection
+        failure. Callers use this to tell a failed request from a
+        missing object (both return None).
+
+        :return: bool
+        """
+        return (
+            self._failed_at is None or self.clock() - self._failed_at >= RETRY_INTERVAL
+        )
+
+    def containers(self, project: str) -> Optional[list]:
+        """Return all containers from compose project.
+
+        :param project: compose project name
+
+        :return: list or None
+        """
+        filters = {"label": ["com.docker.compose.project={}".format(project)]}
+        return self.get(
+            "/containers/json", {"all": "1", "filters": json.dumps(filters)}
+        )
+
+    def inspect_container(self, name: str) -> Optional[dict]:
+        """Return container inspect data.
+
+        :param name: container id or name
+
+        :return: dict or None
+        """
+        return self.get("/containers/{}/json".format(quote(name, safe="")))
+
+    def inspect_image(self, name: str) -> Optional[dict]:
+        """Return image inspect data.
+
+        :param name: image id or name
+
+        :return: dict or None
+        """
+        return self.get("/images/{}/json".format(quote(name, safe="/:@")))
+
+    def system_df(self) -> Optional[dict]:
+        """Return docker disk usage data.
+
+        :return: dict or None
+        """
+        return self.get("/system/df")
+
+    def _open_stream(
+        self, url: str
+    ) -> Optional[Tuple[http.client.HTTPConnection, http.client.HTTPResponse]]:
+        """Send GET request in a new connection, without timeout.
+
+        Used for endpoints where the engine only writes when
+        something happens (events and followed logs).
+
+        :param url: request url
+
+        :return: tuple (connection, response) or None if request fails.
+        """
+        if not self.available:
+            return None
+        connection = self._connect()
+        try:
+            if not connection:
+                raise OSError("Unsupported docker host: {}".format(self.host))
+            connection.timeout = None
+            connection.request("GET", url)
+            response = connection.getresponse()
+        except (http.client.HTTPException, OSError):
+            if connection:
+                connection.close()
+            self._failed_at = self.clock()
+            return None
+        if response.status != 200:
+            connection.close()
+            return None
+        return connection, response
+
+    def events(self, filters: Dict[str, List[str]]) -> Optional["EventStream"]:
+        """Open the docker events stream.
+
+        The stream uses his own connection, without timeout,
+        because the engine only writes on it when events happen.
+
+        :param filters: events filters (ex.: {"type": ["container"]})
+
+        :return: EventStream or None if engine is not available.
+        """
+        stream = self._open_stream(
+            "/events?" + urlencode({"filters": json.dumps(filters)})
+        )
+        return EventStream(*stream) if stream else None
+
+    def logs(self, name: str, tail: int, tty: bool = False) -> Optional["LogStream"]:
+        """Follow container logs.
+
+        :param name: container id or name
+
+        :param tail: number of old lines to send before following.
+
+        :param tty: if container uses a TTY (Config.Tty in inspect data).
+
+        :return: LogStream or None if engine is not available.
+        """
+        params = {"follow": "1", "stdout": "1", "stderr": "1", "tail": str(tail)}
+        stream = self._open_stream(
+            "/containers/{}/logs?{}".format(quote(name, safe=""), urlencode(params))
+        )
+        return LogStream(stream[0], stream[1], tty) if stream else None
+
+    def close(self) -> None:
+        """Close the persistent connection.
+
+        :return: None
+        """
+        with self._lock:
+            self._close()
+
+
+engine = EngineClient()
@@ -0,0 +1,282 @@
+"""Files module.
+
+Keeps the newest modification time of the files listed in the
+'watch_for_build_using_files' option, for each build context folder.
+
+On Linux the files are followed with inotify (using libc, without
+extra dependencies), so the index is updated as soon as a file is saved
+and the listeners are called. On other systems, or if inotify fails,
+the files are checked again when the index data is older than the
+poll interval.
+"""
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+POLL_INTERVAL = 2.0
+
+# inotify event masks (see inotify(7))
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+WATCH_MASK = (
+    IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+)
+EVENT_HEADER = struct.Struct("iIII")
+
+
+class Inotify:
+    """Minimal inotify binding."""
+
+    def __init__(self) -> None:
+        """Init class.
+
+        :raise OSError: if inotify is not available.
+        """
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify is only available on Linux")
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+    def add_watch(self, path: str) -> Optional[int]:
+        """Watch folder for file changes.
+
+        :param path: folder path
+
+        :return: watch descriptor or None if folder can not be watched.
+        """
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+        return wd if wd >= 0 else None
+
+    def read_events(self) -> List[Tuple[int, int, str]]:
+        """Read available events.
+
+        :return: list of (watch descriptor, mask, file name)
+        """
+        events = []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return events
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset : offset + length].rstrip(b"\0")
+            offset += length
+            events.append((wd, mask, os.fsdecode(name)))
+        return events
+
+    def close(self) -> None:
+        """Close inotify file descriptor."""
+        os.close(self.fd)
+
+
+class FileIndex:
+    """Index for the newest modification time of watched files."""
+
+    def __init__(
+        self,
+        use_inotify: bool = True,
+        poll_interval: float = POLL_INTERVAL,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Init class.
+
+        :param use_inotify: follow files with inotify, if available.
+
+        :param poll_interval: seconds before polled files are checked again.
+
+        :param clock: function which returns current time in seconds.
+        """
+        self.use_inotify = use_inotify
+        self.poll_interval = poll_interval
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._files = {}  # type: Dict[str, List[str]]
+        self._mtimes = {}  # type: Dict[str, Dict[str, float]]
+        self._polled = {}  # type: Dict[str, float]
+        self._folders = {}  # type: Dict[int, str]
+        self._watched = {}  # type: Dict[str, Set[Tuple[str, str]]]
+        self._listeners = []  # type: List[Callable[[str], None]]
+        self._inotify = None  # type: Optional[Inotify]
+        self._thread = None  # type: Optional[threading.Thread]
+        self._closed = threading.Event()
+
+    @staticmethod
+    def _stat(path: str) -> Optional[float]:
+        """Return file modification time, or None if file does not exist."""
+        try:
+            return os.stat(path).st_mtime if os.path.isfile(path) else None
+        except OSError:
+            return None
+
+    def _scan(self, context: str) -> None:
+        """Read modification time for all watched files in build context."""
+        mtimes = {}
+        for file in self._files[context]:
+            mtime = self._stat(os.path.join(context, file))
+            if mtime is not None:
+                mtimes[file] = mtime
+        self._mtimes[context] = mtimes
+
+    def _start_inotify(self) -> bool:
+        """Start inotify thread on first use.
+
+        :return: bool (False if inotify is not available)
+        """
+        if self._inotify is None:
+            if not self.use_inotify:
+                return False
+            try:
+                self._inotify = Inotify()
+            except (OSError, AttributeError, TypeError):
+                self.use_inotify = False
+                return False
+            self._thread = threading.Thread(
+                target=self._read_events, name="file-index", daemon=True
+            )
+            self._thread.start()
+        return True
+
+    def _add_watches(self, context: str) -> bool:
+        """Watch the folders of each file in build context.
+
+        :return: bool (False if any folder can not be watched)
+        """
+        for file in self._files[context]:
+            folder = os.path.dirname(os.path.join(context, file))
+            if folder not in self._watched:
+                wd = self._inotify.add_watch(folder)
+                if wd is None:
+                    return False
+                self._folders[wd] = folder
+                self._watched[folder] = set()
+            self._watched[folder].add((context, file))
+        return True
+
+    def watch(self, context: str, files: List[str]) -> None:
+        """Start watching files inside build context folder.
+
+        Calling again for the same folder and files does nothing.
+
+        :param context: build context folder
+
+        :param files: file paths, relative to build context
+
+        :return: None
+        """
+        with self._lock:
+            if context in self._files:
+                new_files = [file for file in files if file not in self._files[context]]
+                if not new_files:
+                    return
+                self._files[context] += new_files
+            else:
+                self._files[context] = list(files)
+            self._scan(context)
+            if not (self._start_inotify() and self._add_watches(context)):
+                self._polled[context] = self.clock()
+
+    def newest(
+        self, context: str, files: Optional[List[str]] = None
+    ) -> Optional[float]:
+        """Return the newest modification time for files in build context.
+
+        :param context: build context folder
+
+        :param files: only check these files. Default: all watched files.
+
+        :return: timestamp or None if no watched file exists.
+        """
+        with self._lock:
+            if context not in self._files:
+                return None
+            polled_at = self._polled.get(context)
+            if polled_at is not None and self.clock() - polled_at >= self.poll_interval:
+                self._scan(context)
+                self._polled[context] = self.clock()
+            mtimes = [
+                mtime
+                for file, mtime in self._mtimes[context].items()
+                if files is None or file in files
+            ]
+        return max(mtimes) if mtimes else None
+
+    def subscribe(self, listener: Callable[[str], None]) -> None:
+        """Add listener called with the build context of each changed file.
+
+        Listeners are called from the inotify thread.
+
+        :param listener: function called when a watched file changes.
+
+        :return: None
+        """
+        self._listeners.append(listener)
+
+    def _read_events(self) -> None:
+        """Read inotify events until index is closed."""
+        while not self._closed.is_set():
+            try:
+                ready, _, _ = select.select([self._inotify.fd], [], [], 1.0)
+            except (OSError, ValueError):
+                return
+            if ready:
+                self._apply_events(self._inotify.read_events())
+
+    def _apply_events(self, events: List[Tuple[int, int, str]]) -> None:
+        """Update modification times for changed files.
+
+        :param events: list of (watch descriptor, mask, file name)
+
+        :return: None
+        """
+        changed = set()  # type: Set[str]
+        with self._lock:
+            for wd, mask, name in events:
+                if mask & IN_Q_OVERFLOW:
+                    # Events were lost: read all files again.
+                    for context in self._files:
+                        self._scan(context)
+                    changed.update(self._files)
+                    continue
+                folder = self._folders.get(wd)
+                for context, file in self._watched.get(folder, set()):
+                    if os.path.join(context, file) != os.path.join(folder, name):
+                        continue
+                    mtime = self._stat(os.path.join(context, file))
+                    if mtime is None:
+                        self._mtimes[context].pop(file, None)
+                    else:
+                        self._mtimes[context][file] = mtime
+                    changed.add(context)
+        for context in changed:
+            for listener in self._listeners:
+                listener(context)
+
+    def close(self) -> None:
+        """Stop watching files.
+
+        :return: None
+        """
+        self._closed.set()
+        if self._thread is not None:
+            self._thread.join()
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+
+
+file_index = FileIndex()
@@ -0,0 +1,284 @@
+"""Fingerprint module.
+
+Computes a content fingerprint for each docker build context,
+used to check if a service image needs a new build.
+
+The fingerprint is a hash of the path and content of every file sent
+to docker build (files matched by '.dockerignore' are skipped). To avoid
+reading every file on each check, the hash of each file is kept in an
+on-disk cache, indexed by his size and modification time: only new or
+changed files are read again.
+
+Walking the build context is still needed to find changed files, so
+it is done again only when the fingerprint is older than his maximum
+age, or when a change signal (ex.: newest modification time of the
+watched files, from the files module) differs from the last one.
+
+Cabrita does not run the builds, so the fingerprint for each image is
+recorded when the image ID is seen for the first time. When the build
+context fingerprint differs from the recorded one, the image is stale.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Pattern, Tuple
+
+CACHE_VERSION = 1
+MAX_AGE = 30.0
+
+
+def _translate(pattern: str) -> str:
+    """Translate '.dockerignore' pattern to regular expression.
+
+    :param pattern: dockerignore pattern (ex.: **/*.pyc)
+
+    :return: string
+    """
+    regex = ""
+    index = 0
+    while index < len(pattern):
+        char = pattern[index]
+        if pattern.startswith("**/", index):
+            regex += "(?:.*/)?"
+            index += 3
+            continue
+        if pattern.startswith("**", index):
+            regex += ".*"
+            index += 2
+            continue
+        if char == "*":
+            regex += "[^/]*"
+        elif char == "?":
+            regex += "[^/]"
+        elif char == "[":
+            end = pattern.find("]", index + 1)
+            if end == -1:
+                regex += re.escape(char)
+            else:
+                regex += "[{}]".format(
+                    pattern[index + 1 : end].replace("!", "^", 1).replace("\\", "\\\\")
+                )
+                index = end
+        else:
+            regex += re.escape(char)
+        index += 1
+    # A pattern matching a folder also matches everything inside it.
+    return "^{}(?:/.*)?$".format(regex)
+
+
+def read_dockerignore(context: str) -> List[Tuple[bool, Pattern]]:
+    """Read '.dockerignore' rules from build context.
+
+    :param context: build context folder
+
+    :return: list of (exclude, compiled pattern). The last matching
+        rule decides if a path is excluded.
+    """
+    rules = []  # type: List[Tuple[bool, Pattern]]
+    try:
+        with open(os.path.join(context, ".dockerignore")) as file:
+            lines = file.read().splitlines()
+    except OSError:
+        return rules
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        exclude = not line.startswith("!")
+        pattern = os.path.normpath(line.lstrip("!").strip()).lstrip("/")
+        if pattern in ["", "."]:
+            continue
+        rules.append((exclude, re.compile(_translate(pattern))))
+    return rules
+
+
+def is_excluded(path: str, rules: List[Tuple[bool, Pattern]]) -> bool:
+    """Check if path is excluded by dockerignore rules.
+
+    :param path: path relative to build context, using '/'.
+
+    :param rules: rules from read_dockerignore.
+
+    :return: bool
+    """
+    excluded = False
+    for exclude, pattern in rules:
+        if pattern.match(path):
+            excluded = exclude
+    return excluded
+
+
+def walk_context(context: str) -> Iterator[Tuple[str, os.DirEntry]]:
+    """Return files sent to docker build, with their directory entry.
+
+    :param context: build context folder
+
+    :return: iterator of (relative path, entry)
+    """
+    rules = read_dockerignore(context)
+    # Folders can be skipped only if no rule includes paths again.
+    can_prune = all(exclude for exclude, _ in rules)
+    folders = [""]
+    while folders:
+        folder = folders.pop()
+        try:
+            entries = list(os.scandir(os.path.join(context, folder)))
+        except OSError:
+            continue
+        for entry in entries:
+            path = "{}/{}".format(folder, entry.name) if folder else entry.name
+            if entry.is_dir(follow_symlinks=False):
+                if not (can_prune and is_excluded(path, rules)):
+                    folders.append(path)
+            elif not is_excluded(path, rules):
+                yield path, entry
+
+
+class Fingerprints:
+    """Build context fingerprints with on-disk file hash cache."""
+
+    def __init__(
+        self,
+        cache_path: Optional[str] = None,
+        max_age: float = MAX_AGE,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Init class.
+
+        :param cache_path: cache file path. Default: ~/.cabrita/fingerprints.json
+
+        :param max_age: seconds before a context fingerprint is computed again.
+
+        :param clock: function which returns current time in seconds.
+        """
+        self.cache_path = cache_path or os.path.join(
+            str(Path.home()), ".cabrita", "fingerprints.json"
+        )
+        self.max_age = max_age
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._files = {}  # type: Dict[str, Dict[str, list]]
+        self._images = {}  # type: Dict[str, str]
+        self._computed = {}  # type: Dict[str, Tuple[float, Any, str]]
+
+    def _load(self) -> None:
+        """Load cache file, on first use."""
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            with open(self.cache_path) as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return
+        if data.get("version") == CACHE_VERSION:
+            self._files = data.get("files", {})
+            self._images = data.get("images", {})
+
+    def _save(self) -> None:
+        """Save cache file, replacing the old one at once."""
+        data = {"version": CACHE_VERSION, "files": self._files, "images": self._images}
+        temp_path = "{}.{}.tmp".format(self.cache_path, os.getpid())
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            with open(temp_path, "w") as file:
+                json.dump(data, file)
+            os.replace(temp_path, self.cache_path)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _hash_file(entry: os.DirEntry) -> str:
+        """Return hash for file content (or symbolic link target)."""
+        digest = hashlib.blake2b(digest_size=16)
+        if entry.is_symlink():
+            digest.update(os.readlink(entry.path).encode("utf-8", "surrogateescape"))
+            return digest.hexdigest()
+        with open(entry.path, "rb") as file:
+            for block in iter(lambda: file.read(1024 * 1024), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def _compute(self, context: str) -> Tuple[str, bool]:
+        """Compute build context fingerprint.
+
+        :param context: build context folder
+
+        :return: tuple (fingerprint, cache changed)
+        """
+        cached = self._files.get(context, {})
+        files = {}  # type: Dict[str, list]
+        changed = False
+        for path, entry in walk_context(context):
+            try:
+                stat = entry.stat(follow_symlinks=False)
+                data = cached.get(path)
+                if not data or data[0] != stat.st_size or data[1] != stat.st_mtime_ns:
+                    data = [stat.st_size, stat.st_mtime_ns, self._hash_file(entry)]
+                    changed = True
+            except OSError:
+                continue
+            files[path] = data
+        changed = changed or len(files) != len(cached)
+        self._files[context] = files
+
+        digest = hashlib.sha256()
+        for path in sorted(files):
+            digest.update("{}\0{}\n".format(path, files[path][2]).encode("utf-8"))
+        return digest.hexdigest(), changed
+
+    def fingerprint(self, context: str, signal: Any = None) -> str:
+        """Return build context fingerprint.
+
+        :param context: build context folder
+
+        :param signal: cheap change signal for build context. The
+            fingerprint is computed again at once when it changes.
+
+        :return: string
+        """
+        with self._lock:
+            self._load()
+            computed_at, last_signal, value = self._computed.get(
+                context, (None, None, "")
+            )
+            if (
+                computed_at is not None
+                and signal == last_signal
+                and self.clock() - computed_at < self.max_age
+            ):
+                return value
+            value, changed = self._compute(context)
+            self._computed[context] = (self.clock(), signal, value)
+            if changed:
+                self._save()
+            return value
+
+    def is_stale(self, context: str, image_id: str, signal: Any = None) -> bool:
+        """Check if build context changed since image was first seen.
+
+        :param context: build context folder
+
+        :param image_id: docker image ID
+
+        :param signal: cheap change signal for build context.
+
+        :return: bool
+        """
+        value = self.fingerprint(context, signal)
+        key = "{}:{}".format(image_id, context)
+        with self._lock:
+            recorded = self._images.get(key)
+            if recorded is None:
+                self._images[key] = value
+                self._save()
+                return False
+        return recorded != value
+
+
+fingerprints = Fingerprints()
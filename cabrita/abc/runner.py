@@ -0,0 +1,183 @@
+"""Runner module.
+
+Runs the external commands (docker, git, curl) used by inspectors
+and watchers.
+
+Commands are informed as argument lists and executed without a shell.
+Each call has a timeout, the number of commands running at same time
+is limited by a semaphore, and the calls, failures and latency are
+counted for each command kind (ex.: "git status", "docker inspect").
+"""
+import subprocess
+import threading
+import time
+from typing import Dict, List, Optional, Union
+
+DEFAULT_TIMEOUT = 10.0
+DEFAULT_MAX_CONCURRENCY = 8
+
+
+class CommandStats:
+    """Statistics for a command kind."""
+
+    __slots__ = ("calls", "failures", "timeouts", "total_time", "max_time")
+
+    def __init__(self) -> None:
+        """Init class."""
+        self.calls = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+
+    @property
+    def mean_time(self) -> float:
+        """Return mean seconds for each call.
+
+        :return: float
+        """
+        return self.total_time / self.calls if self.calls else 0.0
+
+    def as_dict(self) -> dict:
+        """Return statistics as dict.
+
+        :return: dict
+        """
+        return {
+            "calls": self.calls,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "total_time": self.total_time,
+            "mean_time": self.mean_time,
+            "max_time": self.max_time,
+        }
+
+
+class ProcessRunner:
+    """Process Runner class."""
+
+    def __init__(
+        self,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        timeout: float = DEFAULT_TIMEOUT,
+    ) -> None:
+        """Init class.
+
+        :param max_concurrency: max number of commands running at same time.
+
+        :param timeout: default timeout in seconds for each call.
+        """
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self._semaphore = threading.BoundedSemaphore(max_concurrency)
+        self._lock = threading.Lock()
+        self._stats = {}  # type: Dict[str, CommandStats]
+        self._local = threading.local()
+
+    @staticmethod
+    def get_kind(args: List[str]) -> str:
+        """Return command kind, used to group statistics.
+
+        Example: ["git", "status", "--porcelain"] returns "git status".
+
+        :param args: command argument list
+
+        :return: string
+        """
+        words = [args[0]] if args else []
+        if len(args) > 1 and not args[1].startswith("-"):
+            words.append(args[1])
+        return " ".join(words)
+
+    def run(
+        self,
+        args: List[str],
+        cwd: Optional[str] = None,
+        get_stdout: bool = False,
+        timeout: Optional[float] = None,
+    ) -> Union[bool, str]:
+        """Run command and return his result.
+
+        :param args: command argument list (ex.: ["git", "status"])
+
+        :param cwd: working directory for the command
+
+        :param get_stdout: return the captured stdout instead of a boolean.
+
+        :param timeout: timeout in seconds. Default: runner timeout.
+
+        :return: bool for the exit code, or the stdout string
+            (False if the command fails).
+        """
+        kind = self.get_kind(args)
+        self._local.calls = self.thread_calls() + 1
+        returncode = None
+        stdout = b""
+        timed_out = False
+        with self._semaphore:
+            start = time.monotonic()
+            try:
+                ret = subprocess.run(
+                    args,
+                    cwd=cwd,
+                    stdin=subprocess.DEVNULL,
+                    stdout=subprocess.PIPE if get_stdout else subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                    timeout=timeout or self.timeout,
+                )
+                returncode, stdout = ret.returncode, ret.stdout
+            except subprocess.TimeoutExpired:
+                timed_out = True
+            except OSError:
+                pass
+            elapsed = time.monotonic() - start
+
+        self._add_stats(kind, elapsed, returncode == 0, timed_out)
+        if returncode != 0:
+            return False
+        if not get_stdout:
+            return True
+        return stdout.decode("utf-8")
+
+    def _add_stats(
+        self, kind: str, elapsed: float, success: bool, timed_out: bool
+    ) -> None:
+        """Add call result in command kind statistics."""
+        with self._lock:
+            stats = self._stats.setdefault(kind, CommandStats())
+            stats.calls += 1
+            stats.total_time += elapsed
+            stats.max_time = max(stats.max_time, elapsed)
+            if not success:
+                stats.failures += 1
+            if timed_out:
+                stats.timeouts += 1
+
+    def thread_calls(self) -> int:
+        """Return number of commands run by current thread.
+
+        Used to count the commands run for each box update.
+
+        :return: int
+        """
+        return getattr(self._local, "calls", 0)
+
+    @property
+    def stats(self) -> Dict[str, dict]:
+        """Return a copy of the statistics for each command kind.
+
+        :return: dict
+        """
+        with self._lock:
+            return {kind: stats.as_dict() for kind, stats in self._stats.items()}
+
+    def reset_stats(self) -> None:
+        """Clear all statistics.
+
+        :return: None
+        """
+        with self._lock:
+            self._stats = {}
+
+
+runner = ProcessRunner()
@@ -0,0 +1,221 @@
+"""Scheduler module.
+
+Scheduler for every periodic task in cabrita: box and watcher
+refreshes and inspector runs for each service. The dashboard owns
+one scheduler, shared with his boxes and their inspectors.
+
+Tasks are kept in a min-heap ordered by the next due time,
+measured with a monotonic clock. Each new due time receives a
+small random jitter, so tasks with the same interval do not run
+their commands at the same time.
+"""
+import heapq
+import random
+import threading
+import time
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+
+class Task:
+    """Scheduled task data."""
+
+    __slots__ = ("key", "interval", "group", "due", "running", "entry_id", "pending")
+
+    def __init__(self, key: Hashable, interval: float, group: str, due: float) -> None:
+        """Init class.
+
+        :param key: task unique key
+        :param interval: interval in seconds between runs
+        :param group: task group name
+        :param due: next due time, in clock seconds
+        """
+        self.key = key
+        self.interval = interval
+        self.group = group
+        self.due = due
+        self.running = False
+        self.entry_id = 0
+        self.pending = False
+
+
+class Scheduler:
+    """Scheduler class."""
+
+    def __init__(
+        self,
+        clock: Callable[[], float] = time.monotonic,
+        jitter: float = 0.1,
+        rng: Optional[random.Random] = None,
+    ) -> None:
+        """Init class.
+
+        :param clock: function which returns current time in seconds.
+            Default: time.monotonic. Tests can use a simulated clock.
+        :param jitter: max fraction of the interval to randomly add or
+            subtract from each due time.
+        :param rng: random generator used for the jitter.
+        """
+        self.clock = clock
+        self.jitter = jitter
+        self._rng = rng or random.Random()
+        self._lock = threading.RLock()
+        self._tasks = {}  # type: Dict[Hashable, Task]
+        self._heaps = {}  # type: Dict[str, List[Tuple[float, int, Task]]]
+        self._group_sizes = {}  # type: Dict[str, int]
+        self._counter = 0
+
+    def _jitter(self, interval: float) -> float:
+        """Return random jitter for interval."""
+        if not self.jitter or not interval:
+            return 0.0
+        return self._rng.uniform(-self.jitter, self.jitter) * interval
+
+    def _push(self, task: Task) -> None:
+        """Add task due time in his group heap.
+
+        Old entries for the task are discarded when they reach the heap top.
+        If the heap has too many old entries, it is rebuilt.
+        """
+        heap = self._heaps.setdefault(task.group, [])
+        self._counter += 1
+        task.entry_id = self._counter
+        heapq.heappush(heap, (task.due, self._counter, task))
+        if len(heap) > 2 * self._group_sizes.get(task.group, 0) + 16:
+            self._heaps[task.group] = [
+                entry for entry in heap if self._is_valid_entry(entry)
+            ]
+            heapq.heapify(self._heaps[task.group])
+
+    def _is_valid_entry(self, entry: Tuple[float, int, Task]) -> bool:
+        """Check if heap entry is the current due time for a waiting task."""
+        _, entry_id, task = entry
+        return (
+            self._tasks.get(task.key) is task
+            and not task.running
+            and task.entry_id == entry_id
+        )
+
+    def register(
+        self,
+        key: Hashable,
+        interval: float,
+        delay: float = 0.0,
+        group: str = "default",
+    ) -> None:
+        """Register new task.
+
+        If task is already registered, only his interval is updated.
+
+        :param key: task unique key
+        :param interval: interval in seconds between runs
+        :param delay: seconds to wait before first run
+        :param group: task group name
+
+        :return: None
+        """
+        with self._lock:
+            task = self._tasks.get(key)
+            if task:
+                task.interval = interval
+                return
+            due = self.clock() + delay
+            if delay:
+                due += abs(self._jitter(interval))
+            task = Task(key, interval, group, due)
+            self._tasks[key] = task
+            self._group_sizes[group] = self._group_sizes.get(group, 0) + 1
+            self._push(task)
+
+    def is_registered(self, key: Hashable) -> bool:
+        """Check if task is registered."""
+        with self._lock:
+            return key in self._tasks
+
+    def unregister(self, key: Hashable) -> None:
+        """Remove task from scheduler."""
+        with self._lock:
+            task = self._tasks.pop(key, None)
+            if task:
+                self._group_sizes[task.group] -= 1
+
+    def is_due(self, key: Hashable) -> bool:
+        """Check if task due time has arrived.
+
+        :param key: task unique key
+
+        :return: bool
+        """
+        with self._lock:
+            task = self._tasks.get(key)
+            return task is not None and task.due <= self.clock()
+
+    def start(self, key: Hashable) -> bool:
+        """Mark task as running.
+
+        Running tasks are ignored by seconds_to_next until they are done.
+
+        :param key: task unique key
+
+        :return: bool (False if task is not registered or already running)
+        """
+        with self._lock:
+            task = self._tasks.get(key)
+            if not task or task.running:
+                return False
+            task.running = True
+            return True
+
+    def done(self, key: Hashable) -> None:
+        """Mark task as done and schedule his next run.
+
+        :param key: task unique key
+
+        :return: None
+        """
+        with self._lock:
+            task = self._tasks.get(key)
+            if not task:
+                return
+            task.running = False
+            if task.pending:
+                task.pending = False
+                task.due = self.clock()
+            else:
+                task.due = self.clock() + task.interval + self._jitter(task.interval)
+            self._push(task)
+
+    def trigger(self, key: Hashable) -> bool:
+        """Make task due now.
+
+        If task is running, his next run will be due as soon as
+        the current run is done.
+
+        :param key: task unique key
+
+        :return: bool (False if task is not registered)
+        """
+        with self._lock:
+            task = self._tasks.get(key)
+            if not task:
+                return False
+            if task.running:
+                task.pending = True
+            elif task.due > self.clock():
+                task.due = self.clock()
+                self._push(task)
+            return True
+
+    def seconds_to_next(self, group: str = "default") -> Optional[float]:
+        """Return seconds until next due time for waiting tasks in group.
+
+        :param group: task group name
+
+        :return: float or None if there is no waiting task.
+        """
+        with self._lock:
+            heap = self._heaps.get(group, [])
+            while heap and not self._is_valid_entry(heap[0]):
+                heapq.heappop(heap)
+            if not heap:
+                return None
+            return max(heap[0][0] - self.clock(), 0.0)
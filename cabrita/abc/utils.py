@@ -1,46 +1,11 @@
 """Base utils module."""
 import os
 import re
-import subprocess
 from pathlib import Path
 
 from buzio import formatStr
 
 
-def run_command(task, get_stdout=False):
-    """Run subprocess command.
-
-    The function will attempt to run the task informed and
-    return a boolean for the exit code or the captured std from console.
-
-    :arg: task (string): the command to run
-    :arg: get_stdout (bool, optional): capture stdout
-    :arg: run_stdout (bool, optional): capture and run stdout
-
-    :return: bool or string
-
-    """
-    try:
-        if get_stdout is True:
-            ret = subprocess.check_output(task, shell=True)
-        else:
-            ret = subprocess.call(task, shell=True, stderr=subprocess.STDOUT)
-
-        if ret != 0 and not get_stdout:
-            return False
-    except KeyboardInterrupt:
-        raise KeyboardInterrupt
-    except Exception:
-        return False
-
-    if not get_stdout or ret == 0:
-        return True
-    if isinstance(ret, bytes):
-        return ret.decode("utf-8")
-    else:
-        return ret
-
-
 def get_path(path: str, base_path: str) -> str:
     """Return real path from string.
 
@@ -85,6 +50,11 @@ def format_color(text: str, style: str, theme: str = None) -> str:
     )
 
 
+def strip_ansi(text: str) -> str:
+    """Remove terminal color and style sequences from string."""
+    return re.sub(r"\x1b\[[0-9;]*[A-Za-z]", "", text)
+
+
 def persist_on_disk(operation, service, folder):
     """Persist or remove in disk the service which needs action."""
     base_path = str(Path.home())
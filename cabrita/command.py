@@ -7,16 +7,25 @@ This module has the CabritaCommand class, which is responsible for:
 2. Load and check for valid docker-compose.yml files
 3. Generate and add docker services to boxes
 4. Generate and add watchers to dashboard
+5. Run the dashboard, or print a single snapshot (headless mode)
 """
+import json
 import os
 import sys
 from typing import List, Optional
 
+from cabrita.abc.files import file_index
 from cabrita.components import BoxColor
 from cabrita.components.box import Box
+from cabrita.components.cgroup import CgroupInspect
 from cabrita.components.config import Compose, Config
 from cabrita.components.dashboard import Dashboard
-from cabrita.components.docker import DockerInspect, PortDetail, PortView
+from cabrita.components.docker import (
+    DockerInspect,
+    DockerSnapshot,
+    PortDetail,
+    PortView,
+)
 from cabrita.components.git import GitInspect
 from cabrita.components.watchers import DockerComposeWatch, SystemWatch, UserWatch
 
@@ -40,6 +49,7 @@ class CabritaCommand:
         self.config.manual_compose_paths = list(compose_path)
         self.compose = None  # type: Compose
         self.dashboard = None  # type: Dashboard
+        self.snapshot = None  # type: Optional[DockerSnapshot]
         self._background_color = background_color
 
     @property
@@ -98,6 +108,7 @@ class CabritaCommand:
             git=git,
             config=self.config,
             version=self.version,
+            snapshot=self.snapshot,
         )
         self.dashboard.system_watch = SystemWatch(
             background_color=self.background_color
@@ -127,6 +138,16 @@ class CabritaCommand:
                 port_detail=box_data.get("port_detail", PortDetail.external),
                 files_to_watch=box_data.get("watch_for_build_using_files", []),
                 services_to_check_git=box_data.get("watch_for_build_using_git", []),
+                snapshot=self.snapshot,
+                use_fingerprint=box_data.get(
+                    "watch_for_build_using_fingerprint", False
+                ),
+            )
+            cgroup = CgroupInspect(
+                compose=self.compose,
+                interval=box_data.get("interval", 0),
+                snapshot=self.snapshot,
+                metrics=box_data.get("metrics", []),
             )
             git = GitInspect(
                 target_branch=box_data.get("watch_branch", ""),
@@ -156,6 +177,7 @@ class CabritaCommand:
                 compose=self.compose,
                 docker=docker,
                 git=git,
+                cgroup=cgroup,
                 background_color=self.background_color,
             )
             box.services = services_in_box
@@ -180,12 +202,77 @@ class CabritaCommand:
         :return: None
         """
         self.dashboard = Dashboard(config=self.config)
+        self.snapshot = DockerSnapshot(self.compose)
+        self.dashboard.docker_snapshot = self.snapshot
         self._add_watchers()
         self._add_services_in_boxes()
 
     def execute(self) -> None:
         """Execute dashboard to show data in terminal.
 
+        Docker container changes are received from the docker events
+        stream, and changes in files watched for build from the file
+        index, so their boxes are updated right away.
+
+        :return: None
+        """
+        self.snapshot.follow_events(self.dashboard.on_service_change)
+        file_index.subscribe(self._on_build_change)
+        try:
+            self.dashboard.run()
+        finally:
+            self.snapshot.close()
+
+    def _on_build_change(self, context: str) -> None:
+        """Update services built from the changed build context.
+
+        :param context: build context folder
+
         :return: None
         """
-        self.dashboard.run()
+        for service in self.compose.services:
+            if self.compose.is_image(service):
+                continue
+            if self.compose.get_build_path(service) == context:
+                self.dashboard.on_service_change(service)
+
+    def execute_once(self, as_json: bool = False) -> int:
+        """Collect all data once and print a snapshot, without the dashboard.
+
+        :param as_json: print snapshot as json, instead of plain text.
+
+        :return: exit code (0 if all boxes are healthy, 1 otherwise)
+        """
+        try:
+            self.dashboard.collect_once()
+        finally:
+            self.dashboard.close_collector()
+        snapshot = self.dashboard.snapshot()
+        if as_json:
+            print(json.dumps(snapshot, indent=2, ensure_ascii=False))
+        else:
+            for data in snapshot["boxes"] + list(snapshot["watchers"].values()):
+                print(self._format_snapshot(data))
+        return 0 if snapshot["healthy"] else 1
+
+    @staticmethod
+    def _format_snapshot(data: dict) -> str:
+        """Return box or watcher snapshot as plain text.
+
+        :param data: snapshot data
+
+        :return: string
+        """
+        lines = ["[{}]".format(data["title"])] if data.get("title") else []
+        for service, service_data in data.get("services", {}).items():
+            lines.append(
+                "{}: {}".format(
+                    service,
+                    ", ".join(str(value) for value in service_data.values() if value),
+                )
+            )
+        if data.get("text"):
+            lines.append(data["text"])
+        for item in data.get("items", []):
+            lines.append(CabritaCommand._format_snapshot(item))
+        return "\n".join(lines)
@@ -3,10 +3,13 @@
 This package has the cabrita components for:
 
 | box = the Box class (the building block for the dashboard)
+| collector = the Collector class (update boxes in threads)
 | config = the Config class (the data from cabrita.yml file)
 | dashboard = the Dashboard class (convert boxes to dashing widgets and display it)
 | docker = the DockerInspect class (the runner for inspect docker containers)
 | git = the GitInspect class (the runner for inspect git data)
+| perf = the PerfStats class (performance data for the 'p' key HUD)
+| renderer = the Renderer class (write only the changed screen cells in terminal)
 | watchers = the Watch class (the collection of internal and
 | user watchers for the dashboard
 
@@ -51,3 +54,44 @@ class BoxColor(Enum):
         :return: List
         """
         return sorted(cls.__members__)
+
+
+IN = "↗"
+OUT = "↘"
+BOTH = "⇄"
+
+
+class PortDetail(Enum):
+    """Port Detail for docker ports.
+
+    Ports are determined by the 'ports' and 'expose'
+    parameters inside docker-compose.yml files.
+
+    Options
+    -------
+        * **external**: show external ports only
+        * **internal**: show internal ports only
+        * **both**: show both ports.
+    """
+
+    external = "external"
+    internal = "internal"
+    both = "both"
+
+
+class PortView(Enum):
+    """Port View for docker ports.
+
+    Defines where to show port information on box.
+
+    Options:
+        * **hidden**: Do not show info.
+        * **column**: Show ports info in a separate column
+        * **name**: Show ports info after service name
+        * **status**: Show ports info after service status
+    """
+
+    hidden = "hidden"
+    column = "column"
+    name = "name"
+    status = "status"
@@ -2,8 +2,10 @@
 
 This module has the Box Class, which is the building block for dashboards.
 
-Each box updates his data in a separate thread in Python.
+Each box collects his data in a separate thread in Python.
 """
+import threading
+import time
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 
@@ -12,24 +14,40 @@ from buzio import formatStr
 from dashing import dashing
 from tabulate import tabulate
 
-from cabrita.abc.utils import format_color
+from cabrita.abc.runner import runner
+from cabrita.abc.scheduler import Scheduler
+from cabrita.abc.utils import format_color, strip_ansi
 from cabrita.components import BoxColor
+from cabrita.components.cgroup import CgroupInspect
 from cabrita.components.config import Compose
 from cabrita.components.docker import DockerInspect, PortDetail, PortView
 from cabrita.components.git import GitInspect
+from cabrita.components.perf import PerfStats
 
 
 def update_box(box):
     """Update box data.
 
     This method are called by a thread class to update.
+    First collect the inspected data, then render the box widget.
+    The time spent in each step and the number of commands
+    run are saved in box performance statistics.
 
     :param box: the box to update
 
     :return: dashing object
     """
     try:
+        calls = runner.thread_calls()
+        start = time.monotonic()
+        box.collect()
+        collected = time.monotonic()
         box.run()
+        box.perf.add(
+            collect_time=collected - start,
+            render_time=time.monotonic() - collected,
+            calls=runner.thread_calls() - calls,
+        )
         return box.widget
     except Exception as error:
         sentry_sdk.capture_exception(error)
@@ -51,17 +69,23 @@ class Box:
         compose: Compose = None,
         git: GitInspect = None,
         docker: DockerInspect = None,
+        cgroup: CgroupInspect = None,
     ) -> None:
         """Init class."""
         self._included_service_list = []  # type: list
         self.last_update = datetime.now()
+        self.scheduler = Scheduler()
         self.data = {}  # type: Dict[Any, Any]
         self.compose = compose
         self.git = git
         self.docker = docker
+        self.cgroup = cgroup
         self._background_color = background_color.value
         self._services = []  # type: List[str]
         self.data_inspected_from_service = {}  # type: Dict[Any, Any]
+        self.stale_since = None  # type: Optional[datetime]
+        self.perf = PerfStats()
+        self._cancel_event = threading.Event()
         self._widget = dashing.Text(
             "Fetching data...",
             color=6,
@@ -73,10 +97,36 @@ class Box:
     def can_update(self) -> bool:
         """Check if box data can be updated.
 
+        The box must be registered in scheduler first (see schedule method).
+
         :return: bool
         """
+        return self.scheduler.is_due(self)
+
+    def schedule(self, scheduler: Scheduler) -> None:
+        """Register box update in scheduler.
+
+        The box inspectors will use the same scheduler.
+        First update will be due after his interval,
+        counted from the last update.
+        If box is already registered, only his interval is updated.
+
+        :param scheduler: dashboard scheduler
+
+        :return: None
+        """
+        if self.scheduler is not scheduler:
+            self.scheduler = scheduler
+            for inspector in [self.docker, self.git, self.cgroup]:
+                if inspector is not None:
+                    inspector.scheduler = scheduler
         seconds_elapsed = (datetime.now() - self.last_update).total_seconds()
-        return seconds_elapsed >= self.interval
+        scheduler.register(
+            self,
+            self.interval,
+            delay=max(self.interval - seconds_elapsed, 0.0),
+            group="boxes",
+        )
 
     @property
     def widget(self) -> object:
@@ -112,6 +162,62 @@ class Box:
         """
         return float(self.data.get("interval", 0.50))
 
+    @property
+    def timeout(self) -> float:
+        """Return the update deadline in seconds (the 'timeout' box parameter).
+
+        If the update takes longer, the box keeps showing his previous data,
+        marked as stale, until the update finishes.
+        Default: 30.
+
+        :return: float
+        """
+        return float(self.data.get("timeout", 30))
+
+    @property
+    def cancelled(self) -> bool:
+        """Return if the current update was cancelled.
+
+        :return: bool
+        """
+        return self._cancel_event.is_set()
+
+    def cancel(self) -> None:
+        """Cancel the current update.
+
+        Cancellation is checked between services: the inspection
+        already running (ex.: a hung docker command) is not interrupted,
+        but the remaining services will not be inspected. The box is
+        rendered with the data already collected, and services not
+        inspected yet are shown as "Fetching...".
+
+        :return: None
+        """
+        self._cancel_event.set()
+
+    def reset_cancel(self) -> None:
+        """Clear the cancel flag before a new update.
+
+        :return: None
+        """
+        self._cancel_event.clear()
+
+    def mark_stale(self) -> None:
+        """Mark current widget as stale.
+
+        Add the time of the first missed update in widget title.
+
+        :return: None
+        """
+        if self.stale_since is None:
+            self.stale_since = datetime.now()
+        if not isinstance(self._widget, dashing.Text):
+            return
+        title = self._widget.title or self.title
+        marker = " [stale since {}]".format(self.stale_since.strftime("%H:%M:%S"))
+        if marker not in title:
+            self._widget.title = "{}{}".format(title, marker)
+
     @property
     def show_git(self) -> bool:
         """Return if box will show git information (the 'show_git' box parameter).
@@ -163,6 +269,18 @@ class Box:
         """
         return self.data.get("categories", [])
 
+    @property
+    def metrics(self) -> List[str]:
+        """Return the container metrics shown as columns (the 'metrics' box parameter).
+
+        Options are: "cpu", "mem", "net" (network received and sent)
+        and "io" (block device read and write).
+        Default: no metrics.
+
+        :return: list
+        """
+        return self.data.get("metrics", [])
+
     @property
     def title(self) -> str:
         """Return box title name (the 'name' box parameter).
@@ -249,6 +367,32 @@ class Box:
         """
         self._services.append(service)
 
+    def collect(self) -> None:
+        """Collect docker and git data for the services inside box.
+
+        Each inspector checks his own interval before running commands,
+        and saves the results in his state store, read by the run method.
+
+        :return: None
+        """
+        for service in self.services:
+            if self.cancelled:
+                return
+            self.docker.collect(service)
+            if self.show_git:
+                self.git.collect(service)
+            if self.show_revision:
+                self.git.collect_revision(service)
+            if self.metrics:
+                self.cgroup.collect(service)
+
+        if self.categories:
+            for service in self.compose.services:
+                if self.cancelled:
+                    return
+                if any(category.lower() in service for category in self.categories):
+                    self.docker.collect(service)
+
     def _get_headers(self) -> List[str]:
         """Return the headers for box information.
 
@@ -257,6 +401,7 @@ class Box:
             - Git Revision Info (branch tag and commit hash)
             - Docker Container exposed ports
             - Git Branch Info (branch name and status)
+            - Container metrics (cpu, memory, network and block I/O usage)
             - categories listed in config yml for the box
 
         :return: list
@@ -268,6 +413,7 @@ class Box:
             table_header += ["Port"]
         if self.show_git:
             table_header += ["Branch"]
+        table_header += [metric.upper() for metric in self.metrics]
         if self.categories:
             capitalize_names = [category.title() for category in self.categories]
             table_header += capitalize_names
@@ -306,12 +452,14 @@ class Box:
     def run(self) -> None:
         """Run main code for update box data.
 
-        Updates the box widget property.
+        Updates the box widget property, using data
+        already collected by the inspectors.
 
         :return: None
         """
         # Define Headers
         table_header = self._get_headers()
+        self._included_service_list = []
 
         # Check each service
         table_lines = []
@@ -328,7 +476,11 @@ class Box:
             if can_skip:
                 continue
 
-            self.data_inspected_from_service = self.docker.status(service)
+            # Services not inspected yet (ex.: cancelled update)
+            # are shown with the inspector default data.
+            self.data_inspected_from_service = dict(
+                self.docker.status(service), name=service
+            )
 
             service_name = self._append_ports_in_field("name")
             service_status = self._append_ports_in_field("status")
@@ -336,21 +488,22 @@ class Box:
             if service_status.lower() == "not found" and not self.show_not_found:
                 continue
 
+            style = self.data_inspected_from_service["style"]
+            theme = self.data_inspected_from_service["theme"]
+            if self.data_inspected_from_service.get("flapping"):
+                # Restart loop: status changes too often to be trusted.
+                style, theme = "error", "confirm"
+                service_status += " ↻ {}".format(
+                    self.data_inspected_from_service["changes"]
+                )
+
             table_data = [
-                format_color(
-                    service_name,
-                    self.data_inspected_from_service["style"],
-                    self.data_inspected_from_service["theme"],
-                ),
-                format_color(
-                    service_status,
-                    self.data_inspected_from_service["style"],
-                    self.data_inspected_from_service["theme"],
-                ),
+                format_color(service_name, style, theme),
+                format_color(service_status, style, theme),
             ]
 
             if self.show_revision:
-                table_data.append(self.git.get_git_revision(service))
+                table_data.append(self.git.revision(service))
 
             if self.port_view == PortView.column:
                 port_string = (
@@ -369,6 +522,12 @@ class Box:
             if self.show_git:
                 table_data.append(self.git.status(service))
 
+            if self.metrics:
+                metrics_data = self.cgroup.status(service)
+                table_data += [
+                    metrics_data.get(metric, "--") for metric in self.metrics
+                ]
+
             self._included_service_list.append(service)
 
             for category in self.categories:
@@ -402,6 +561,74 @@ class Box:
             title=self.title,
         )
 
+    @property
+    def healthy(self) -> bool:
+        """Return if box data is fresh and no service is in error state or flapping.
+
+        :return: bool
+        """
+        if self.stale_since is not None:
+            return False
+        return all(
+            self.docker.status(service)["style"] != "error"
+            and not self.docker.status(service).get("flapping")
+            for service in self.services
+        )
+
+    def snapshot(self) -> dict:
+        """Return the last collected box data, without terminal formatting.
+
+        Used by the headless mode ('--once' option).
+
+        :return: dict
+        """
+        services = {}
+        for service in self.services:
+            docker_data = self.docker.status(service)
+            # Services not inspected yet (ex.: box timeout) are unknown.
+            status = "Unknown"
+            if self.docker.has_status(service):
+                status = docker_data["status"]
+            service_data = {
+                "status": status,
+                "style": docker_data["style"],
+                "ports": docker_data["ports"],
+                "flapping": docker_data.get("flapping", False),
+            }
+            if self.show_git:
+                service_data["git"] = strip_ansi(self.git.status(service))
+            if self.show_revision:
+                service_data["revision"] = strip_ansi(self.git.revision(service))
+            if self.metrics:
+                metrics_data = self.cgroup.status(service)
+                service_data["metrics"] = {
+                    metric: metrics_data.get(metric, "--") for metric in self.metrics
+                }
+            services[service] = service_data
+        return {
+            "title": self.title,
+            "healthy": self.healthy,
+            "stale_since": self.stale_since.isoformat() if self.stale_since else None,
+            "services": services,
+        }
+
+    @staticmethod
+    def widget_snapshot(widget: Any) -> dict:
+        """Return widget data, without terminal formatting.
+
+        :param widget: dashing object
+
+        :return: dict
+        """
+        data = {"title": strip_ansi(widget.title or "")}
+        if isinstance(widget, dashing.Text):
+            data["text"] = strip_ansi(widget.text)
+        elif hasattr(widget, "items"):
+            data["items"] = [Box.widget_snapshot(item) for item in widget.items]
+        elif hasattr(widget, "value"):
+            data["value"] = widget.value
+        return data
+
     def _get_service_category_data(self, service: str, category: str) -> Optional[dict]:
         """Find the service name + category.
 
@@ -0,0 +1,415 @@
+"""Cgroup module.
+
+Reads CPU, memory and block I/O usage for each service container straight
+from the kernel control groups (cgroup v1 and v2), and network usage
+from /proc/<pid>/net/dev for the container main process, instead of
+using the 'docker stats' command, which streams data and is very slow
+when there are many containers.
+
+The containers are read from the DockerSnapshot shared with the
+DockerInspect class, so no docker calls are made here.
+"""
+import os
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+from cabrita.abc.base import InspectTemplate
+from cabrita.components.config import Compose
+from cabrita.components.docker import DockerSnapshot
+
+CGROUP_ROOT = "/sys/fs/cgroup"
+PROC_ROOT = "/proc"
+METRICS = ["cpu", "mem", "net", "io"]
+SAMPLES = 5
+
+Sample = Tuple[float, Dict[str, int]]
+
+# Cgroup folders used by docker for each container,
+# with cgroupfs and systemd drivers.
+CGROUP_FOLDERS = ["docker/{}", "system.slice/docker-{}.scope"]
+
+
+def format_bytes(value: float) -> str:
+    """Return size in human readable format.
+
+    Example: 1536 -> "1.5KiB"
+
+    :param value: size in bytes
+
+    :return: string
+    """
+    if value < 1024:
+        return "{}B".format(int(value))
+    for unit in ["KiB", "MiB", "GiB"]:
+        value /= 1024
+        if value < 1024:
+            break
+    return "{:.1f}{}".format(value, unit)
+
+
+def read_net_dev(pid: int, proc_root: str = PROC_ROOT) -> Tuple[int, int]:
+    """Return bytes received and sent in process network namespace.
+
+    The loopback interface is ignored.
+
+    :param pid: process id
+
+    :param proc_root: proc filesystem mount point.
+
+    :raise OSError: if file can not be read.
+
+    :return: tuple (received, sent)
+    """
+    received = sent = 0
+    with open(os.path.join(proc_root, str(pid), "net", "dev")) as file:
+        lines = file.read().splitlines()[2:]
+    for line in lines:
+        interface, _, data = line.partition(":")
+        if interface.strip() == "lo":
+            continue
+        fields = data.split()
+        received += int(fields[0])
+        sent += int(fields[8])
+    return received, sent
+
+
+class Cgroup:
+    """Control group files for one container."""
+
+    def __init__(self, version: int, folders: Dict[str, str]) -> None:
+        """Init class.
+
+        :param version: cgroup version (1 or 2)
+
+        :param folders: cgroup folder for each controller.
+            In cgroup v2 all controllers use the same folder.
+        """
+        self.version = version
+        self.folders = folders
+
+    @classmethod
+    def find(
+        cls,
+        container_id: str,
+        pid: int = 0,
+        root: str = CGROUP_ROOT,
+        proc_root: str = PROC_ROOT,
+    ) -> Optional["Cgroup"]:
+        """Find container cgroup folders.
+
+        Look first in the default docker folders, then in the
+        cgroups of container main process.
+
+        :param container_id: full container id
+
+        :param pid: container main process id, if running.
+
+        :param root: cgroup filesystem mount point.
+
+        :param proc_root: proc filesystem mount point.
+
+        :return: Cgroup or None if not found.
+        """
+        if os.path.exists(os.path.join(root, "cgroup.controllers")):
+            for folder in CGROUP_FOLDERS:
+                path = os.path.join(root, folder.format(container_id))
+                if os.path.isdir(path):
+                    return cls(2, {"cpu": path, "memory": path, "io": path})
+        else:
+            for folder in CGROUP_FOLDERS:
+                paths = {
+                    controller: os.path.join(
+                        root, controller, folder.format(container_id)
+                    )
+                    for controller in ["cpuacct", "memory", "blkio"]
+                }
+                if os.path.isdir(paths["cpuacct"]):
+                    return cls(1, paths)
+        if pid:
+            return cls.from_process(pid, root, proc_root)
+        return None
+
+    @classmethod
+    def from_process(
+        cls, pid: int, root: str = CGROUP_ROOT, proc_root: str = PROC_ROOT
+    ) -> Optional["Cgroup"]:
+        """Find cgroup folders using /proc/<pid>/cgroup file.
+
+        :param pid: process id
+
+        :param root: cgroup filesystem mount point.
+
+        :param proc_root: proc filesystem mount point.
+
+        :return: Cgroup or None if not found.
+        """
+        try:
+            with open(os.path.join(proc_root, str(pid), "cgroup")) as file:
+                lines = file.read().splitlines()
+        except OSError:
+            return None
+        paths = {}  # type: Dict[str, str]
+        for line in lines:
+            _, controllers, path = line.split(":", 2)
+            if not controllers:
+                folder = os.path.join(root, path.lstrip("/"))
+                return cls(2, {"cpu": folder, "memory": folder, "io": folder})
+            for controller in controllers.split(","):
+                if controller in ["cpuacct", "memory", "blkio"]:
+                    paths[controller] = os.path.join(root, controller, path.lstrip("/"))
+        return cls(1, paths) if "cpuacct" in paths else None
+
+    def _read(self, controller: str, file: str) -> str:
+        """Read cgroup file.
+
+        :raise OSError: if file can not be read.
+        """
+        with open(os.path.join(self.folders[controller], file)) as handler:
+            return handler.read()
+
+    def _read_stat(self, controller: str, file: str) -> Dict[str, int]:
+        """Read cgroup 'key value' file (ex.: memory.stat)."""
+        data = {}
+        for line in self._read(controller, file).splitlines():
+            key, _, value = line.partition(" ")
+            if value.strip().isdigit():
+                data[key] = int(value)
+        return data
+
+    def cpu_usage(self) -> int:
+        """Return total CPU time used, in nanoseconds.
+
+        :raise OSError: if file can not be read.
+
+        :return: int
+        """
+        if self.version == 2:
+            return self._read_stat("cpu", "cpu.stat")["usage_usec"] * 1000
+        return int(self._read("cpuacct", "cpuacct.usage"))
+
+    def memory_usage(self) -> int:
+        """Return memory used, in bytes, without the inactive page cache.
+
+        This is the same value shown by 'docker stats'.
+
+        :raise OSError: if file can not be read.
+
+        :return: int
+        """
+        if self.version == 2:
+            usage = int(self._read("memory", "memory.current"))
+            inactive = self._read_stat("memory", "memory.stat").get("inactive_file", 0)
+        else:
+            usage = int(self._read("memory", "memory.usage_in_bytes"))
+            inactive = self._read_stat("memory", "memory.stat").get(
+                "total_inactive_file", 0
+            )
+        return max(usage - inactive, 0)
+
+    def io_usage(self) -> Tuple[int, int]:
+        """Return total bytes read and written in block devices.
+
+        :raise OSError: if file can not be read.
+
+        :return: tuple (read, written)
+        """
+        read = written = 0
+        if self.version == 2:
+            for line in self._read("io", "io.stat").splitlines():
+                for field in line.split()[1:]:
+                    key, _, value = field.partition("=")
+                    if key == "rbytes":
+                        read += int(value)
+                    elif key == "wbytes":
+                        written += int(value)
+        else:
+            data = self._read("blkio", "blkio.throttle.io_service_bytes")
+            for line in data.splitlines():
+                fields = line.split()
+                if len(fields) == 3 and fields[1] == "Read":
+                    read += int(fields[2])
+                elif len(fields) == 3 and fields[1] == "Write":
+                    written += int(fields[2])
+        return read, written
+
+
+class CgroupInspect(InspectTemplate):
+    """CgroupInspect class.
+
+    Each inspection saves one sample of the counters (CPU time and bytes
+    transferred) for each container in a ring buffer. The rates are
+    calculated from the oldest and newest samples.
+
+    Only the files needed for the box metrics are read.
+    """
+
+    def __init__(
+        self,
+        compose: Compose,
+        interval: int,
+        snapshot: DockerSnapshot,
+        metrics: Optional[List[str]] = None,
+        root: str = CGROUP_ROOT,
+        proc_root: str = PROC_ROOT,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Init class.
+
+        :param snapshot: DockerSnapshot shared with DockerInspect.
+
+        :param metrics: metrics to read. Default: all metrics.
+
+        :param root: cgroup filesystem mount point.
+
+        :param proc_root: proc filesystem mount point.
+
+        :param clock: function which returns current time in seconds.
+        """
+        super(CgroupInspect, self).__init__(compose, interval)
+        self.snapshot = snapshot
+        self.metrics = metrics or METRICS
+        self.root = root
+        self.proc_root = proc_root
+        self.clock = clock
+        self._cgroups = {}  # type: Dict[Tuple[str, int], Optional[Cgroup]]
+        self._samples = {}  # type: Dict[str, Dict[str, Deque[Sample]]]
+        self.default_data = {metric: "--" for metric in METRICS}
+
+    @staticmethod
+    def _cgroup_key(inspect_data: dict) -> Tuple[str, int]:
+        """Return cgroup cache key: container id and main process id."""
+        return inspect_data["Id"], inspect_data["State"].get("Pid", 0)
+
+    def _get_cgroup(self, inspect_data: dict) -> Optional[Cgroup]:
+        """Return cached cgroup for container.
+
+        Failed lookups are cached too, until the container restarts.
+        """
+        key = self._cgroup_key(inspect_data)
+        if key not in self._cgroups:
+            self._cgroups[key] = Cgroup.find(key[0], key[1], self.root, self.proc_root)
+        return self._cgroups[key]
+
+    def _prune_cgroups(self) -> None:
+        """Remove cached cgroups for removed or restarted containers."""
+        current = {
+            self._cgroup_key(inspect_data)
+            for container_list in self.snapshot.services.values()
+            for inspect_data in container_list
+        }
+        for key in set(self._cgroups) - current:
+            del self._cgroups[key]
+
+    def _sample(self, cgroup: Cgroup, pid: int) -> Tuple[Dict[str, int], int]:
+        """Read container counters and memory usage.
+
+        :param cgroup: container cgroup
+
+        :param pid: container main process id
+
+        Network and block I/O counters are skipped if his files can not
+        be read (ex.: io controller is not enabled in cgroup).
+
+        :raise OSError: if cpu or memory files can not be read.
+
+        :return: tuple (counters, memory usage)
+        """
+        counters = {}  # type: Dict[str, int]
+        memory = 0
+        if "cpu" in self.metrics:
+            counters["cpu"] = cgroup.cpu_usage()
+        if "mem" in self.metrics:
+            memory = cgroup.memory_usage()
+        try:
+            if "net" in self.metrics and pid:
+                counters["net_rx"], counters["net_tx"] = read_net_dev(
+                    pid, self.proc_root
+                )
+        except (OSError, ValueError, IndexError):
+            pass
+        try:
+            if "io" in self.metrics:
+                counters["io_read"], counters["io_write"] = cgroup.io_usage()
+        except (OSError, ValueError):
+            pass
+        return counters, memory
+
+    def _rates(self, samples: Deque[Sample]) -> Dict[str, float]:
+        """Return rate per second for each counter.
+
+        :param samples: ring buffer with (time, counters) samples.
+
+        :return: dict (empty until there are two samples)
+        """
+        first_time, first = samples[0]
+        last_time, last = samples[-1]
+        elapsed = last_time - first_time
+        if elapsed <= 0:
+            return {}
+        return {
+            key: max(last[key] - first.get(key, last[key]), 0) / elapsed for key in last
+        }
+
+    @staticmethod
+    def _format(data: Dict[str, float]) -> Dict[str, str]:
+        """Format summed values for each metric.
+
+        :param data: summed values. Missing keys have no data yet.
+
+        :return: dict
+        """
+        status = dict.fromkeys(METRICS, "--")
+        if "cpu" in data:
+            # CPU time in nanoseconds per second: 1e9 is 100%.
+            status["cpu"] = "{:.1f}%".format(data["cpu"] / 1e7)
+        if "mem" in data:
+            status["mem"] = format_bytes(data["mem"])
+        if "net_rx" in data:
+            status["net"] = "↓{}/s ↑{}/s".format(
+                format_bytes(data["net_rx"]), format_bytes(data["net_tx"])
+            )
+        if "io_read" in data:
+            status["io"] = "r {}/s w {}/s".format(
+                format_bytes(data["io_read"]), format_bytes(data["io_write"])
+            )
+        return status
+
+    def inspect(self, service: str) -> None:
+        """Read metrics for service containers.
+
+        Values for each replica are summed.
+
+        :param service: service name as defined in docker-compose yml.
+
+        :return: None
+        """
+        self._prune_cgroups()
+        data = {}  # type: Dict[str, float]
+        old_samples = self._samples.get(service, {})
+        new_samples = {}  # type: Dict[str, Deque[Sample]]
+        for inspect_data in self.snapshot.services.get(service, []):
+            if not inspect_data["State"].get("Running"):
+                continue
+            container_id = inspect_data["Id"]
+            cgroup = self._get_cgroup(inspect_data)
+            if not cgroup:
+                continue
+            try:
+                counters, memory = self._sample(
+                    cgroup, inspect_data["State"].get("Pid", 0)
+                )
+            except (OSError, KeyError, ValueError):
+                # Container stopped or was recreated.
+                self._cgroups.pop(self._cgroup_key(inspect_data), None)
+                continue
+            samples = old_samples.get(container_id, deque(maxlen=SAMPLES))
+            samples.append((self.clock(), counters))
+            new_samples[container_id] = samples
+
+            if "mem" in self.metrics:
+                data["mem"] = data.get("mem", 0) + memory
+            for key, rate in self._rates(samples).items():
+                data[key] = data.get(key, 0) + rate
+        self._samples[service] = new_samples
+        self._status[service] = self._format(data)
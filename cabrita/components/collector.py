@@ -0,0 +1,54 @@
+"""
+Collector module.
+
+This module has the Collector class, which is responsible to
+run the box updates in a thread pool inside the main process.
+
+Because the boxes are not copied to another process, the data
+saved by each inspector (and his interval control) are kept
+between dashboard refreshes.
+"""
+from multiprocessing.pool import ApplyResult, ThreadPool
+from typing import Callable, Optional
+
+from cabrita.components.box import Box, update_box
+
+
+class Collector:
+    """Collector class."""
+
+    def __init__(self, workers: int, on_update: Optional[Callable] = None) -> None:
+        """Init class.
+
+        :param workers: number of threads in pool.
+
+        :param on_update: function called when each box update finishes.
+        """
+        self.workers = workers
+        self.on_update = on_update
+        self._pool = ThreadPool(processes=workers)
+
+    def submit(self, box: Box) -> ApplyResult:
+        """Submit box to be updated in a collector thread.
+
+        :param box: box to be updated.
+
+        :return: ApplyResult
+        """
+        return self._pool.apply_async(
+            update_box,
+            [box],
+            callback=self.on_update,
+            error_callback=self.on_update,
+        )
+
+    def close(self) -> None:
+        """Stop collector threads.
+
+        Updates still running (ex.: a slow git fetch) are not
+        waited for. The pool threads are daemon threads, so
+        they don't hold the process exit.
+
+        :return: None
+        """
+        self._pool.terminate()
@@ -6,18 +6,22 @@ This module has:
 
     The **Compose class**, which is responsible for
     handling docker-compose data from yamls.
+
+    The **ServiceFacts class**, with the service data which
+    only changes when the docker-compose files change.
 """
 import logging
 import math
 import os
+import re
 import shutil
-from typing import Any, List, Optional
+from typing import Any, Dict, List, Optional
 
 from buzio import console
 
 from cabrita.abc.base import ConfigTemplate
 from cabrita.abc.utils import get_path
-from cabrita.components import BoxColor
+from cabrita.components import BOTH, IN, OUT, BoxColor, PortDetail
 
 logger = logging.getLogger(__name__)
 
@@ -69,6 +73,28 @@ class Config(ConfigTemplate):
         """
         return self.data["boxes"]
 
+    @property
+    def max_fps(self) -> float:
+        """Return maximum number of dashboard redraws per second.
+
+        Parameter: 'max_fps'.
+        Default: 10.
+
+        :return: float
+        """
+        return float(self.data.get("max_fps", 10))
+
+    @property
+    def log_lines(self) -> int:
+        """Return number of lines kept in the log panel.
+
+        Parameter: 'log_lines'.
+        Default: 500.
+
+        :return: int
+        """
+        return int(self.data.get("log_lines", 500))
+
     @property
     def title(self) -> str:
         """Return dashboard title.
@@ -295,6 +321,22 @@ class Config(ConfigTemplate):
             self.console.error("Layout must be vertical or horizontal")
             ret = False
 
+        if self.data.get("max_fps") is not None and (
+            isinstance(self.data.get("max_fps"), bool)
+            or not isinstance(self.data.get("max_fps"), (int, float))
+            or self.data.get("max_fps") <= 0
+        ):
+            self.console.error("Max FPS must be a positive number")
+            ret = False
+
+        if self.data.get("log_lines") is not None and (
+            isinstance(self.data.get("log_lines"), bool)
+            or not isinstance(self.data.get("log_lines"), int)
+            or self.data.get("log_lines") <= 0
+        ):
+            self.console.error("Log Lines must be a positive integer")
+            ret = False
+
         if (
             self.data.get("background_color")
             and self.data.get("background_color") not in BoxColor.__members__
@@ -370,6 +412,15 @@ class Config(ConfigTemplate):
                     '"external", "internal" or "both".'.format(box_name)
                 )
                 ret = False
+            if data_in_box.get("timeout") is not None and (
+                isinstance(data_in_box.get("timeout"), bool)
+                or not isinstance(data_in_box.get("timeout"), (int, float))
+                or data_in_box.get("timeout") <= 0
+            ):
+                self.console.error(
+                    'Timeout in Box "{}" must be a positive number'.format(box_name)
+                )
+                ret = False
             if data_in_box.get("includes") is not None and not isinstance(
                 data_in_box.get("includes"), list
             ):
@@ -384,6 +435,24 @@ class Config(ConfigTemplate):
                     'Categories in Box "{}" must be a list'.format(box_name)
                 )
                 ret = False
+            metrics = data_in_box.get("metrics")
+            if metrics is not None and (
+                not isinstance(metrics, list)
+                or any(metric not in ["cpu", "mem", "net", "io"] for metric in metrics)
+            ):
+                self.console.error(
+                    'Metrics in Box "{}" must be a list with "cpu", '
+                    '"mem", "net" or "io". Value is: {}'.format(box_name, metrics)
+                )
+                ret = False
+            use_fingerprint = data_in_box.get("watch_for_build_using_fingerprint")
+            if use_fingerprint is not None and not isinstance(use_fingerprint, bool):
+                self.console.error(
+                    'Fingerprint Check in Box "{}" must be true or false'.format(
+                        box_name
+                    )
+                )
+                ret = False
             if self.data.get("watch_for_build_using_files") is not None:
                 if not isinstance(self.data.get("watch_for_build_using_files"), list):
                     self.console.error(
@@ -456,9 +525,113 @@ class Config(ConfigTemplate):
                     self.data["boxes"]["box_{}".format(box_num)]["show_revision"] = True
 
 
+def format_ports(port_list: Optional[list]) -> Dict[PortDetail, str]:
+    """Format service ports for each port detail option.
+
+    Example: ["8080:80"] returns {external: "↘ 8080", internal: "↗ 80",
+    both: "↘ 8080 ↗ 80"}
+
+    :param port_list: ports from 'ports' or 'expose' parameters.
+
+    :return: dict
+    """
+    if not port_list:
+        return {detail: "" for detail in PortDetail}
+
+    internal_ports = []
+    external_ports = []
+    for port in [str(port) for port in port_list]:
+        if ":" in port:
+            external_ports.append(port.split(":")[0])
+            internal_ports.append(port.split(":")[-1])
+        else:
+            internal_ports.append(port)
+
+    external_ports = sorted(set(external_ports))
+    internal_ports = sorted(set(internal_ports))
+
+    if internal_ports == external_ports:
+        both = "{} {}".format(BOTH, " ".join(external_ports))
+        return {detail: both for detail in PortDetail}
+
+    return {
+        PortDetail.external: "{} {}".format(OUT, "/".join(external_ports)),
+        PortDetail.internal: "{} {}".format(IN, "/".join(internal_ports)),
+        PortDetail.both: "{} {} {} {}".format(
+            OUT, "/".join(external_ports), IN, "/".join(internal_ports)
+        ),
+    }
+
+
+class ServiceFacts:
+    """Service data which only changes when docker-compose files change.
+
+    Built once for each service, after the files are loaded, so the
+    inspectors do not search and parse the compose data on each update.
+    """
+
+    def __init__(self, name: str, data: dict, base_path: str) -> None:
+        """Init class.
+
+        :param name: service name as defined in docker-compose yml.
+
+        :param data: service data from docker-compose yml.
+
+        :param base_path: base path for relative build paths.
+        """
+        self.name = name
+        self.container_name = data.get("container_name")  # type: Optional[str]
+        build = data.get("build")
+        self.is_image = not build
+        self.build_path = None  # type: Optional[str]
+        if build:
+            path = build.get("context") if isinstance(build, dict) else build
+            self.build_path = get_path(path, base_path)
+        self.ports = format_ports(data.get("ports") or data.get("expose"))
+
+
 class Compose(ConfigTemplate):
     """Main class for Docker-Compose data."""
 
+    def __init__(self) -> None:
+        """Initialize class.
+
+        :param
+            _facts: ServiceFacts for each service name.
+        """
+        super(Compose, self).__init__()
+        self._facts = None  # type: Optional[Dict[str, ServiceFacts]]
+
+    def load_file_data(self) -> None:
+        """Load data from docker-compose files and build service facts."""
+        super(Compose, self).load_file_data()
+        self._facts = None
+        self._facts = self.facts
+
+    @property
+    def facts(self) -> Dict[str, ServiceFacts]:
+        """Return ServiceFacts for each service.
+
+        Facts are built on first use after files are loaded.
+
+        :return: dict
+        """
+        if self._facts is None:
+            self._facts = {
+                name: ServiceFacts(name, data or {}, self.base_path)
+                for name, data in self.data.get("services", {}).items()
+            }
+        return self._facts
+
+    def get_facts(self, service_name: str) -> Optional[ServiceFacts]:
+        """Return ServiceFacts for informed service.
+
+        :param service_name: docker service name
+
+        :return: ServiceFacts or None if service not found.
+        """
+        return self.facts.get(service_name.lower())
+
     @property
     def services(self) -> dict:
         """Return services configuration in docker-compose yaml files.
@@ -467,6 +640,22 @@ class Compose(ConfigTemplate):
         """
         return self.data["services"]
 
+    @property
+    def project_name(self) -> str:
+        """Return docker compose project name.
+
+        Uses the COMPOSE_PROJECT_NAME environment variable, or the
+        folder name of the first docker-compose file, normalized
+        like docker compose does.
+
+        :return: string
+        """
+        name = os.getenv("COMPOSE_PROJECT_NAME")
+        if not name:
+            path = get_path(*self.list_path[0]) if self.list_path else self.full_path
+            name = os.path.basename(os.path.dirname(path))
+        return re.sub(r"[^-_a-z0-9]", "", name.lower())
+
     @property
     def volumes(self) -> dict:
         """Return volumes configuration in docker-compose yaml files.
@@ -503,9 +692,10 @@ class Compose(ConfigTemplate):
         :return:
             bool
         """
-        return False if self.get_from_service(service_name, "build") else True
+        facts = self.get_facts(service_name)
+        return facts.is_image if facts else True
 
-    def get_build_path(self, service_name: str) -> str:
+    def get_build_path(self, service_name: str) -> Optional[str]:
         """Get build full path for service.
 
         :param service_name:
@@ -514,9 +704,8 @@ class Compose(ConfigTemplate):
         :return:
             str
         """
-        data = self.get_from_service(service_name, "build")
-        path = data.get("context") if isinstance(data, dict) else data
-        return get_path(path, self.base_path)
+        facts = self.get_facts(service_name)
+        return facts.build_path if facts else None
 
     def get_from_service(self, service_name: str, key: str) -> Any:
         """Get value from key for informed service.
@@ -5,12 +5,14 @@ This module contains the Dashboard class,qaws;°³
 which is responsible to build all dashing widgets from boxes
 generate the layout and display it in terminal.
 """
+import os
+import select
 import signal
 import sys
+import time
 from datetime import datetime
-from multiprocessing import TimeoutError
-from multiprocessing.pool import Pool
-from typing import List, Union
+from multiprocessing.pool import ApplyResult
+from typing import Dict, List, Optional, Tuple, Union
 
 import sentry_sdk
 from blessed import Terminal
@@ -19,15 +21,31 @@ from colorama import Style
 from dashing import dashing
 from dashing.dashing import HSplit, VSplit
 
-from cabrita.components.box import Box, update_box
+from cabrita.abc.scheduler import Scheduler
+from cabrita.components.box import Box
+from cabrita.components.collector import Collector
 from cabrita.components.config import Config
+from cabrita.components.details import DetailCache, DetailPanel
+from cabrita.components.docker import DockerSnapshot
+from cabrita.components.logs import LogTail
+from cabrita.components.perf import hud_lines
+from cabrita.components.renderer import Renderer
+from cabrita.components.watchers import DockerComposeWatch
+
+HUD_REFRESH_INTERVAL = 1.0
 
 
 class Dashboard:
     """Dashboard class."""
 
-    def __init__(self, config: Config) -> None:
-        """Init class."""
+    def __init__(self, config: Config, scheduler: Optional[Scheduler] = None) -> None:
+        """Init class.
+
+        :param config: Config instance.
+
+        :param scheduler: scheduler for boxes and inspectors.
+            Default: a new scheduler for this dashboard.
+        """
         self.small_boxes = []  # type: List[dashing.Text]
         self.large_boxes = []  # type: List[dashing.Text]
         self.compose_watch = None  # type: dashing.Text
@@ -36,6 +54,17 @@ class Dashboard:
         self.config = config
         self.layout = self.config.layout
         self.background_color = config.background_color_value
+        self._collector = None  # type: Optional[Collector]
+        self._in_flight = {}  # type: Dict[Box, Tuple[ApplyResult, datetime]]
+        self._needs_redraw = True
+        self.show_hud = False
+        self.scheduler = scheduler or Scheduler()
+        self._wakeup_read = None  # type: Optional[int]
+        self._wakeup_write = None  # type: Optional[int]
+        self.docker_snapshot = None  # type: Optional[DockerSnapshot]
+        self.log_tail = None  # type: Optional[LogTail]
+        self.detail_panel = None  # type: Optional[DetailPanel]
+        self.detail_cache = DetailCache(on_update=self._notify)
 
     @property
     def all_boxes(self) -> list:
@@ -49,6 +78,30 @@ class Dashboard:
             + self.small_boxes
         )
 
+    @property
+    def collector(self) -> Collector:
+        """Return the collector used to update boxes.
+
+        The collector is created once, with one thread for each box and watcher,
+        and reused for every refresh until the dashboard is closed.
+
+        :return: Collector
+        """
+        if self._collector is None:
+            self._collector = Collector(
+                workers=len(self.all_boxes), on_update=self._notify
+            )
+        return self._collector
+
+    def close_collector(self) -> None:
+        """Stop the collector threads, if any.
+
+        :return: None
+        """
+        if self._collector is not None:
+            self._collector.close()
+            self._collector = None
+
     @staticmethod
     def _log_box(box: Box) -> None:
         """Log in terminal the add boxes operation.
@@ -76,22 +129,24 @@ class Dashboard:
 
         This code starts fullscreen mode,
         hides cursor and display the generated layout.
+        To show or hide the performance HUD press 'p'.
+        To show or hide the service logs press 'l', and
+        to show or hide the service details press 'd'
+        (and 'n' or 'b' to show the next or previous service).
         To stop press 'q' or 'ctrl-c'.
 
         :return: None
         """
         term = Terminal()
+        self._open_wakeup_pipe()
+        original_sigwinch_handler = signal.signal(
+            signal.SIGWINCH, lambda *args: self._notify()
+        )
         try:
             with term.fullscreen():
                 with term.hidden_cursor():
                     with term.cbreak():
-                        while True:
-                            key_pressed = term.inkey(timeout=0)
-                            if "q" in key_pressed.lower():
-                                raise KeyboardInterrupt
-                            ui = self._get_layout(term)
-                            ui.display()
-                            self._update_boxes()
+                        self._main_loop(term)
         except KeyboardInterrupt:
             print(term.color(0))
             sys.exit(0)
@@ -99,6 +154,284 @@ class Dashboard:
             print(term.exit_fullscreen)
             print(Style.RESET_ALL)
             raise exc
+        finally:
+            signal.signal(signal.SIGWINCH, original_sigwinch_handler)
+            self.close_logs()
+            self.close_collector()
+            self._close_wakeup_pipe()
+
+    def _main_loop(self, term) -> None:
+        """Run the dashboard event loop.
+
+        The loop sleeps until a key is pressed, the terminal is resized,
+        a box update finishes or the next box update is due.
+        The layout is redrawn only when something changed,
+        limited by the 'max_fps' parameter, and only the changed
+        parts of the screen are written in terminal.
+        While the performance HUD is visible, it is redrawn each second.
+        While the log panel is open, new log lines also redraw the layout.
+
+        :param term: blessed terminal instance
+
+        :return: None
+        """
+        renderer = Renderer(term)
+        frame_interval = 1.0 / self.config.max_fps
+        last_frame = 0.0
+        last_size = None
+        while True:
+            self._update_boxes()
+            size = (term.width, term.height)
+            if size != last_size:
+                self._needs_redraw = True
+            timeout = self._seconds_to_next_update()
+            if self.show_hud:
+                if time.monotonic() - last_frame >= HUD_REFRESH_INTERVAL:
+                    self._needs_redraw = True
+                timeout = min(timeout, HUD_REFRESH_INTERVAL)
+            if self._needs_redraw:
+                elapsed = time.monotonic() - last_frame
+                if elapsed >= frame_interval:
+                    overlay = (
+                        hud_lines(self.all_boxes, renderer.last_render_time)
+                        if self.show_hud
+                        else None
+                    )
+                    renderer.render(self._get_layout(term), overlay=overlay)
+                    last_frame = time.monotonic()
+                    last_size = size
+                    self._needs_redraw = False
+                else:
+                    timeout = min(timeout, frame_interval - elapsed)
+            for key_pressed in self._wait_for_event(term, timeout):
+                if "q" in key_pressed.lower():
+                    raise KeyboardInterrupt
+                if "p" in key_pressed.lower():
+                    self.show_hud = not self.show_hud
+                    self._needs_redraw = True
+                if key_pressed.lower() == "d" or (
+                    key_pressed.lower() in ["n", "b"] and self.detail_panel
+                ):
+                    self._handle_detail_key(key_pressed.lower())
+                    self._needs_redraw = True
+                elif key_pressed.lower() in ["l", "n", "b"]:
+                    self._handle_log_key(key_pressed.lower())
+                    self._needs_redraw = True
+            if self.log_tail is not None and self.log_tail.changed:
+                self._needs_redraw = True
+            if self.detail_panel is not None and self.detail_panel.changed:
+                self._needs_redraw = True
+
+    @property
+    def services(self) -> List[str]:
+        """Return the services shown in boxes, in dashboard order.
+
+        :return: list
+        """
+        services = []  # type: List[str]
+        for box in self.large_boxes + self.small_boxes:
+            services += [s for s in box.services if s not in services]
+        return services
+
+    def open_logs(self, service: str) -> None:
+        """Open the log panel for service.
+
+        The log of the first running container is followed,
+        until the panel is closed.
+
+        :param service: docker service name
+
+        :return: None
+        """
+        self.close_logs()
+        self.detail_panel = None
+        containers = (
+            self.docker_snapshot.services.get(service, [])
+            if self.docker_snapshot
+            else []
+        )
+        running = [c for c in containers if c["State"].get("Running")]
+        container = (running or containers or [None])[0]
+        self.log_tail = LogTail(
+            service, container, lines=self.config.log_lines, on_update=self._notify
+        )
+        self.log_tail.start()
+
+    def close_logs(self) -> None:
+        """Close the log panel, stopping the log stream.
+
+        :return: None
+        """
+        if self.log_tail is not None:
+            self.log_tail.close()
+            self.log_tail = None
+
+    def _handle_log_key(self, key: str) -> None:
+        """Open, close or change the service of the log panel.
+
+        :param key: 'l' (open or close), 'n' (next service)
+            or 'b' (previous service)
+
+        :return: None
+        """
+        services = self.services
+        if not services:
+            return
+        if self.log_tail is None:
+            if key == "l":
+                self.open_logs(services[0])
+            return
+        if key == "l":
+            self.close_logs()
+            return
+        self.open_logs(self._next_service(self.log_tail.service, key))
+
+    def _handle_detail_key(self, key: str) -> None:
+        """Open, close or change the service of the detail panel.
+
+        The container details are fetched only while the panel is open,
+        in a background thread: the panel is drawn again when they arrive.
+
+        :param key: 'd' (open or close), 'n' (next service)
+            or 'b' (previous service)
+
+        :return: None
+        """
+        services = self.services
+        if not services:
+            return
+        if self.detail_panel is None:
+            if key == "d":
+                self.close_logs()
+                self.detail_panel = DetailPanel(
+                    services[0], self.docker_snapshot, self.detail_cache
+                )
+            return
+        if key == "d":
+            self.detail_panel = None
+            return
+        self.detail_panel = DetailPanel(
+            self._next_service(self.detail_panel.service, key),
+            self.docker_snapshot,
+            self.detail_cache,
+        )
+
+    def _next_service(self, service: str, key: str) -> str:
+        """Return next or previous service shown in boxes.
+
+        :param service: current service
+
+        :param key: 'n' (next service) or 'b' (previous service)
+
+        :return: string
+        """
+        services = self.services
+        index = services.index(service) if service in services else 0
+        step = 1 if key == "n" else -1
+        return services[(index + step) % len(services)]
+
+    def _open_wakeup_pipe(self) -> None:
+        """Open the pipe used to wake up the event loop.
+
+        :return: None
+        """
+        self._wakeup_read, self._wakeup_write = os.pipe()
+        os.set_blocking(self._wakeup_read, False)
+        os.set_blocking(self._wakeup_write, False)
+
+    def _close_wakeup_pipe(self) -> None:
+        """Close the event loop wake up pipe.
+
+        :return: None
+        """
+        for fd in (self._wakeup_read, self._wakeup_write):
+            if fd is not None:
+                os.close(fd)
+        self._wakeup_read = self._wakeup_write = None
+
+    def _notify(self, *args) -> None:
+        """Wake up the event loop.
+
+        Called from collector threads when a box update finishes,
+        from the docker events thread and from the SIGWINCH signal handler.
+
+        :return: None
+        """
+        if self._wakeup_write is None:
+            return
+        try:
+            os.write(self._wakeup_write, b".")
+        except (BlockingIOError, OSError):
+            # Pipe is full: the loop will wake up anyway.
+            pass
+
+    def on_service_change(self, service: str) -> None:
+        """Update boxes with the changed service as soon as possible.
+
+        Called from the docker events thread when a container changes.
+        The compose watch is updated only if the stray containers changed.
+
+        :param service: docker service name
+
+        :return: None
+        """
+        for box in self.large_boxes + self.small_boxes:
+            if self.scheduler.trigger((box.docker, service)):
+                self.scheduler.trigger(box)
+        if (
+            isinstance(self.compose_watch, DockerComposeWatch)
+            and self.compose_watch.strays_changed
+        ):
+            self.scheduler.trigger(self.compose_watch)
+        self._notify()
+
+    def _wait_for_event(self, term, timeout: float) -> List[str]:
+        """Wait for keyboard input or a wake up notification.
+
+        :param term: blessed terminal instance
+
+        :param timeout: max seconds to wait
+
+        :return: list of pressed keys
+        """
+        fds = [self._wakeup_read]
+        keyboard_fd = getattr(term, "_keyboard_fd", None)
+        if keyboard_fd is not None:
+            fds.append(keyboard_fd)
+        try:
+            ready, _, _ = select.select(fds, [], [], max(timeout, 0.0))
+        except InterruptedError:
+            ready = []
+
+        if self._wakeup_read in ready:
+            try:
+                while os.read(self._wakeup_read, 4096):
+                    pass
+            except BlockingIOError:
+                pass
+
+        keys = []  # type: List[str]
+        if keyboard_fd in ready:
+            key_pressed = term.inkey(timeout=0)
+            while key_pressed:
+                keys.append(str(key_pressed))
+                key_pressed = term.inkey(timeout=0)
+        return keys
+
+    def _seconds_to_next_update(self) -> float:
+        """Return seconds until the next box update or deadline.
+
+        :return: float
+        """
+        now = datetime.now()
+        waits = [
+            box.timeout - (now - started_at).total_seconds()
+            for box, (result, started_at) in self._in_flight.items()
+        ]
+        next_update = self.scheduler.seconds_to_next("boxes")
+        if next_update is not None:
+            waits.append(next_update)
+        return max(min(waits), 0.0) if waits else 1.0
 
     def add_box(self, box: Box) -> None:
         """Add new box to dashboard.
@@ -111,48 +444,69 @@ class Dashboard:
         box_list.insert(0 if box.main else len(box_list), box)
         self._log_box(box)
 
+    def _schedule_boxes(self) -> None:
+        """Register boxes and watchers in dashboard scheduler.
+
+        Boxes already registered only have their interval updated.
+
+        :return: None
+        """
+        for box in self.all_boxes:
+            box.schedule(self.scheduler)
+
     def _update_boxes(self) -> None:
         """Run code to update box data.
 
-        Each box has his own python thread to update info.
-        Timeout for each box operation is 30 seconds.
+        Each box is updated by a thread from the collector, and his
+        result is applied as soon as it is ready, without waiting for
+        the other boxes.
+
+        If an update takes longer than the box 'timeout' parameter,
+        the box keeps his previous widget, marked as stale, and the
+        update is cancelled. A new update is only submitted after
+        the previous one finishes.
+
+        :return: None
+        """
+        now = datetime.now()
+        for box, (result, started_at) in list(self._in_flight.items()):
+            if result.ready():
+                del self._in_flight[box]
+                self._apply_result(box, result)
+                self._needs_redraw = True
+            elif (now - started_at).total_seconds() > box.timeout:
+                if not box.cancelled:
+                    box.mark_stale()
+                    box.cancel()
+                    self._needs_redraw = True
+
+        self._schedule_boxes()
+        for box in self.all_boxes:
+            if box in self._in_flight or not box.can_update:
+                continue
+            self.scheduler.start(box)
+            box.reset_cancel()
+            self._in_flight[box] = (self.collector.submit(box), now)
+
+    @staticmethod
+    def _apply_result(box: Box, result: ApplyResult) -> None:
+        """Apply finished update in box.
+
+        :param box: updated box
+
+        :param result: result from collector thread
 
         :return: None
         """
-        boxes_needing_update = [
-            self.user_watches,
-            self.compose_watch,
-            self.system_watch,
-        ]
-        boxes_needing_update += [
-            box for box in self.small_boxes + self.large_boxes if box.can_update
-        ]
-        original_sigint_handler = signal.signal(signal.SIGINT, signal.SIG_IGN)
-        pool = Pool()
-        signal.signal(signal.SIGINT, original_sigint_handler)
         try:
-            new_results = [
-                pool.apply_async(update_box, [b]) for b in boxes_needing_update
-            ]
-            new_widgets = [res.get(30) for res in new_results]
-
-            self.user_watches.widget = new_widgets[0]
-            self.compose_watch.widget = new_widgets[1]
-            self.system_watch.widget = new_widgets[2]
-
-            for index, box in enumerate(boxes_needing_update):
-                if index < 3:
-                    continue
-                widget = new_widgets[index]
-                box.widget = widget
-                box.last_update = datetime.now()
-            pool.terminate()
-        except KeyboardInterrupt:
-            pool.terminate()
-            raise
-        except TimeoutError:
-            print(formatStr.error("TIMEOUT WHILE REFRESHING DATA..."), file=sys.stderr)
+            box.widget = result.get(0)
+            if box.cancelled:
+                box.mark_stale()
+            else:
+                box.stale_since = None
+                box.perf.mark_success()
         except Exception as exc:
+            box.mark_stale()
             print(
                 formatStr.error(
                     "ERROR DURING UPDATE. IF PERSISTS PLEASE RESTART. ({})".format(exc)
@@ -160,6 +514,54 @@ class Dashboard:
                 file=sys.stderr,
             )
             sentry_sdk.capture_exception(exc)
+        box.last_update = datetime.now()
+        box.scheduler.done(box)
+
+    def collect_once(self) -> None:
+        """Update all boxes and watchers once, at the same time.
+
+        Used by the headless mode ('--once' option). Waits for each box
+        until his 'timeout' parameter; slower boxes are marked as stale
+        and cancelled. Their services not inspected yet are reported
+        as unknown, and the collector threads still running are not
+        waited for when the collector is closed.
+
+        :return: None
+        """
+        self._schedule_boxes()
+        now = datetime.now()
+        for box in self.all_boxes:
+            # Watchers check if they are due before running.
+            self.scheduler.trigger(box)
+            box.reset_cancel()
+            self._in_flight[box] = (self.collector.submit(box), now)
+
+        for box, (result, started_at) in list(self._in_flight.items()):
+            elapsed = (datetime.now() - started_at).total_seconds()
+            result.wait(max(box.timeout - elapsed, 0.0))
+            del self._in_flight[box]
+            if result.ready():
+                self._apply_result(box, result)
+            else:
+                box.mark_stale()
+                box.cancel()
+
+    def snapshot(self) -> dict:
+        """Return the last collected data from all boxes and watchers.
+
+        :return: dict
+        """
+        boxes = self.large_boxes + self.small_boxes
+        watchers = {
+            "compose": self.compose_watch.snapshot(),
+            "user": self.user_watches.snapshot(),
+            "system": self.system_watch.snapshot(),
+        }
+        return {
+            "healthy": all(box.healthy for box in self.all_boxes),
+            "boxes": [box.snapshot() for box in boxes],
+            "watchers": watchers,
+        }
 
     def _get_layout(self, term) -> Union[HSplit, VSplit]:
         """Make dashboard layout, using the 'layout' parameter from yml.
@@ -174,6 +576,16 @@ class Dashboard:
         )
         small_box_widgets = [b.widget for b in self.small_boxes]
         sm = dashing.HSplit(*small_box_widgets, st) if small_box_widgets else st
+        if self.log_tail is not None:
+            # Log panel is shown in place of the small boxes and watchers.
+            sm = self.log_tail.widget(
+                color=6, border_color=5, background_color=self.background_color
+            )
+        if self.detail_panel is not None:
+            # Detail panel is shown in the same place.
+            sm = self.detail_panel.widget(
+                color=6, border_color=5, background_color=self.background_color
+            )
 
         if self.layout == "horizontal":
             func = HSplit
@@ -0,0 +1,299 @@
+"""Details module.
+
+Shows the full data of one service containers (health check log,
+exit code, restart count, mounts, environment and image digest)
+while the detail panel is open.
+
+The periodic inspection uses only the few fields needed for the
+boxes. The full inspect data is fetched in a background thread only
+when the panel shows a container, and cached until the container
+state changes, so the detail costs nothing unless someone asks for it.
+"""
+import json
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from cabrita.abc.engine import EngineClient, engine
+from cabrita.abc.runner import runner
+from cabrita.components.docker import DockerSnapshot
+from cabrita.components.logs import LogWidget
+
+HEALTH_LOG_LINES = 5
+
+
+def state_key(container: dict) -> Tuple:
+    """Return the container state fields which invalidate the cache.
+
+    A new container id, status, main process or health status
+    means the cached data is old.
+
+    :param container: container inspect data
+
+    :return: tuple
+    """
+    state = container.get("State") or {}
+    return (
+        container["Id"],
+        state.get("Status"),
+        state.get("Pid"),
+        (state.get("Health") or {}).get("Status"),
+    )
+
+
+class DetailCache:
+    """Full inspect data for containers, fetched on demand."""
+
+    def __init__(
+        self,
+        client: EngineClient = engine,
+        run: Callable = runner.run,
+        on_update: Optional[Callable[[], None]] = None,
+    ) -> None:
+        """Init class.
+
+        :param client: Docker Engine API client.
+
+        :param run: function which runs the commands,
+            used if the engine is not available.
+
+        :param on_update: function called when fetched data arrives.
+        """
+        self.client = client
+        self.run = run
+        self.on_update = on_update
+        self.changed = False
+        self._lock = threading.Lock()
+        self._containers = {}  # type: Dict[str, Tuple[Tuple, dict, str]]
+        self._digests = {}  # type: Dict[str, str]
+        self._fetching = set()  # type: Set[Tuple]
+
+    def _inspect(self, get: Callable, command: List[str]) -> Optional[dict]:
+        """Inspect object using the engine, or the command line.
+
+        :param get: engine client method which returns inspect data.
+
+        :param command: inspect command argument list
+
+        :return: dict or None
+        """
+        data = get(command[-1])
+        if data is not None or self.client.available:
+            return data
+        ret = self.run(command, get_stdout=True)
+        try:
+            return json.loads(ret)[0] if ret else None
+        except (ValueError, IndexError):
+            return None
+
+    def _image_digest(self, image_id: str) -> str:
+        """Return image repository digest.
+
+        Images are immutable, so digests are cached by image id.
+
+        :param image_id: image id
+
+        :return: string (image id for local builds, "--" if not found)
+        """
+        if image_id not in self._digests:
+            data = self._inspect(
+                self.client.inspect_image, ["docker", "image", "inspect", image_id]
+            )
+            if data is None:
+                return "--"
+            digests = data.get("RepoDigests") or [image_id]
+            self._digests[image_id] = digests[0]
+        return self._digests[image_id]
+
+    def _fetch(self, container: dict, key: Tuple) -> None:
+        """Fetch full inspect data and image digest for container.
+
+        Runs in a background thread. Failures are cached too
+        (with the snapshot data), until the container state changes.
+
+        :param container: container inspect data from snapshot.
+
+        :param key: container state key
+
+        :return: None
+        """
+        try:
+            data = container
+            if "Env" not in container.get("Config", {}):
+                data = (
+                    self._inspect(
+                        self.client.inspect_container,
+                        ["docker", "inspect", container["Id"]],
+                    )
+                    or container
+                )
+            digest = self._image_digest(data["Image"])
+            with self._lock:
+                self._containers[container["Id"]] = (key, data, digest)
+        finally:
+            # Unexpected errors are not cached: next get will fetch again.
+            with self._lock:
+                self._fetching.discard(key)
+                self.changed = True
+            if self.on_update:
+                self.on_update()
+
+    def get(self, container: dict) -> Optional[Tuple[dict, str]]:
+        """Return full inspect data and image digest for container.
+
+        Data not fetched yet for the current container state is
+        fetched in a background thread, so the render is not blocked.
+
+        :param container: container inspect data from snapshot.
+
+        :return: tuple (data, digest) or None while data is fetched.
+        """
+        key = state_key(container)
+        with self._lock:
+            cached = self._containers.get(container["Id"])
+            if cached and cached[0] == key:
+                return cached[1], cached[2]
+            if key in self._fetching:
+                return None
+            self._fetching.add(key)
+        threading.Thread(
+            target=self._fetch, args=(container, key), name="detail-fetch", daemon=True
+        ).start()
+        return None
+
+    def prune(self, container_ids: Iterable[str]) -> None:
+        """Remove cached data for removed containers.
+
+        :param container_ids: ids of current containers.
+
+        :return: None
+        """
+        container_ids = set(container_ids)
+        with self._lock:
+            for container_id in list(self._containers):
+                if container_id not in container_ids:
+                    del self._containers[container_id]
+
+
+def format_details(data: dict, digest: str) -> List[str]:
+    """Return detail lines for container.
+
+    :param data: full container inspect data
+
+    :param digest: image digest
+
+    :return: list
+    """
+    state = data.get("State") or {}
+    config = data.get("Config") or {}
+    lines = [
+        "{} ({})".format(data.get("Name", "").lstrip("/"), data["Id"][:12]),
+        "  Status: {}  Exit code: {}  Restarts: {}".format(
+            state.get("Status", "--"),
+            state.get("ExitCode", "--"),
+            data.get("RestartCount", "--"),
+        ),
+        "  Image: {} {}".format(config.get("Image", "--"), digest),
+    ]
+    health = state.get("Health")
+    if health:
+        lines.append(
+            "  Health: {} (failing streak {})".format(
+                health.get("Status"), health.get("FailingStreak", 0)
+            )
+        )
+        for check in (health.get("Log") or [])[-HEALTH_LOG_LINES:]:
+            output = (check.get("Output") or "").strip().splitlines()
+            lines.append(
+                "    {} exit {}: {}".format(
+                    check.get("Start", "")[:19],
+                    check.get("ExitCode"),
+                    output[-1] if output else "",
+                )
+            )
+    mounts = data.get("Mounts") or []
+    if mounts:
+        lines.append("  Mounts:")
+        for mount in mounts:
+            lines.append(
+                "    {} -> {} ({})".format(
+                    mount.get("Source") or mount.get("Name", ""),
+                    mount.get("Destination", ""),
+                    "rw" if mount.get("RW") else "ro",
+                )
+            )
+    env = config.get("Env") or []
+    if env:
+        lines.append("  Environment:")
+        lines += ["    {}".format(variable) for variable in env]
+    return lines
+
+
+class DetailPanel:
+    """Detail panel for one service."""
+
+    def __init__(
+        self,
+        service: str,
+        snapshot: Optional[DockerSnapshot],
+        cache: Optional[DetailCache] = None,
+    ) -> None:
+        """Init class.
+
+        :param service: service name as defined in docker-compose yml.
+
+        :param snapshot: DockerSnapshot with the service containers.
+
+        :param cache: cache for full inspect data.
+        """
+        self.service = service
+        self.snapshot = snapshot
+        self.cache = cache or DetailCache()
+
+    @property
+    def changed(self) -> bool:
+        """Return if fetched data arrived since last lines.
+
+        :return: bool
+        """
+        return self.cache.changed
+
+    def lines(self) -> List[str]:
+        """Return detail lines for each service container.
+
+        :return: list
+        """
+        if not self.snapshot:
+            return ["Container not found."]
+        services = dict(self.snapshot.services)
+        self.cache.prune(
+            container["Id"]
+            for containers in services.values()
+            for container in containers
+        )
+        self.cache.changed = False
+        lines = []  # type: List[str]
+        for container in services.get(self.service, []):
+            fetched = self.cache.get(container)
+            if fetched is None:
+                lines += [
+                    "{} ({})".format(
+                        container.get("Name", "").lstrip("/"), container["Id"][:12]
+                    ),
+                    "  Fetching...",
+                ]
+            else:
+                lines += format_details(*fetched)
+            lines.append("")
+        return lines or ["Container not found."]
+
+    def widget(self, **kwargs) -> LogWidget:
+        """Return widget with the service details.
+
+        :param kwargs: dashing widget options (ex.: color)
+
+        :return: LogWidget
+        """
+        title = "Details: {} - 'n'/'b' next/previous service, 'd' close".format(
+            self.service
+        )
+        return LogWidget(self.lines(), tail=False, title=title, **kwargs)
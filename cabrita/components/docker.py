@@ -3,65 +3,533 @@ Docker module.
 
 This module contains the DockerInspect class
 which is responsible to inspect docker data from
-each service in dashboard.
+each service in dashboard, and the DockerSnapshot class,
+which inspects all project containers at once and shares
+the data with every DockerInspect instance.
 """
 import datetime
-import json
-import os
+import threading
 import time
-from collections import Counter
-from enum import Enum
-from typing import List, Optional, Tuple, Union
+from collections import Counter, deque
+from functools import lru_cache
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple, Union
 
 from tzlocal import get_localzone
 
 from cabrita.abc.base import InspectTemplate
-from cabrita.abc.utils import get_path, persist_on_disk
+from cabrita.abc.engine import RETRY_INTERVAL, EngineClient, EventStream, engine
+from cabrita.abc.files import file_index
+from cabrita.abc.fingerprint import fingerprints
+from cabrita.abc.utils import persist_on_disk
+from cabrita.components import PortDetail, PortView
 from cabrita.components.config import Compose
 
-IN = "↗"
-OUT = "↘"
-BOTH = "⇄"
 
+@lru_cache(maxsize=None)
+def local_timezone() -> datetime.tzinfo:
+    """Return local timezone, read once per process.
 
-class PortDetail(Enum):
-    """Port Detail for docker ports.
+    :return: tzinfo
+    """
+    return get_localzone()
+
+
+@lru_cache(maxsize=None)
+def _utc_offset() -> str:
+    """Return current UTC offset string (ex.: -0300), computed once per process."""
+    time_now = datetime.datetime.now()
+    time_now_utc = datetime.datetime.utcnow()
+    time_offset_seconds = (time_now - time_now_utc).total_seconds()
+    utc_offset = time.gmtime(abs(time_offset_seconds))
+    return "{}{}".format(
+        "-" if time_offset_seconds < 0 else "+", time.strftime("%H%M", utc_offset)
+    )
+
+
+# Fields read from inspect data when the docker command line is used:
+# (path in inspect data, Go template, converter). The command prints
+# one line per object, with tab separated values, so only these fields
+# are transferred and parsed instead of the full JSON document.
+InspectField = Tuple[Tuple[str, ...], str, Callable[[str], Any]]
+
+
+def _label_field(label: str) -> InspectField:
+    """Return field for a container label."""
+    return (
+        ("Config", "Labels", label),
+        '{{{{index .Config.Labels "{}"}}}}'.format(label),
+        str,
+    )
+
+
+def _to_bool(value: str) -> bool:
+    """Convert Go template boolean."""
+    return value == "true"
+
+
+CONTAINER_FIELDS = [
+    (("Id",), "{{.Id}}", str),
+    (("Name",), "{{.Name}}", str),
+    (("Image",), "{{.Image}}", str),
+    (("Config", "Image"), "{{.Config.Image}}", str),
+    (("Config", "Tty"), "{{.Config.Tty}}", _to_bool),
+    (("State", "Status"), "{{.State.Status}}", str),
+    (("State", "Running"), "{{.State.Running}}", _to_bool),
+    (("State", "Paused"), "{{.State.Paused}}", _to_bool),
+    (("State", "Pid"), "{{.State.Pid}}", int),
+    (
+        ("State", "Health", "Status"),
+        "{{if .State.Health}}{{.State.Health.Status}}{{end}}",
+        str,
+    ),
+    (
+        ("State", "Health", "FailingStreak"),
+        "{{if .State.Health}}{{.State.Health.FailingStreak}}{{end}}",
+        int,
+    ),
+    _label_field("com.docker.compose.service"),
+    _label_field("com.docker.compose.oneoff"),
+    _label_field("com.docker.compose.container-number"),
+]  # type: List[InspectField]
+
+IMAGE_FIELDS = [
+    (("Id",), "{{.Id}}", str),
+    (("Created",), "{{.Created}}", str),
+]  # type: List[InspectField]
+
+
+def inspect_format(fields: List[InspectField]) -> str:
+    """Return Go template for 'docker inspect --format' option.
+
+    :param fields: inspect fields
+
+    :return: string
+    """
+    return "\t".join(template for _, template, _ in fields)
+
+
+def parse_inspect_output(output: str, fields: List[InspectField]) -> List[dict]:
+    """Parse 'docker inspect --format' output.
+
+    Each line is converted in a dict with the same structure of
+    the docker inspect data. Empty values are ignored, so a
+    container without healthcheck has no 'Health' key.
 
-    Ports are determined by the 'ports' and 'expose'
-    parameters inside docker-compose.yml files.
+    :param output: command output, one line per object.
 
-    Options
-    -------
-        * **external**: show external ports only
-        * **internal**: show internal ports only
-        * **both**: show both ports.
+    :param fields: inspect fields used in command format.
+
+    :return: list
+    """
+    data = []
+    for line in output.splitlines():
+        if not line.strip():
+            continue
+        item = {}  # type: Dict[str, Any]
+        for (path, _, convert), value in zip(fields, line.split("\t")):
+            if not value:
+                continue
+            target = item
+            for key in path[:-1]:
+                target = target.setdefault(key, {})
+            target[path[-1]] = convert(value)
+        data.append(item)
+    return data
+
+
+def parse_image_date(created: str) -> datetime.datetime:
+    """Parse 'Created' date from docker image inspect data.
+
+    :param created: date string (ex.: 2018-05-15T15:53:56.199420064Z)
+
+    :return: datetime
     """
+    date = created[:-4] + " " + _utc_offset()
+    return datetime.datetime.strptime(date, "%Y-%m-%dT%H:%M:%S.%f %z")
 
-    external = "external"
-    internal = "internal"
-    both = "both"
 
+class DockerSnapshot:
+    """DockerSnapshot class.
 
-class PortView(Enum):
-    """Port View for docker ports.
+    Keeps the docker inspect data for all containers in compose project,
+    found by the docker compose labels and grouped by service, and the
+    creation date of the images used by services built from a local
+    folder. Image dates are cached by image ID, because they never
+    change for an ID, and each image is inspected only once.
 
-    Defines where to show port information on box.
+    Each refresh lists the project containers and inspects them using
+    the docker engine API, or batched 'docker inspect' calls if the
+    engine is not available. Boxes refreshing at same time wait for
+    the running refresh and share his data.
 
-    Options:
-        * **hidden**: Do not show info.
-        * **column**: Show ports info in a separate column
-        * **name**: Show ports info after service name
-        * **status**: Show ports info after service status
+    While following the docker events stream, each container is updated
+    as soon as his status changes, and the full refresh only runs when
+    the stream (re)connects or after the resync interval.
+
+    Project containers which are not from a service in docker-compose
+    files (one-off containers and containers from renamed or removed
+    services) are kept apart, as stray containers.
     """
 
-    hidden = "hidden"
-    column = "column"
-    name = "name"
-    status = "status"
+    # Max number of names in each 'docker inspect' call.
+    batch_size = 200
+    # Container events which change his status.
+    events = ["start", "die", "health_status", "restart", "destroy"]
+    # Max age for data while following docker events.
+    resync_interval = 300.0
+
+    def __init__(
+        self,
+        compose: Compose,
+        max_age: float = 1.0,
+        clock: Callable = time.monotonic,
+        client: Optional[EngineClient] = None,
+    ) -> None:
+        """Init class.
+
+        :param compose: Compose instance.
+
+        :param max_age: seconds before data needs a new refresh.
+
+        :param clock: function which returns current time in seconds.
+
+        :param client: docker engine API client. Default: shared client.
+        """
+        self.compose = compose
+        self.engine = client or engine
+        self.max_age = max_age
+        self.clock = clock
+        self.containers = {}  # type: Dict[str, dict]
+        self.services = {}  # type: Dict[str, List[dict]]
+        self.strays = []  # type: List[dict]
+        self.image_dates = {}  # type: Dict[str, datetime.datetime]
+        self.is_valid = False
+        self._updated_at = None  # type: Optional[float]
+        self._lock = threading.Lock()
+        self.following = False
+        self._listeners = []  # type: List[Callable[[str], None]]
+        self._stream = None  # type: Optional[EventStream]
+        self._thread = None  # type: Optional[threading.Thread]
+        self._closed = threading.Event()
+
+    @staticmethod
+    def _labels(data: dict) -> Dict[str, str]:
+        """Return container labels from inspect data."""
+        return data["Config"].get("Labels") or {}
+
+    def _group_services(self) -> None:
+        """Group containers by service, ordered by container number.
+
+        One-off containers (created by 'docker-compose run') and
+        containers whose service is not in docker-compose files
+        are saved as stray containers, ordered by name.
+
+        :return: None
+        """
+        services = {}  # type: Dict[str, List[dict]]
+        strays = []  # type: List[dict]
+        for data in self.containers.values():
+            labels = self._labels(data)
+            service = labels.get("com.docker.compose.service", "")
+            if (
+                labels.get("com.docker.compose.oneoff") == "True"
+                or service not in self.compose.services
+            ):
+                strays.append(data)
+                continue
+            services.setdefault(service, []).append(data)
+        for containers in services.values():
+            containers.sort(
+                key=lambda data: int(
+                    self._labels(data).get("com.docker.compose.container-number", 0)
+                )
+            )
+        self.services = services
+        self.strays = sorted(strays, key=lambda data: data["Name"])
+
+    def _missing_images(self, containers: List[dict]) -> List[str]:
+        """Return image IDs without cached creation date.
+
+        Only images used by services with build are returned.
+
+        :param containers: containers inspect data
+
+        :return: list
+        """
+        return sorted(
+            set(
+                data["Image"]
+                for data in containers
+                if data["Image"] not in self.image_dates
+                and not self.compose.is_image(
+                    self._labels(data).get("com.docker.compose.service", "")
+                )
+            )
+        )
+
+    def _inspect(
+        self,
+        run: Callable,
+        command: List[str],
+        fields: List[InspectField],
+        names: List[str],
+    ) -> list:
+        """Inspect objects using batched calls.
+
+        Only the informed fields are requested to docker.
+
+        :param run: function which runs the commands.
+
+        :param command: inspect command argument list
+
+        :param fields: inspect fields to read.
+
+        :param names: object names to inspect
+
+        :return: list of inspect data, or None if any call fails.
+        """
+        data = []  # type: List[dict]
+        command = command + ["--format", inspect_format(fields)]
+        for start in range(0, len(names), self.batch_size):
+            ret = run(command + names[start : start + self.batch_size], get_stdout=True)
+            if not ret:
+                return None
+            data += parse_inspect_output(ret, fields)
+        return data
+
+    def _load_from_engine(self) -> Optional[Tuple[List[dict], List[dict]]]:
+        """Load containers and new images data from docker engine API.
+
+        :return: tuple (containers, images) or None if engine fails.
+        """
+        listed = self.engine.containers(self.compose.project_name)
+        if listed is None:
+            return None
+        containers = []
+        for item in listed:
+            data = self.engine.inspect_container(item["Id"])
+            if data is None:
+                return None
+            containers.append(data)
+        images = []
+        for image_id in self._missing_images(containers):
+            data = self.engine.inspect_image(image_id)
+            if data is None and not self.engine.available:
+                return None
+            if data:
+                images.append(data)
+        return containers, images
+
+    def _load_from_cli(self, run: Callable) -> Optional[Tuple[List[dict], List[dict]]]:
+        """Load containers and new images data using docker command line.
+
+        :param run: function which runs the commands.
+
+        :return: tuple (containers, images) or None if any command fails.
+        """
+        names = run(
+            [
+                "docker",
+                "ps",
+                "-a",
+                "--filter",
+                "label=com.docker.compose.project={}".format(self.compose.project_name),
+                "--format",
+                "{{.Names}}",
+            ],
+            get_stdout=True,
+        )
+        if names is False:
+            return None
+        names = names.split()
+        containers = self._inspect(run, ["docker", "inspect"], CONTAINER_FIELDS, names)
+        if containers is None:
+            return None
+        images = self._inspect(
+            run,
+            ["docker", "image", "inspect"],
+            IMAGE_FIELDS,
+            self._missing_images(containers),
+        )
+        if images is None:
+            return None
+        return containers, images
+
+    def _set_data(self, containers: List[dict], images: List[dict]) -> None:
+        """Save loaded data.
+
+        Image dates are kept only for images used by current containers,
+        so the date for an old image is removed when his container
+        is recreated with a new image.
+
+        :param containers: containers inspect data
+
+        :param images: inspect data for images without cached date
+
+        :return: None
+        """
+        self.containers = {data["Name"].lstrip("/"): data for data in containers}
+        self._group_services()
+        for data in images:
+            self.image_dates[data["Id"]] = parse_image_date(data["Created"])
+        used = set(data["Image"] for data in containers)
+        self.image_dates = {
+            image_id: date
+            for image_id, date in self.image_dates.items()
+            if image_id in used
+        }
+
+    def refresh(self, run: Callable) -> bool:
+        """Refresh the snapshot data, if it is older than his max age.
+
+        Data is loaded from docker engine API, or from docker command
+        line if the engine is not available.
+
+        :param run: function which runs the commands.
+
+        :return: bool (False if data could not be fetched)
+        """
+        with self._lock:
+            now = self.clock()
+            max_age = self.resync_interval if self.following else self.max_age
+            if self._updated_at is not None and now - self._updated_at < max_age:
+                return self.is_valid
+            self._updated_at = now
+
+            loaded = self._load_from_engine() if self.engine.available else None
+            if loaded is None:
+                loaded = self._load_from_cli(run)
+            self.is_valid = loaded is not None
+            if self.is_valid:
+                self._set_data(*loaded)
+            return self.is_valid
+
+    def follow_events(self, listener: Callable[[str], None]) -> None:
+        """Follow docker events for compose project containers.
+
+        Events are read in a background thread. The listener is called
+        from this thread with the service name of each changed container.
+
+        :param listener: function called when a container changes.
+
+        :return: None
+        """
+        self._listeners.append(listener)
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._follow_events, name="docker-events", daemon=True
+            )
+            self._thread.start()
+
+    def _follow_events(self) -> None:
+        """Read docker events until snapshot is closed.
+
+        Each time the stream connects, the full data is loaded again,
+        because events can be lost while disconnected. If the data
+        can not be loaded, or the stream ends right after connecting,
+        the next connection waits, so the daemon is not flooded
+        with full reloads.
+
+        :return: None
+        """
+        filters = {
+            "type": ["container"],
+            "label": [
+                "com.docker.compose.project={}".format(self.compose.project_name)
+            ],
+            "event": self.events,
+        }
+        while not self._closed.is_set():
+            self._stream = self.engine.events(filters)
+            if self._stream is None:
+                self._closed.wait(RETRY_INTERVAL)
+                continue
+            opened_at = self.clock()
+            resynced = self._resync()
+            if resynced:
+                self.following = True
+                for service in self.compose.services:
+                    self._notify(service)
+                for event in self._stream:
+                    self._apply_event(event)
+            self.following = False
+            self._stream.close()
+            self._stream = None
+            if not resynced or self.clock() - opened_at < RETRY_INTERVAL:
+                self._closed.wait(RETRY_INTERVAL)
+
+    def _resync(self) -> bool:
+        """Load all data from docker engine API.
+
+        :return: bool
+        """
+        with self._lock:
+            loaded = self._load_from_engine()
+            if loaded is None:
+                return False
+            self._set_data(*loaded)
+            self._updated_at = self.clock()
+            self.is_valid = True
+            return True
+
+    def _apply_event(self, event: dict) -> None:
+        """Update container data from docker event.
+
+        :param event: docker event data
+
+        :return: None
+        """
+        actor = event.get("Actor") or {}
+        attributes = actor.get("Attributes") or {}
+        name = attributes.get("name")
+        if not name:
+            return
+        data = None
+        if event.get("Action", "").split(":")[0] != "destroy":
+            data = self.engine.inspect_container(actor.get("ID") or name)
+            if data is None and not self.engine.available:
+                return
+        with self._lock:
+            if data:
+                self.containers[name] = data
+            else:
+                self.containers.pop(name, None)
+            self._group_services()
+        self._notify(attributes.get("com.docker.compose.service", ""))
+
+    def _notify(self, service: str) -> None:
+        """Call listeners for changed service."""
+        for listener in self._listeners:
+            listener(service)
+
+    def close(self) -> None:
+        """Stop following docker events.
+
+        :return: None
+        """
+        self._closed.set()
+        stream = self._stream
+        if stream:
+            stream.close()
 
 
 class DockerInspect(InspectTemplate):
-    """DockerInspect class."""
+    """DockerInspect class.
+
+    Each change in the service status, or in his containers main
+    process (a restart between two inspections), is saved in a ring
+    buffer. Services with more than 'flap_limit' changes inside
+    the 'flap_window' seconds are flagged as flapping, because a
+    container in a crash loop can show any status, depending on
+    when it is inspected.
+    """
+
+    # Max number of status changes saved for each service.
+    history_size = 20
+    # Max number of status changes inside the window.
+    flap_limit = 3
+    # Window, in seconds, used to count status changes.
+    flap_window = 300.0
 
     def __init__(
         self,
@@ -71,46 +539,68 @@ class DockerInspect(InspectTemplate):
         port_detail: PortDetail,
         files_to_watch: List[str],
         services_to_check_git: List[str],
+        snapshot: Optional[DockerSnapshot] = None,
+        use_fingerprint: bool = False,
+        clock: Callable[[], float] = time.monotonic,
     ) -> None:
-        """Init class."""
+        """Init class.
+
+        :param snapshot: DockerSnapshot shared between inspectors.
+            If not informed, the inspector will use his own snapshot.
+
+        :param use_fingerprint: check build context content instead of
+            file modification dates.
+
+        :param clock: function which returns current time in seconds.
+        """
         super(DockerInspect, self).__init__(compose, interval)
+        self.engine = engine
+        self.files = file_index
+        self.fingerprints = fingerprints
+        self.use_fingerprint = use_fingerprint
+        self.snapshot = snapshot or DockerSnapshot(compose)
         self.port_view = PortView(port_view)
         self.port_detail = PortDetail(port_detail)
         self.files_to_watch = files_to_watch
         self.services_to_check_git = services_to_check_git
+        self.clock = clock
+        self._history = {}  # type: Dict[str, Deque[Tuple[float, str]]]
+        self._last_state = {}  # type: Dict[str, Tuple]
         self.default_data = {
             "name": "Fetching...",
             "status": "Fetching...",
+            "style": "info",
+            "theme": "dark",
             "format": "dark",
             "ports": "",
+            "flapping": False,
+            "changes": 0,
         }
 
     def inspect(self, service: str) -> None:
-        """Inspect docker container.
+        """Inspect docker containers for service.
+
+        Containers are found by his docker compose labels. Each replica
+        is inspected and the most common status is shown.
 
         :param service: service name as defined in docker-compose yml.
 
         :return: None
         """
-        index = 1
-        all_containers_processed = False
+        if self.snapshot.refresh(self.run):
+            containers = self.snapshot.services.get(service, [])
+        else:
+            containers = self._find_containers(service)
         result_list = []  # type: list
         need_build = False
-        while not all_containers_processed:
-            container_name = self._get_container_name(service, index)
-            inspect_data = self._get_inspect_data(container_name)
-
-            if not inspect_data:
-                if not result_list:
-                    result_list.append(("Not Found", "info", "dark"))
-                all_containers_processed = True
-            elif self._need_build(service, inspect_data):
+        for inspect_data in containers:
+            if self._need_build(service, inspect_data):
                 need_build = True
                 result_list.append(("NEED BUILD", "error", None))
-                index += 1
             else:
                 result_list.append(self._define_status(inspect_data))
-                index += 1
+        if not result_list:
+            result_list.append(("Not Found", "info", "dark"))
 
         if need_build:
             persist_on_disk("add", service, "need_image")
@@ -140,71 +630,95 @@ class DockerInspect(InspectTemplate):
                 0
             ][0]
 
+        state = (
+            tuple(result[0] for result in result_list),
+            tuple((data.get("State") or {}).get("Pid", 0) for data in containers),
+        )
+        changes = self._save_state(service, state, service_status)
+
         self._status[service] = {
             "name": service,
             "status": service_status,
             "style": text_style,
             "theme": text_theme,
             "ports": self._get_service_ports(service),
+            "flapping": changes > self.flap_limit,
+            "changes": changes,
         }
 
+    def _save_state(self, service: str, state: Tuple, status: str) -> int:
+        """Save service state change in history.
+
+        :param service: service name as defined in docker-compose yml.
+
+        :param state: containers status and main process ids.
+
+        :param status: service status shown in box.
+
+        :return: number of changes inside the flap window.
+        """
+        now = self.clock()
+        history = self._history.setdefault(service, deque(maxlen=self.history_size))
+        last_state = self._last_state.get(service)
+        self._last_state[service] = state
+        if last_state is not None and last_state != state:
+            history.append((now, status))
+        return sum(
+            1 for changed_at, _ in history if now - changed_at <= self.flap_window
+        )
+
     def _get_service_ports(self, service: str) -> str:
         """Get docker services port info.
 
-        Will format text according the 'port_view' and 'port_detail' options.
+        Port strings for each 'port_detail' option are formatted
+        once, when docker-compose files are loaded.
 
         :param service: service name as defined in docker-compose yml.
 
         :return: string
         """
-        internal_ports = []
-        external_ports = []
-        port_list = self.compose.get_ports_from_service(service) or ""
-
-        if not port_list:
-            return ""
+        facts = self.compose.get_facts(service)
+        return facts.ports[self.port_detail] if facts else ""
 
-        for port in port_list:
-            if ":" in port:
-                external_ports.append("{}".format(port.split(":")[0]))
-                internal_ports.append("{}".format(port.split(":")[-1]))
-            else:
-                internal_ports.append("{}".format(port))
-
-        external_ports = sorted(set(external_ports))
-        internal_ports = sorted(set(internal_ports))
+    def _find_containers(self, service: str) -> List[dict]:
+        """Inspect service containers one by one, using his names.
 
-        if internal_ports == external_ports:
-            return "{} {}".format(BOTH, " ".join(external_ports))
+        Used only when the project containers can not be listed.
 
-        if self.port_detail == PortDetail.external:
-            service_string = "{} {}".format(OUT, "/".join(external_ports))
-        elif self.port_detail == PortDetail.internal:
-            service_string = "{} {}".format(IN, "/".join(internal_ports))
-        else:
-            service_string = "{} {} {} {}".format(
-                OUT, "/".join(external_ports), IN, "/".join(internal_ports)
-            )
+        :param service: service name as defined in docker-compose yml.
 
-        return service_string
+        :return: list
+        """
+        containers = []
+        index = 1
+        while True:
+            container_name = self._get_container_name(service, index)
+            if index > 1 and container_name == self._get_container_name(service):
+                # Services with 'container_name' have only one container.
+                return containers
+            inspect_data = self._get_inspect_data(container_name)
+            if not inspect_data:
+                return containers
+            containers.append(inspect_data)
+            index += 1
 
     def _get_container_name(self, service: str, index: int = 1) -> str:
         """Return container name for informed service.
 
         Name can be retrieved from 'container_name' parameter in
         docker-compose.yml files or calculated using this mask:
-        ``<folder_name>_<service_name>_1``
+        ``<project_name>_<service_name>_1``
 
         :param service: service name as defined in docker-compose yml.
 
         :return: string
         """
         # Try container_name first
-        name = self.compose.get_from_service(service, "container_name")
+        facts = self.compose.get_facts(service)
+        name = facts.container_name if facts else None
         if not name:
             # Generate default_name
-            name = os.path.basename(os.path.dirname(self.compose.full_path))
-            name = "{}_{}_{}".format(name.lower(), service.lower(), index)
+            name = "{}_{}_{}".format(self.compose.project_name, service.lower(), index)
         return name
 
     def _get_inspect_data(self, service: str) -> dict:
@@ -214,8 +728,21 @@ class DockerInspect(InspectTemplate):
 
         :return: dict
         """
-        ret = self.run("docker inspect {} 2>/dev/null".format(service), get_stdout=True)
-        return json.loads(ret)[0] if ret else {}
+        data = self.engine.inspect_container(service)
+        if data is not None or self.engine.available:
+            return data or {}
+        ret = self.run(
+            [
+                "docker",
+                "inspect",
+                "--format",
+                inspect_format(CONTAINER_FIELDS),
+                service,
+            ],
+            get_stdout=True,
+        )
+        data_list = parse_inspect_output(ret, CONTAINER_FIELDS) if ret else []
+        return data_list[0] if data_list else {}
 
     @staticmethod
     def _get_running_status(inspect_state: dict) -> str:
@@ -281,6 +808,12 @@ class DockerInspect(InspectTemplate):
             Will check if any of the files listed in this parameter have
             his modification date more recent than service docker image build date.
 
+        **watch_for_build_using_fingerprint**
+
+            Will check if the content of the build context (except files
+            listed in .dockerignore) changed since the service image was
+            first seen. If enabled, file modification dates are not checked.
+
         **watch_for_build_using_git**
 
             Will check if any of the services listed in this parameters have
@@ -292,53 +825,60 @@ class DockerInspect(InspectTemplate):
 
         :return: bool
         """
-        test_date = None
-        image_name = inspect_data["Config"]["Image"]
-        image_data = self.run(
-            "docker inspect {} 2>/dev/null".format(image_name), get_stdout=True
-        )
-        if image_data:
-            image_data = json.loads(image_data)[0]
-
-            # Get current UTC offset
-            time_now = datetime.datetime.now()
-            time_now_utc = datetime.datetime.utcnow()
-            time_offset_seconds = (time_now - time_now_utc).total_seconds()
-            utc_offset = time.gmtime(abs(time_offset_seconds))
-            utc_string = "{}{}".format(
-                "-" if time_offset_seconds < 0 else "+",
-                time.strftime("%H%M", utc_offset),
-            )
-            date = image_data.get("Created")[:-4] + " " + utc_string
-            test_date = datetime.datetime.strptime(date, "%Y-%m-%dT%H:%M:%S.%f %z")
-
-        label = inspect_data["Config"]["Labels"].get("com.docker.compose.service")
-        if not label:
+        label = DockerSnapshot._labels(inspect_data).get("com.docker.compose.service")
+        facts = self.compose.get_facts(label) if label else None
+        full_path = facts.build_path if facts else None
+        if not full_path:
             return False
-        full_path = None
-        if test_date and self.compose.get_from_service(label, "build"):
-            build_path = self.compose.get_from_service(label, "build")
-            if isinstance(build_path, dict):
-                build_path = build_path.get("context")
-            full_path = get_path(build_path, self.compose.base_path)
-            list_dates = [
-                datetime.datetime.fromtimestamp(
-                    os.path.getmtime(os.path.join(full_path, file)), tz=get_localzone()
+
+        test_date = self.snapshot.image_dates.get(inspect_data["Image"])
+        if not test_date:
+            image_name = inspect_data["Config"]["Image"]
+            image_data = self.engine.inspect_image(image_name)
+            if image_data is None and not self.engine.available:
+                ret = self.run(
+                    [
+                        "docker",
+                        "inspect",
+                        "--format",
+                        inspect_format(IMAGE_FIELDS),
+                        image_name,
+                    ],
+                    get_stdout=True,
                 )
-                for file in self.files_to_watch
-                if os.path.isfile(os.path.join(full_path, file))
-            ]
-            if list_dates:
-                if max(list_dates) > test_date:
+                data_list = parse_inspect_output(ret, IMAGE_FIELDS) if ret else []
+                image_data = data_list[0] if data_list else None
+            if image_data:
+                test_date = parse_image_date(image_data["Created"])
+                self.snapshot.image_dates[image_data["Id"]] = test_date
+        if not test_date:
+            # Image was removed or can not be inspected:
+            # there is no build date to compare with.
+            return False
+
+        if self.use_fingerprint:
+            # Content is checked instead of dates: touched files
+            # with the same content don't need build. Changes in
+            # watched files trigger the check before the context
+            # fingerprint is old enough to be computed again.
+            self.files.watch(full_path, self.files_to_watch)
+            newest = self.files.newest(full_path, self.files_to_watch)
+            if self.fingerprints.is_stale(full_path, inspect_data["Image"], newest):
+                return True
+        else:
+            self.files.watch(full_path, self.files_to_watch)
+            newest = self.files.newest(full_path, self.files_to_watch)
+            if newest is not None:
+                file_date = datetime.datetime.fromtimestamp(newest, tz=local_timezone())
+                if file_date > test_date:
                     return True
 
         # Check for build using commit
         # Ex.: 2018-02-23 18:31:45 -0300
-        if service in self.services_to_check_git and full_path:
+        if service in self.services_to_check_git:
             git_log = self.run(
-                'cd {} && git log -1 --pretty=format:"%cd" --date=iso'.format(
-                    full_path
-                ),
+                ["git", "log", "-1", "--pretty=format:%cd", "--date=iso"],
+                cwd=full_path,
                 get_stdout=True,
             )
             date_fmt = "%Y-%m-%d %H:%M:%S %z"
@@ -7,11 +7,11 @@ inspect git data from docker services git branches in dashboard.
 import os
 import re
 from enum import Enum
-from typing import Tuple
+from typing import Tuple, Union
 
 from buzio import formatStr
 
-from cabrita.abc.base import InspectTemplate
+from cabrita.abc.base import InspectTemplate, StateStore
 from cabrita.abc.utils import persist_on_disk
 from cabrita.components.config import Compose
 
@@ -40,6 +40,7 @@ class GitInspect(InspectTemplate):
         self.target_branch = target_branch
         self.default_data = None
         self.path = None  # type: str
+        self._revision = StateStore()
 
     def branch_is_dirty(self, path: str = None) -> bool:
         """Check if branch is "dirty".
@@ -53,7 +54,7 @@ class GitInspect(InspectTemplate):
         if not path:
             path = self.path
         branch_is_dirty = self.run(
-            "cd {} && git status --porcelain 2>/dev/null".format(path), get_stdout=True
+            ["git", "status", "--porcelain"], cwd=path, get_stdout=True
         )
         return True if branch_is_dirty else False
 
@@ -66,15 +67,18 @@ class GitInspect(InspectTemplate):
 
         :return: string
         """
-        git_tag = self.run(
-            "cd {} && git describe --tags "
-            "$(git rev-list --tags --max-count=1 2>/dev/null) "
-            "2>/dev/null".format(path),
-            get_stdout=True,
+        git_tag = ""  # type: Union[str, bool]
+        last_tagged_commit = self.run(
+            ["git", "rev-list", "--tags", "--max-count=1"], cwd=path, get_stdout=True
         )
+        if last_tagged_commit:
+            git_tag = self.run(
+                ["git", "describe", "--tags", last_tagged_commit.strip()],
+                cwd=path,
+                get_stdout=True,
+            )
         git_hash = self.run(
-            "cd {} && git rev-parse --short HEAD 2>/dev/null".format(path),
-            get_stdout=True,
+            ["git", "rev-parse", "--short", "HEAD"], cwd=path, get_stdout=True
         )
         if not git_hash and git_tag:
             return "--"
@@ -105,6 +109,29 @@ class GitInspect(InspectTemplate):
         path = self.compose.get_build_path(service)
         return self.get_git_revision_from_path(path)
 
+    def collect_revision(self, service: str) -> None:
+        """Fetch git revision data from service, if his interval has elapsed.
+
+        :param service: service name as defined in docker-compose yml.
+
+        :return: None
+        """
+        task = "revision:{}".format(service)
+        if self._start(task):
+            try:
+                self._revision[service] = self.get_git_revision(service)
+            finally:
+                self._done(task)
+
+    def revision(self, service: str) -> str:
+        """Return last fetched git revision data from service.
+
+        :param service: service name as defined in docker-compose yml.
+
+        :return: string
+        """
+        return self._revision.get(service, "Fetching...")
+
     def get_behind_state(self, path):
         """Check if service need pull and return status.
 
@@ -115,12 +142,11 @@ class GitInspect(InspectTemplate):
         if not os.path.isdir(os.path.join(path, ".git")):
             return "OK"
 
-        git_behind = self.run(
-            "cd {} && git fetch && git status -bs --porcelain 2> /dev/null".format(
-                path
-            ),
-            get_stdout=True,
-        )
+        git_behind = False  # type: Union[str, bool]
+        if self.run(["git", "fetch"], cwd=path, timeout=30):
+            git_behind = self.run(
+                ["git", "status", "-bs", "--porcelain"], cwd=path, get_stdout=True
+            )
 
         if not git_behind:
             git_state = ""
@@ -232,11 +258,12 @@ class GitInspect(InspectTemplate):
         """
         if not path:
             path = self.path
-        branch = self.run(
-            'cd {} && git branch | grep "*" 2>/dev/null'.format(path), get_stdout=True
-        )
+        branches = self.run(["git", "branch"], cwd=path, get_stdout=True)
+        branch = [
+            line for line in (branches or "").split("\n") if line.startswith("*")
+        ]
         return (
-            branch.replace("* ", "").replace("\n", "").replace("(", "").replace(")", "")
+            branch[0].replace("* ", "").replace("(", "").replace(")", "")
             if branch
             else ""
         )
@@ -264,8 +291,11 @@ class GitInspect(InspectTemplate):
 
         :return: int
         """
-        task = "cd {} && git status -bs --porcelain".format(path)
-        ret = self.run(task, get_stdout=True)
+        ret = self.run(
+            ["git", "status", "-bs", "--porcelain"], cwd=path, get_stdout=True
+        )
+        if not ret:
+            return 0
         if direction == GitDirection.behind:
             if "behind" in ret:
                 s = re.search(r"behind (\d+)", ret)
@@ -291,10 +321,11 @@ class GitInspect(InspectTemplate):
 
         :return: int
         """
-        task = "cd {} && git log {}..{} --oneline 2>/dev/null".format(
-            path,
+        revision_range = "{}..{}".format(
             name if direction == GitDirection.behind else self.target_branch,
             self.target_branch if direction == GitDirection.behind else name,
         )
-        ret = self.run(task, get_stdout=True)
+        ret = self.run(
+            ["git", "log", revision_range, "--oneline"], cwd=path, get_stdout=True
+        )
         return 0 if not ret else len(ret.split("\n")) - 1
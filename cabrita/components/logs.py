@@ -0,0 +1,220 @@
+"""Logs module.
+
+Follows the log of one service container while the log panel is open.
+
+The log lines are read in a background thread, from one stream opened
+with the Docker Engine API (or the 'docker logs --follow' command if
+the engine is not available), and kept in a ring buffer: only the last
+lines are stored, so memory stays flat even for containers which
+write thousands of lines per second.
+"""
+import subprocess
+import threading
+from collections import deque
+from typing import Callable, Deque, Iterator, List, Optional
+
+from dashing import dashing
+
+from cabrita.abc.engine import MAX_LINE, EngineClient, engine
+from cabrita.abc.utils import strip_ansi
+
+
+class ProcessLogStream:
+    """Container log stream using the 'docker logs --follow' command."""
+
+    def __init__(self, name: str, tail: int) -> None:
+        """Init class.
+
+        :param name: container id or name
+
+        :param tail: number of old lines to show before following.
+        """
+        self.process = subprocess.Popen(
+            ["docker", "logs", "--follow", "--tail", str(tail), name],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            stdin=subprocess.DEVNULL,
+        )
+
+    def __iter__(self) -> Iterator[str]:
+        """Return decoded log lines."""
+        with self.process.stdout:
+            for line in iter(lambda: self.process.stdout.readline(MAX_LINE), b""):
+                yield line.decode("utf-8", "replace").rstrip("\r\n")
+
+    def close(self) -> None:
+        """Stop the command.
+
+        :return: None
+        """
+        if self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+
+
+class LogWidget(dashing.Text):
+    """Text widget which shows the last lines that fit inside it."""
+
+    def __init__(self, lines: List[str], tail: bool = True, **kwargs) -> None:
+        """Init class.
+
+        :param lines: log lines
+
+        :param tail: show the last lines. If False, show the first lines.
+        """
+        super(LogWidget, self).__init__("", **kwargs)
+        self.lines = lines
+        self.tail = tail
+
+    def _display(self, tbox, parent):
+        tbox = self._draw_borders_and_title(tbox)
+        height = max(tbox.h, 0)
+        if not height:
+            lines = []  # type: List[str]
+        elif self.tail:
+            lines = self.lines[-height:]
+        else:
+            lines = self.lines[:height]
+        lines = [line[: tbox.w] for line in lines] + [""] * (height - len(lines))
+        for dx, line in enumerate(lines):
+            print(
+                tbox.t.on_color(self.background_color)
+                + tbox.t.color(self.color)
+                + tbox.t.move(tbox.x + dx, tbox.y)
+                + line
+                + " " * (tbox.w - len(line))
+            )
+
+
+class LogTail:
+    """Log tail for one service container."""
+
+    def __init__(
+        self,
+        service: str,
+        container: Optional[dict],
+        lines: int = 500,
+        on_update: Optional[Callable[[], None]] = None,
+        client: EngineClient = engine,
+    ) -> None:
+        """Init class.
+
+        :param service: service name as defined in docker-compose yml.
+
+        :param container: container inspect data or None if not found.
+
+        :param lines: number of lines kept in the ring buffer.
+
+        :param on_update: function called when new lines arrive.
+            Called only once until the new lines are read.
+
+        :param client: Docker Engine API client.
+        """
+        self.service = service
+        self.container = container
+        self.client = client
+        self.on_update = on_update
+        self.lines = deque(maxlen=lines)  # type: Deque[str]
+        self._lock = threading.Lock()
+        self._changed = True
+        self._stream = None  # type: Optional[Iterator[str]]
+        self._thread = None  # type: Optional[threading.Thread]
+        self._closed = threading.Event()
+
+    @property
+    def container_name(self) -> str:
+        """Return container name, without the leading slash.
+
+        :return: string
+        """
+        if not self.container:
+            return ""
+        return self.container.get("Name", self.container["Id"][:12]).lstrip("/")
+
+    @property
+    def changed(self) -> bool:
+        """Return if new lines arrived since last widget.
+
+        :return: bool
+        """
+        return self._changed
+
+    def _open_stream(self) -> Optional[Iterator[str]]:
+        """Open the container log stream.
+
+        :return: LogStream, ProcessLogStream or None if stream can not be opened.
+        """
+        tty = bool(self.container.get("Config", {}).get("Tty"))
+        stream = self.client.logs(self.container["Id"], self.lines.maxlen, tty)
+        if stream is None and not self.client.available:
+            try:
+                return ProcessLogStream(self.container["Id"], self.lines.maxlen)
+            except OSError:
+                return None
+        return stream
+
+    def start(self) -> None:
+        """Start following the container log.
+
+        :return: None
+        """
+        if not self.container:
+            self._append("Container not found.")
+            return
+        self._stream = self._open_stream()
+        if self._stream is None:
+            self._append("Can not read container log.")
+            return
+        self._thread = threading.Thread(
+            target=self._follow, name="log-tail", daemon=True
+        )
+        self._thread.start()
+
+    def _append(self, line: str) -> None:
+        """Add line in ring buffer and notify if needed."""
+        with self._lock:
+            self.lines.append(strip_ansi(line).expandtabs())
+            notify = not self._changed
+            self._changed = True
+        if notify and self.on_update:
+            self.on_update()
+
+    def _follow(self) -> None:
+        """Read log lines until stream ends or tail is closed."""
+        for line in self._stream:
+            if self._closed.is_set():
+                return
+            self._append(line)
+        if not self._closed.is_set():
+            self._append("--- log stream closed ---")
+
+    def widget(self, **kwargs) -> LogWidget:
+        """Return widget with the last log lines.
+
+        :param kwargs: dashing widget options (ex.: color)
+
+        :return: LogWidget
+        """
+        with self._lock:
+            lines = list(self.lines)
+            self._changed = False
+        title = "Logs: {}".format(self.service)
+        if self.container_name:
+            title += " ({})".format(self.container_name)
+        title += " - 'n'/'b' next/previous service, 'l' close"
+        return LogWidget(lines, title=title, **kwargs)
+
+    def close(self) -> None:
+        """Stop following the container log.
+
+        :return: None
+        """
+        self._closed.set()
+        if self._stream is not None:
+            self._stream.close()  # type: ignore
+        if self._thread is not None:
+            self._thread.join(timeout=2)
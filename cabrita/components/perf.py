@@ -0,0 +1,162 @@
+"""
+Perf module.
+
+This module has the PerfStats class, which keeps the performance
+data for each box update, and the functions which build the
+performance HUD (toggled with the 'p' key in dashboard).
+"""
+import math
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, List, Optional, Tuple
+
+from tabulate import tabulate
+
+HISTORY_SIZE = 100
+CALLS_WINDOW = 60.0
+
+
+def percentile(values: List[float], percent: float) -> Optional[float]:
+    """Return the percentile from values, using the nearest rank method.
+
+    :param values: list of values
+
+    :param percent: percentile, from 0 to 100
+
+    :return: float or None if there is no values
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(math.ceil(percent / 100 * len(ordered)), 1)
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+class PerfStats:
+    """Performance statistics for box updates."""
+
+    def __init__(self, clock=time.monotonic) -> None:
+        """Init class.
+
+        :param clock: function which returns current time in seconds.
+        """
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._durations = deque(maxlen=HISTORY_SIZE)  # type: Deque[float]
+        self._calls = deque()  # type: Deque[Tuple[float, int]]
+        self.last_collect_time = None  # type: Optional[float]
+        self.last_render_time = None  # type: Optional[float]
+        self.last_success = None  # type: Optional[float]
+
+    def add(self, collect_time: float, render_time: float, calls: int) -> None:
+        """Add box update data.
+
+        :param collect_time: seconds spent collecting data
+
+        :param render_time: seconds spent building the widget
+
+        :param calls: number of commands run in update
+
+        :return: None
+        """
+        now = self.clock()
+        with self._lock:
+            self.last_collect_time = collect_time
+            self.last_render_time = render_time
+            self._durations.append(collect_time + render_time)
+            self._calls.append((now, calls))
+            self._discard_old_calls(now)
+
+    def mark_success(self) -> None:
+        """Save the time of the last successful update.
+
+        :return: None
+        """
+        self.last_success = self.clock()
+
+    def _discard_old_calls(self, now: float) -> None:
+        """Discard calls older than one minute."""
+        while self._calls and self._calls[0][0] < now - CALLS_WINDOW:
+            self._calls.popleft()
+
+    @property
+    def last_duration(self) -> Optional[float]:
+        """Return seconds spent in last update.
+
+        :return: float or None
+        """
+        with self._lock:
+            return self._durations[-1] if self._durations else None
+
+    def latency(self, percent: float) -> Optional[float]:
+        """Return update duration percentile.
+
+        :param percent: percentile, from 0 to 100
+
+        :return: float or None
+        """
+        with self._lock:
+            return percentile(list(self._durations), percent)
+
+    @property
+    def calls_per_minute(self) -> int:
+        """Return number of commands run in the last minute.
+
+        :return: int
+        """
+        with self._lock:
+            self._discard_old_calls(self.clock())
+            return sum(calls for _, calls in self._calls)
+
+    @property
+    def seconds_since_success(self) -> Optional[float]:
+        """Return seconds since last successful update.
+
+        :return: float or None
+        """
+        if self.last_success is None:
+            return None
+        return self.clock() - self.last_success
+
+
+def _format_seconds(value: Optional[float]) -> str:
+    """Format seconds for HUD columns."""
+    if value is None:
+        return "--"
+    if value < 1:
+        return "{:.0f}ms".format(value * 1000)
+    return "{:.1f}s".format(value)
+
+
+def hud_lines(boxes: List[Any], frame_time: Optional[float]) -> List[str]:
+    """Return the performance HUD text lines.
+
+    :param boxes: boxes and watchers in dashboard
+
+    :param frame_time: seconds spent rendering the last frame
+
+    :return: list
+    """
+    headers = ["Box", "Last", "Render", "p50", "p95", "Cmd/min", "Updated"]
+    rows = []
+    for box in boxes:
+        perf = box.perf
+        rows.append(
+            [
+                box.title[:20],
+                _format_seconds(perf.last_duration),
+                _format_seconds(perf.last_render_time),
+                _format_seconds(perf.latency(50)),
+                _format_seconds(perf.latency(95)),
+                str(perf.calls_per_minute),
+                (
+                    "{} ago".format(_format_seconds(perf.seconds_since_success))
+                    if perf.last_success is not None
+                    else "never"
+                ),
+            ]
+        )
+    lines = tabulate(rows, headers, disable_numparse=True).split("\n")
+    title = "Performance (p to close) - frame {}".format(_format_seconds(frame_time))
+    return [title] + lines
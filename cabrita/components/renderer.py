@@ -0,0 +1,277 @@
+"""
+Renderer module.
+
+This module has the Renderer class, which is responsible to
+display the dashing layout in terminal.
+
+Instead of repainting the whole screen on each frame, the renderer
+captures the dashing output, applies it to an in-memory screen
+(the back buffer) and compares it with the last displayed screen
+(the front buffer). Only the changed cells are written to terminal,
+in a single write operation.
+"""
+import contextlib
+import io
+import re
+import sys
+import time
+from typing import Any, FrozenSet, List, Optional, TextIO, Tuple
+
+from wcwidth import wcwidth
+
+# (foreground, background, attributes) SGR parameters for a cell
+CellStyle = Tuple[Optional[str], Optional[str], FrozenSet[str]]
+Cell = Tuple[str, CellStyle]
+
+DEFAULT_STYLE = (None, None, frozenset())  # type: CellStyle
+EMPTY_CELL = (" ", DEFAULT_STYLE)  # type: Cell
+
+ESCAPE_SEQUENCE = re.compile(r"\x1b(?:\[([0-9;?]*)([@-~])|[()][0-9A-Za-z]|.)")
+
+# Unchanged cells between two changed ones are rewritten
+# if this is cheaper than moving the cursor.
+MERGE_GAP = 8
+
+# Overlay panel colors: white text on blue background
+OVERLAY_SGR = "\x1b[0;97;44m"
+
+
+def apply_sgr(style: CellStyle, params: str) -> CellStyle:
+    """Return new cell style after a SGR (Select Graphic Rendition) sequence.
+
+    :param style: current cell style
+
+    :param params: SGR parameters (ex.: "38;5;6" for "\\x1b[38;5;6m")
+
+    :return: tuple
+    """
+    foreground, background, attributes = style
+    new_attributes = set(attributes)
+    codes = params.split(";") if params else ["0"]
+    index = 0
+    while index < len(codes):
+        code = codes[index] or "0"
+        if code in ["38", "48"]:
+            mode = codes[index + 1] if index + 1 < len(codes) else ""
+            size = {"5": 3, "2": 5}.get(mode, 1)
+            value = ";".join(codes[index : index + size])
+            index += size
+            if size == 1:
+                continue
+            if code == "38":
+                foreground = value
+            else:
+                background = value
+            continue
+        index += 1
+        if not code.isdigit():
+            continue
+        number = int(code)
+        if number == 0:
+            foreground, background = None, None
+            new_attributes = set()
+        elif 30 <= number <= 37 or 90 <= number <= 97:
+            foreground = code
+        elif number == 39:
+            foreground = None
+        elif 40 <= number <= 47 or 100 <= number <= 107:
+            background = code
+        elif number == 49:
+            background = None
+        elif number == 22:
+            new_attributes -= {"1", "2"}
+        elif 23 <= number <= 29:
+            new_attributes.discard(str(number - 20))
+        else:
+            new_attributes.add(code)
+    return foreground, background, frozenset(new_attributes)
+
+
+def sgr_for_style(style: CellStyle) -> str:
+    """Return the SGR sequence which sets the cell style from a clean state.
+
+    :param style: cell style
+
+    :return: string
+    """
+    foreground, background, attributes = style
+    params = ["0"] + sorted(attributes)
+    if foreground:
+        params.append(foreground)
+    if background:
+        params.append(background)
+    return "\x1b[{}m".format(";".join(params))
+
+
+class Renderer:
+    """Diff-based terminal Renderer class."""
+
+    def __init__(self, term: Any, stream: Optional[TextIO] = None) -> None:
+        """Init class.
+
+        :param term: blessed terminal instance
+
+        :param stream: stream to write (default: sys.stdout)
+        """
+        self.term = term
+        self.stream = stream
+        self._front = None  # type: Optional[List[List[Cell]]]
+        self.last_frame_size = 0
+        self.last_render_time = None  # type: Optional[float]
+
+    def reset(self) -> None:
+        """Forget the last displayed screen, forcing a full repaint.
+
+        :return: None
+        """
+        self._front = None
+
+    def render(self, ui: Any, overlay: Optional[List[str]] = None) -> int:
+        """Display dashing layout, writing only the changed cells.
+
+        :param ui: dashing object (usually the main HSplit or VSplit)
+
+        :param overlay: text lines to display over the layout,
+            in the top right corner (ex.: the performance HUD)
+
+        :return: number of characters written
+        """
+        start = time.monotonic()
+        width, height = self.term.width, self.term.height
+        captured = io.StringIO()
+        with contextlib.redirect_stdout(captured):
+            ui.display()
+        data = captured.getvalue()
+        if overlay:
+            data += self._overlay_sequences(overlay, width)
+        back = self._draw(data, width, height)
+
+        front = self._front
+        if front is not None and (len(front) != height or len(front[0]) != width):
+            front = None
+
+        output = self._diff(front, back)
+        self._front = back
+        if not output:
+            self.last_frame_size = 0
+            self.last_render_time = time.monotonic() - start
+            return 0
+        if front is None:
+            output.insert(0, self.term.clear)
+        output.append(sgr_for_style(DEFAULT_STYLE))
+
+        frame = "".join(output)
+        stream = self.stream or sys.stdout
+        stream.write(frame)
+        stream.flush()
+        self.last_frame_size = len(frame)
+        self.last_render_time = time.monotonic() - start
+        return len(frame)
+
+    @staticmethod
+    def _overlay_sequences(lines: List[str], width: int) -> str:
+        """Return the sequences which draw text lines in the top right corner.
+
+        :param lines: text lines
+
+        :param width: screen width
+
+        :return: string
+        """
+        panel_width = min(max(len(line) for line in lines) + 2, width)
+        col = max(width - panel_width - 1, 0)
+        output = []
+        for row, line in enumerate([""] + lines + [""]):
+            text = " {}".format(line).ljust(panel_width)[:panel_width]
+            output.append("\x1b[{};{}H{}{}".format(row + 1, col + 1, OVERLAY_SGR, text))
+        output.append("\x1b[0m")
+        return "".join(output)
+
+    @staticmethod
+    def _draw(data: str, width: int, height: int) -> List[List[Cell]]:
+        """Apply dashing output in a new screen buffer.
+
+        :param data: captured dashing output
+
+        :param width: screen width
+
+        :param height: screen height
+
+        :return: screen buffer (list of rows)
+        """
+        screen = [[EMPTY_CELL] * width for _ in range(height)]
+        row, col = 0, 0
+        style = DEFAULT_STYLE
+        position = 0
+        for match in ESCAPE_SEQUENCE.finditer(data + "\x1b["):
+            for char in data[position : match.start()]:
+                if char == "\n":
+                    row, col = row + 1, 0
+                    continue
+                if char == "\r":
+                    col = 0
+                    continue
+                char_width = wcwidth(char)
+                if char_width < 1:
+                    continue
+                if 0 <= row < height and 0 <= col < width:
+                    screen[row][col] = (char, style)
+                    if char_width == 2 and col + 1 < width:
+                        screen[row][col + 1] = ("", style)
+                col += char_width
+            position = match.end()
+            params, command = match.group(1), match.group(2)
+            if command == "m":
+                style = apply_sgr(style, params or "")
+            elif command in ["H", "f"]:
+                values = (params or "").split(";")
+                row = int(values[0] or 1) - 1
+                col = int(values[1] or 1) - 1 if len(values) > 1 else 0
+            elif command == "G":
+                col = int(params or 1) - 1
+            elif command == "d":
+                row = int(params or 1) - 1
+        return screen
+
+    def _diff(
+        self, front: Optional[List[List[Cell]]], back: List[List[Cell]]
+    ) -> List[str]:
+        """Return the terminal sequences to change front screen into back screen.
+
+        :param front: last displayed screen buffer (None for full repaint)
+
+        :param back: new screen buffer
+
+        :return: list of strings
+        """
+        output = []  # type: List[str]
+        current_style = None  # type: Optional[CellStyle]
+        for row, new_line in enumerate(back):
+            old_line = front[row] if front is not None else None
+            width = len(new_line)
+            col = 0
+            while col < width:
+                if old_line is not None and old_line[col] == new_line[col]:
+                    col += 1
+                    continue
+                if not new_line[col][0] and col > 0:
+                    # second half of a wide character
+                    col -= 1
+                start = end = col
+                gap = 0
+                while col < width and gap <= MERGE_GAP:
+                    if old_line is None or old_line[col] != new_line[col]:
+                        end = col
+                        gap = 0
+                    else:
+                        gap += 1
+                    col += 1
+                output.append(self.term.move(row, start))
+                for char, style in new_line[start : end + 1]:
+                    if not char:
+                        continue
+                    if style != current_style:
+                        output.append(sgr_for_style(style))
+                        current_style = style
+                    output.append(char)
+        return output
@@ -2,15 +2,18 @@
 import os
 import re
 from datetime import datetime, timedelta
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Tuple
 
 import psutil
 from buzio import formatStr
 from dashing import dashing
 from tabulate import tabulate
 
-from cabrita.abc.utils import format_color, get_path, run_command
+from cabrita.abc.engine import engine
+from cabrita.abc.runner import runner
+from cabrita.abc.utils import format_color, get_path
 from cabrita.components.box import Box
+from cabrita.components.docker import DockerSnapshot
 
 
 class Watch(Box):
@@ -20,6 +23,15 @@ class Watch(Box):
     """
 
     _interval = 30.0
+    _title = "Watch"
+
+    @property
+    def title(self) -> str:
+        """Return watch title name.
+
+        :return: string
+        """
+        return self.data.get("name", self._title)
 
     @property
     def interval(self) -> float:
@@ -44,6 +56,33 @@ class Watch(Box):
         """
         raise NotImplementedError()
 
+    def collect(self) -> None:
+        """Collect data for watch.
+
+        Watchers fetch and render his data in the same step,
+        inside the run method.
+
+        :return: None
+        """
+        pass
+
+    @property
+    def healthy(self) -> bool:
+        """Return if watch data is fresh.
+
+        :return: bool
+        """
+        return self.stale_since is None
+
+    def snapshot(self) -> dict:
+        """Return the last watch data, without terminal formatting.
+
+        :return: dict
+        """
+        data = self.widget_snapshot(self.widget)
+        data["healthy"] = self.healthy
+        return data
+
     def run(self) -> None:
         """Check if watch can update his data and execute the update.
 
@@ -58,13 +97,19 @@ class Watch(Box):
 class DockerComposeWatch(Watch):
     """Docker Compose Watch class.
 
-    Watch for docker-compose file status.
+    Watch for docker-compose file status, and for stray containers
+    of the compose project, read from the DockerSnapshot.
     """
 
+    _title = "Compose"
+
     def __init__(self, **kwargs) -> None:
         """Init class."""
         self.config = kwargs.pop("config")
         self.version = kwargs.pop("version")
+        snapshot = kwargs.pop("snapshot", None)  # type: Optional[DockerSnapshot]
+        self.docker_snapshot = snapshot
+        self._shown_strays = []  # type: List[Tuple[str, str]]
         super(DockerComposeWatch, self).__init__(**kwargs)
         self.interval = 15
         self.last_update = datetime.now() - timedelta(seconds=self.interval)
@@ -106,6 +151,9 @@ class DockerComposeWatch(Watch):
         table_lines = self.format_revision(table_lines)
 
         table = tabulate(table_lines, [])
+        stray_table = self._get_stray_table()
+        if stray_table:
+            table += "\n\n{}".format(stray_table)
 
         title = "{}:Cabrita v.{}".format(self.config.title, self.version)
         self._widget = dashing.Text(
@@ -116,6 +164,62 @@ class DockerComposeWatch(Watch):
             title=title,
         )
 
+    @property
+    def strays(self) -> List[dict]:
+        """Return stray containers from docker snapshot.
+
+        :return: list
+        """
+        if not self.docker_snapshot or not self.docker_snapshot.is_valid:
+            return []
+        return self.docker_snapshot.strays
+
+    @staticmethod
+    def _stray_state(strays: List[dict]) -> List[Tuple[str, str]]:
+        """Return name and status for each stray container."""
+        return [
+            (data["Name"].lstrip("/"), data["State"].get("Status", ""))
+            for data in strays
+        ]
+
+    @property
+    def strays_changed(self) -> bool:
+        """Return if stray containers changed since last update.
+
+        :return: bool
+        """
+        return self._stray_state(self.strays) != self._shown_strays
+
+    def _get_stray_table(self) -> str:
+        """Return table with stray containers of the compose project.
+
+        These containers have the project label, but his service
+        does not exist in docker-compose files anymore, or they were
+        created by 'docker-compose run'. They still hold ports and memory.
+
+        :return: string (empty if there are no stray containers)
+        """
+        strays = self.strays
+        self._shown_strays = self._stray_state(strays)
+        if not strays:
+            return ""
+        table_lines = []
+        for data in strays:
+            labels = data["Config"].get("Labels") or {}
+            service = labels.get("com.docker.compose.service", "")
+            if labels.get("com.docker.compose.oneoff") == "True":
+                service += " (run)"
+            table_lines.append(
+                [
+                    data["Name"].lstrip("/"),
+                    service,
+                    format_color(data["State"].get("Status", ""), "warning"),
+                ]
+            )
+        return "{}\n{}".format(
+            format_color("Stray containers:", "warning"), tabulate(table_lines, [])
+        )
+
 
 class UserWatch(Watch):
     """User Watch class.
@@ -123,6 +227,8 @@ class UserWatch(Watch):
     Watch for user defined watchers in cabrita.yml.
     """
 
+    _title = "Watchers"
+
     def __init__(self, **kwargs) -> None:
         """Init class."""
         self.config = kwargs.pop("config")
@@ -226,10 +332,16 @@ class UserWatch(Watch):
 
         :return: None
         """
-        ret = run_command(
-            "curl -f --connect-timeout {} {} 1>/dev/null 2>/dev/null".format(
-                watch_data.get("timeout", 1), watch_data["address"]
-            )
+        connect_timeout = watch_data.get("timeout", 1)
+        ret = runner.run(
+            [
+                "curl",
+                "-f",
+                "--connect-timeout",
+                str(connect_timeout),
+                watch_data["address"],
+            ],
+            timeout=connect_timeout + runner.timeout,
         )
 
         message_on_success = watch_data.get("message_on_success", "OK")
@@ -307,16 +419,55 @@ class SystemWatch(Watch):
     """
 
     _interval = 0.25
+    _title = "System"
+    _docker_size_interval = 30.0
+
+    def __init__(self, **kwargs) -> None:
+        """Init class."""
+        super(SystemWatch, self).__init__(**kwargs)
+        self._docker_size = None  # type: Optional[float]
+
+    @property
+    def docker_size(self) -> float:
+        """Return total size occupied by docker data in bytes.
+
+        The 'docker system df' command is slow, so his result is
+        refreshed in his own scheduler task, each 30 seconds.
+
+        :return: float
+        """
+        task = (self, "docker_size")
+        self.scheduler.register(task, self._docker_size_interval, group="watchers")
+        if self._docker_size is None or self.scheduler.is_due(task):
+            self._docker_size = self._get_docker_folder_size()
+            self.scheduler.done(task)
+        return self._docker_size
 
     @staticmethod
     def _get_docker_folder_size() -> float:
-        """Get total size occupied by docker data in bytes."""
+        """Get total size occupied by docker data in bytes.
+
+        Uses the docker engine API if available, or the
+        'docker system df' command.
+        """
+        usage = engine.system_df()
+        if usage is not None:
+            return float(
+                (usage.get("LayersSize") or 0)
+                + sum(data.get("SizeRw") or 0 for data in usage.get("Containers") or [])
+                + sum(
+                    max((data.get("UsageData") or {}).get("Size") or 0, 0)
+                    for data in usage.get("Volumes") or []
+                )
+                + sum(data.get("Size") or 0 for data in usage.get("BuildCache") or [])
+            )
+
         multiple = {"B": 1, "KB": 1024, "MB": 1024 * 1024, "GB": 1024 * 1024 * 1024}
         total_size = 0.0
-        docker_sizes = run_command(
-            "docker system df --format '{{.Size}}'", get_stdout=True
+        docker_sizes = runner.run(
+            ["docker", "system", "df", "--format", "{{.Size}}"], get_stdout=True
         )
-        for line in docker_sizes.split("\n"):
+        for line in (docker_sizes or "").split("\n"):
             if not line:
                 continue
             value = re.sub(r"[A-Za-z]+", "", line)
@@ -335,7 +486,7 @@ class SystemWatch(Watch):
         free_space = round(psutil.disk_usage("/").free / 1024 / 1024 / 1024, 1)
         total_space = round(psutil.disk_usage("/").total / 1024 / 1024 / 1024, 1)
         space_percent = (free_space / total_space) * 100
-        docker_usage = round(self._get_docker_folder_size() / 1024 / 1024 / 1024, 1)
+        docker_usage = round(self.docker_size / 1024 / 1024 / 1024, 1)
         docker_percentage = (docker_usage / (total_space - free_space)) * 100
 
         if memory_percent > 100:
@@ -1,4 +1,5 @@
 """Cabrita main module."""
+import contextlib
 import os
 import shutil
 import sys
@@ -32,38 +33,36 @@ CONFIG_PATH = os.path.join(str(Path.home()), ".cabrita")
     ),
     type=click.Choice(BoxColor.available_colors()),
 )
+@click.option(
+    "--once",
+    is_flag=True,
+    help="Collect all data once, print a snapshot and exit, "
+    "without starting the dashboard. "
+    "Exit code is 1 if any service is in error state.",
+)
+@click.option(
+    "--json",
+    "as_json",
+    is_flag=True,
+    help="Print the snapshot as json. Implies '--once'.",
+)
 @click.argument("compose_path", type=click.Path(exists=True), nargs=-1)
-def run(path, color, compose_path):
+def run(path, color, once, as_json, compose_path):
     """Run main command for cabrita.
 
     1. Check version
     2. Import configuration file
-    3. Run dashboard.
+    3. Run dashboard (or print a snapshot, in headless mode).
     """
+    # The json snapshot is only printed in headless mode.
+    once = once or as_json
     try:
-        print("")
-        console.box("Cabrita v{}".format(__version__))
-        version = check_version()
-        if path:
-            console.info("Loading Configuration...")
-        command = CabritaCommand(
-            cabrita_path=path,
-            compose_path=compose_path,
-            version=version,
-            background_color=color,
-        )
-        if not command.has_a_valid_config:
-            sys.exit(1)
-
-        initialize_folder(["need_image", "need_update"])
-
-        command.read_compose_files()
-        if command.has_a_valid_compose:
-            console.success("Configuration complete. Starting dashboard...")
-            command.prepare_dashboard()
-            command.execute()
-        else:
-            sys.exit(1)
+        # In headless mode, keep stdout only for the snapshot.
+        with contextlib.redirect_stdout(sys.stderr if once else sys.stdout):
+            command = prepare_command(path, color, compose_path, once)
+        if once:
+            sys.exit(command.execute_once(as_json=as_json))
+        command.execute()
     except KeyboardInterrupt:
         sys.exit(0)
     except Exception as exc:
@@ -71,6 +70,38 @@ def run(path, color, compose_path):
         raise
 
 
+def prepare_command(path, color, compose_path, once=False):
+    """Load configuration and compose files and prepare the dashboard.
+
+    The PyPI version check is skipped in headless mode.
+    """
+    print("")
+    console.box("Cabrita v{}".format(__version__))
+    version = __version__ if once else check_version()
+    if path:
+        console.info("Loading Configuration...")
+    command = CabritaCommand(
+        cabrita_path=path,
+        compose_path=compose_path,
+        version=version,
+        background_color=color,
+    )
+    if not command.has_a_valid_config:
+        sys.exit(1)
+
+    initialize_folder(["need_image", "need_update"])
+
+    command.read_compose_files()
+    if not command.has_a_valid_compose:
+        sys.exit(1)
+    if once:
+        console.success("Configuration complete. Collecting data...")
+    else:
+        console.success("Configuration complete. Starting dashboard...")
+    command.prepare_dashboard()
+    return command
+
+
 def initialize_folder(folder_list):
     """Initialize configuration folders."""
     for folder in folder_list:
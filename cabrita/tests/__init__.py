@@ -4,6 +4,7 @@ Tests init sub-package.
 This subpackage contain all unit tests.
 This file contains mocked data from docker inspect command.
 """
+
 LATEST_CONFIG_PATH = "./sheep/config/cabrita-v2.yml"
 
 INSPECT_DJANGO_CONTAINER = """
@@ -361,3 +362,31 @@ INSPECT_DJANGO_IMAGE = """
         }
     ]
     """
+
+# Same data, as printed by 'docker inspect --format' with inspect fields.
+INSPECT_DJANGO_CONTAINER_FORMAT = (
+    "\t".join(
+        [
+            "b075cee9bc12b262d99ff7068750acb3ac87ceadbffb0f4d040bb2f17521b7cc",
+            "/sheep_django_1",
+            "sha256:f17b832c2c7e7449d763b8a7e78d1c95ce34f19fe75701f1314733d404809d5b",
+            "django:dev",
+            "false",
+            "running",
+            "true",
+            "false",
+            "12248",
+            "",
+            "",
+            "django",
+            "False",
+            "1",
+        ]
+    )
+    + "\n"
+)
+
+INSPECT_DJANGO_IMAGE_FORMAT = (
+    "sha256:f17b832c2c7e7449d763b8a7e78d1c95ce34f19fe75701f1314733d404809d5b"
+    "\t2018-05-15T15:53:56.199420064Z\n"
+)
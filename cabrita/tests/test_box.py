@@ -5,9 +5,10 @@ from unittest import TestCase, mock
 import yaml
 from dashing import dashing
 
+from cabrita.abc.utils import format_color
 from cabrita.components import BoxColor
 from cabrita.components.box import Box, update_box
-from cabrita.components.docker import PortView
+from cabrita.components.docker import DockerInspect, PortDetail, PortView
 
 
 class TestBox(TestCase):
@@ -52,6 +53,7 @@ class TestBox(TestCase):
 
         git_mock = args[1]
         git_mock.get_git_revision = self.return_revision_status
+        git_mock.revision = self.return_revision_status
         git_mock.status = self.return_git_status
 
         self.box = Box(
@@ -177,3 +179,80 @@ class TestBox(TestCase):
     def test_update_box(self, *args):
         ret = update_box(self.box)
         self.assertIsInstance(ret, dashing.Text)
+
+    def test_snapshot(self):
+        self.box.data["show_git"] = False
+        snapshot = self.box.snapshot()
+        self.assertTrue(snapshot["healthy"])
+        self.assertDictEqual(
+            snapshot["services"]["django"],
+            {
+                "status": "Running",
+                "style": "success",
+                "ports": "↘ 8081",
+                "flapping": False,
+                "revision": "✎ 1.0.0@⑂ abcd12345",
+            },
+        )
+
+
+class TestBoxFlapping(TestCase):
+    def setUp(self):
+        self.docker = mock.Mock()
+        self.docker.status.return_value = {
+            "ports": "",
+            "status": "Running",
+            "name": "django",
+            "style": "success",
+            "theme": None,
+            "flapping": True,
+            "changes": 6,
+        }
+        git = mock.Mock()
+        git.revision.return_value = git.status.return_value = ""
+        self.box = Box(docker=self.docker, git=git)
+        self.box.data = {"name": "Test Box"}
+        self.box._services = ["django"]
+
+    def test_run(self):
+        self.box.run()
+        self.assertIn(
+            format_color("Running ↻ 6", "error", "confirm"), self.box.widget.text
+        )
+        self.assertFalse(self.box.healthy)
+        self.assertTrue(self.box.snapshot()["services"]["django"]["flapping"])
+
+
+class TestBoxCancelled(TestCase):
+    def setUp(self):
+        self.docker = DockerInspect(
+            compose=mock.Mock(),
+            interval=1,
+            port_view=PortView.hidden,
+            port_detail=PortDetail.external,
+            files_to_watch=[],
+            services_to_check_git=[],
+            snapshot=mock.Mock(),
+        )
+        self.box = Box(docker=self.docker, git=mock.Mock())
+        self.box.data = {"name": "Test Box", "show_git": False}
+        self.box._services = ["django", "django-worker"]
+
+    def _inspect(self, service):
+        # First service hangs until the box deadline.
+        self.docker._status[service] = {
+            "name": service,
+            "status": "Running",
+            "style": "success",
+            "theme": None,
+            "ports": "",
+        }
+        self.box.cancel()
+
+    def test_partial_update(self):
+        with mock.patch.object(self.docker, "inspect", side_effect=self._inspect):
+            update_box(self.box)
+        text = self.box.widget.text
+        self.assertIn(format_color("Running", "success"), text)
+        self.assertIn(format_color("django-worker", "info", "dark"), text)
+        self.assertIn(format_color("Fetching...", "info", "dark"), text)
@@ -0,0 +1,116 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from cabrita.abc.fingerprint import Fingerprints, is_excluded, read_dockerignore
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestBuildFingerprint(TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.context = os.path.join(self.folder.name, "django")
+        self.cache_path = os.path.join(self.folder.name, "cache", "fingerprints.json")
+        os.makedirs(os.path.join(self.context, "app"))
+        os.makedirs(os.path.join(self.context, "node_modules", "lib"))
+        self._write("Dockerfile", "FROM python:3.6\n")
+        self._write("app/views.py", "print('hello')\n")
+        self._write("node_modules/lib/index.js", "module.exports = {}\n")
+        self._write(".dockerignore", "# comment\nnode_modules\n**/*.pyc\n")
+        self.clock = FakeClock()
+        self.fingerprints = self._new_fingerprints()
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def _write(self, file, content):
+        with open(os.path.join(self.context, file), "w") as handler:
+            handler.write(content)
+
+    def _new_fingerprints(self):
+        return Fingerprints(cache_path=self.cache_path, max_age=0, clock=self.clock)
+
+    def test_dockerignore(self):
+        self._write(".dockerignore", "*.md\n!README.md\n/docs/**/*.tmp\n")
+        rules = read_dockerignore(self.context)
+        self.assertTrue(is_excluded("CHANGES.md", rules))
+        self.assertFalse(is_excluded("README.md", rules))
+        self.assertFalse(is_excluded("app/CHANGES.md", rules))
+        self.assertTrue(is_excluded("docs/a/b/c.tmp", rules))
+        self.assertTrue(is_excluded("docs/c.tmp", rules))
+        self.assertFalse(is_excluded("docs/c.txt", rules))
+
+    def test_fingerprint_changes_with_content(self):
+        value = self.fingerprints.fingerprint(self.context)
+        self.assertEqual(self.fingerprints.fingerprint(self.context), value)
+        self._write("app/views.py", "print('bye')\n")
+        self.assertNotEqual(self.fingerprints.fingerprint(self.context), value)
+
+    def test_fingerprint_ignores_excluded_files(self):
+        value = self.fingerprints.fingerprint(self.context)
+        self._write("node_modules/lib/index.js", "module.exports = []\n")
+        self._write("app/views.pyc", "binary")
+        self.assertEqual(self.fingerprints.fingerprint(self.context), value)
+        self.assertNotIn(
+            "node_modules/lib/index.js", self.fingerprints._files[self.context]
+        )
+
+    def test_fingerprint_ignores_dates(self):
+        value = self.fingerprints.fingerprint(self.context)
+        os.utime(os.path.join(self.context, "Dockerfile"), (5000, 5000))
+        self.assertEqual(self.fingerprints.fingerprint(self.context), value)
+
+    def test_cache_on_disk(self):
+        value = self.fingerprints.fingerprint(self.context)
+        self.assertTrue(os.path.exists(self.cache_path))
+
+        hashed = []
+        fingerprints = self._new_fingerprints()
+        original = fingerprints._hash_file
+
+        def _hash_file(entry):
+            hashed.append(entry.name)
+            return original(entry)
+
+        fingerprints._hash_file = _hash_file
+        self.assertEqual(fingerprints.fingerprint(self.context), value)
+        self.assertEqual(hashed, [])
+
+        self._write("app/views.py", "print('bye')\n")
+        fingerprints.fingerprint(self.context)
+        self.assertEqual(hashed, ["views.py"])
+
+    def test_max_age(self):
+        fingerprints = Fingerprints(
+            cache_path=self.cache_path, max_age=1, clock=self.clock
+        )
+        value = fingerprints.fingerprint(self.context)
+        self._write("app/views.py", "print('bye')\n")
+        self.assertEqual(fingerprints.fingerprint(self.context), value)
+        self.clock.now += 1
+        self.assertNotEqual(fingerprints.fingerprint(self.context), value)
+
+    def test_change_signal(self):
+        fingerprints = Fingerprints(
+            cache_path=self.cache_path, max_age=30, clock=self.clock
+        )
+        value = fingerprints.fingerprint(self.context, 1000.0)
+        self._write("app/views.py", "print('bye')\n")
+        self.assertEqual(fingerprints.fingerprint(self.context, 1000.0), value)
+        self.assertNotEqual(fingerprints.fingerprint(self.context, 2000.0), value)
+
+    def test_is_stale(self):
+        self.assertFalse(self.fingerprints.is_stale(self.context, "sha256:1"))
+        self._write("Dockerfile", "FROM python:3.7\n")
+        self.assertTrue(self.fingerprints.is_stale(self.context, "sha256:1"))
+        # The new image is recorded with current fingerprint.
+        self.assertFalse(self.fingerprints.is_stale(self.context, "sha256:2"))
+        # Recorded fingerprints are kept on disk.
+        self.assertTrue(self._new_fingerprints().is_stale(self.context, "sha256:1"))
@@ -0,0 +1,217 @@
+import os
+import tempfile
+from unittest import TestCase, mock
+
+from cabrita.components.cgroup import (
+    Cgroup,
+    CgroupInspect,
+    format_bytes,
+    read_net_dev,
+)
+
+CONTAINER_ID = "f3a1c2"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestCgroupInspect(TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.root = self.folder.name
+        self.clock = FakeClock()
+        self.snapshot = mock.Mock()
+        self.snapshot.services = {
+            "django": [
+                {"Id": CONTAINER_ID, "State": {"Running": True, "Pid": 4321}},
+                {"Id": "stopped", "State": {"Running": False, "Pid": 0}},
+            ]
+        }
+        self.cgroup = CgroupInspect(
+            compose=mock.Mock(),
+            interval=0,
+            snapshot=self.snapshot,
+            root=self.root,
+            proc_root=os.path.join(self.root, "proc"),
+            clock=self.clock,
+        )
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def _write(self, path, content):
+        path = os.path.join(self.root, path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as file:
+            file.write(content)
+
+    def _write_v2(self, usage_usec, memory):
+        self._write("cgroup.controllers", "cpu io memory\n")
+        folder = "system.slice/docker-{}.scope".format(CONTAINER_ID)
+        self._write(
+            os.path.join(folder, "cpu.stat"),
+            "usage_usec {}\nuser_usec 10\nsystem_usec 20\n".format(usage_usec),
+        )
+        self._write(os.path.join(folder, "memory.current"), "{}\n".format(memory))
+        self._write(
+            os.path.join(folder, "memory.stat"), "anon 100\ninactive_file 1048576\n"
+        )
+
+    def _write_net_dev(self, received, sent):
+        self._write(
+            "proc/4321/net/dev",
+            "Inter-|   Receive                            |  Transmit\n"
+            " face |bytes    packets errs drop fifo frame compressed multicast"
+            "|bytes    packets errs drop fifo colls carrier compressed\n"
+            "    lo:    9999      10    0    0    0     0          0         0"
+            "     9999      10    0    0    0     0       0          0\n"
+            "  eth0: {:>7}      10    0    0    0     0          0         0"
+            " {:>8}      10    0    0    0     0       0          0\n".format(
+                received, sent
+            ),
+        )
+
+    def _write_v1(self, usage_ns, memory):
+        folder = "docker/{}".format(CONTAINER_ID)
+        self._write(
+            os.path.join("cpuacct", folder, "cpuacct.usage"), "{}\n".format(usage_ns)
+        )
+        self._write(
+            os.path.join("memory", folder, "memory.usage_in_bytes"),
+            "{}\n".format(memory),
+        )
+        self._write(
+            os.path.join("memory", folder, "memory.stat"),
+            "cache 100\ntotal_inactive_file 1048576\n",
+        )
+
+    def test_format_bytes(self):
+        self.assertEqual(format_bytes(512), "512B")
+        self.assertEqual(format_bytes(1536), "1.5KiB")
+        self.assertEqual(format_bytes(300 * 1024 * 1024), "300.0MiB")
+        self.assertEqual(format_bytes(2048**3), "8.0GiB")
+
+    def test_find_cgroup(self):
+        self.assertIsNone(Cgroup.find(CONTAINER_ID, root=self.root))
+        self._write_v1(0, 0)
+        cgroup = Cgroup.find(CONTAINER_ID, root=self.root)
+        self.assertEqual(cgroup.version, 1)
+        self._write_v2(0, 0)
+        cgroup = Cgroup.find(CONTAINER_ID, root=self.root)
+        self.assertEqual(cgroup.version, 2)
+
+    def test_find_cgroup_from_process(self):
+        proc_root = os.path.join(self.root, "proc")
+        self.assertIsNone(Cgroup.find(CONTAINER_ID, 4321, self.root, proc_root))
+        self._write("proc/4321/cgroup", "0::/kubepods/pod1/{}\n".format(CONTAINER_ID))
+        cgroup = Cgroup.find(CONTAINER_ID, 4321, self.root, proc_root)
+        self.assertEqual(cgroup.version, 2)
+        self.assertEqual(
+            cgroup.folders["cpu"],
+            os.path.join(self.root, "kubepods/pod1", CONTAINER_ID),
+        )
+
+    def test_inspect_cgroup_v2(self):
+        self._write_v2(usage_usec=1000000, memory=101 * 1024 * 1024)
+        self.cgroup.inspect("django")
+        # CPU needs two samples.
+        status = self.cgroup.status("django")
+        self.assertEqual((status["cpu"], status["mem"]), ("--", "100.0MiB"))
+
+        self._write_v2(usage_usec=1500000, memory=101 * 1024 * 1024)
+        self.clock.now += 2
+        self.cgroup.inspect("django")
+        self.assertEqual(self.cgroup.status("django")["cpu"], "25.0%")
+
+    def test_inspect_cgroup_v1(self):
+        self._write_v1(usage_ns=0, memory=3 * 1024 * 1024)
+        self.cgroup.inspect("django")
+        self._write_v1(usage_ns=3 * 10**9, memory=3 * 1024 * 1024)
+        self.clock.now += 2
+        self.cgroup.inspect("django")
+        status = self.cgroup.status("django")
+        self.assertEqual((status["cpu"], status["mem"]), ("150.0%", "2.0MiB"))
+
+    def test_inspect_ring_buffer(self):
+        for second in range(8):
+            self._write_v1(usage_ns=second * 10**9, memory=0)
+            self.cgroup.inspect("django")
+            self.clock.now += 1
+        samples = self.cgroup._samples["django"][CONTAINER_ID]
+        self.assertEqual(len(samples), 5)
+        self.assertEqual(self.cgroup.status("django")["cpu"], "100.0%")
+
+    def test_read_net_dev(self):
+        self._write_net_dev(2048, 512)
+        self.assertEqual(
+            read_net_dev(4321, os.path.join(self.root, "proc")), (2048, 512)
+        )
+
+    def test_inspect_net_and_io_v2(self):
+        self._write_v2(usage_usec=0, memory=0)
+        folder = "system.slice/docker-{}.scope".format(CONTAINER_ID)
+        self._write(
+            os.path.join(folder, "io.stat"),
+            "8:0 rbytes=1024 wbytes=0 rios=1 wios=0 dbytes=0 dios=0\n",
+        )
+        self._write_net_dev(0, 0)
+        self.cgroup.inspect("django")
+
+        self._write(
+            os.path.join(folder, "io.stat"),
+            "8:0 rbytes=5120 wbytes=2048 rios=2 wios=1 dbytes=0 dios=0\n"
+            "8:16 rbytes=0 wbytes=2048 rios=0 wios=1 dbytes=0 dios=0\n",
+        )
+        self._write_net_dev(4096, 2048)
+        self.clock.now += 2
+        self.cgroup.inspect("django")
+        status = self.cgroup.status("django")
+        self.assertEqual(status["net"], "↓2.0KiB/s ↑1.0KiB/s")
+        self.assertEqual(status["io"], "r 2.0KiB/s w 2.0KiB/s")
+
+    def test_inspect_io_v1(self):
+        self._write_v1(usage_ns=0, memory=0)
+        path = "blkio/docker/{}/blkio.throttle.io_service_bytes".format(CONTAINER_ID)
+        self._write(path, "8:0 Read 0\n8:0 Write 0\nTotal 0\n")
+        self.cgroup.inspect("django")
+        self._write(path, "8:0 Read 600\n8:0 Write 1000\nTotal 1600\n")
+        self.clock.now += 2
+        self.cgroup.inspect("django")
+        self.assertEqual(self.cgroup.status("django")["io"], "r 300B/s w 500B/s")
+
+    def test_inspect_only_box_metrics(self):
+        self.cgroup.metrics = ["mem"]
+        self._write_v1(usage_ns=0, memory=3 * 1024 * 1024)
+        self.cgroup.inspect("django")
+        self.assertEqual(self.cgroup._samples["django"][CONTAINER_ID][0][1], {})
+        self.assertEqual(self.cgroup.status("django")["mem"], "2.0MiB")
+
+    def test_inspect_not_found(self):
+        self.cgroup.inspect("django")
+        empty = {"cpu": "--", "mem": "--", "net": "--", "io": "--"}
+        self.assertEqual(self.cgroup.status("django"), empty)
+        self.assertEqual(self.cgroup.status("flask"), empty)
+
+    def test_cgroup_cache_is_pruned(self):
+        self.snapshot.services["flask"] = [
+            {"Id": "removed", "State": {"Running": True, "Pid": 1234}}
+        ]
+        with mock.patch.object(Cgroup, "find", return_value=None) as find:
+            self.cgroup.inspect("django")
+            self.cgroup.inspect("flask")
+            self.cgroup.inspect("django")
+            self.assertEqual(find.call_count, 2)
+            self.assertEqual(
+                set(self.cgroup._cgroups), {(CONTAINER_ID, 4321), ("removed", 1234)}
+            )
+
+            del self.snapshot.services["flask"]
+            self.snapshot.services["django"][0]["State"]["Pid"] = 5678
+            self.cgroup.inspect("django")
+            self.assertEqual(find.call_count, 3)
+            self.assertEqual(set(self.cgroup._cgroups), {(CONTAINER_ID, 5678)})
@@ -0,0 +1,77 @@
+import threading
+import time
+from unittest import TestCase, mock
+
+from cabrita.abc.base import InspectTemplate
+from cabrita.components.collector import Collector
+
+
+class DummyInspect(InspectTemplate):
+    def inspect(self, service):
+        self._status[service] = "inspected {}".format(service)
+
+
+class TestCollector(TestCase):
+    def setUp(self):
+        self.collector = Collector(workers=2)
+
+    def tearDown(self):
+        self.collector.close()
+
+    def test_submit_runs_in_thread(self):
+        box = mock.Mock()
+        box.widget = "widget"
+        thread_ids = []
+        box.run.side_effect = lambda: thread_ids.append(threading.get_ident())
+
+        result = self.collector.submit(box)
+
+        self.assertEqual(result.get(5), "widget")
+        box.collect.assert_called_once()
+        self.assertNotEqual(thread_ids[0], threading.get_ident())
+
+    def test_inspector_state_is_kept(self):
+        inspector = DummyInspect(compose=None, interval=30)
+        inspector.inspect = mock.Mock(wraps=inspector.inspect)
+        box = mock.Mock()
+        box.collect.side_effect = lambda: inspector.collect("django")
+
+        self.collector.submit(box).get(5)
+        self.collector.submit(box).get(5)
+
+        inspector.inspect.assert_called_once_with("django")
+        self.assertEqual(inspector.status("django"), "inspected django")
+
+    def test_close_does_not_wait_running_updates(self):
+        release = threading.Event()
+        box = mock.Mock()
+        box.collect.side_effect = lambda: release.wait(5)
+        self.collector.submit(box)
+
+        start = time.monotonic()
+        self.collector.close()
+
+        self.assertLess(time.monotonic() - start, 1)
+        release.set()
+
+    def test_shared_inspector_runs_once(self):
+        inspector = DummyInspect(compose=None, interval=30)
+        release = threading.Event()
+        started = threading.Event()
+
+        def _inspect(service):
+            started.set()
+            release.wait(5)
+
+        inspector.inspect = mock.Mock(side_effect=_inspect)
+        first_box, second_box = mock.Mock(), mock.Mock()
+        first_box.collect.side_effect = lambda: inspector.collect("django")
+        second_box.collect.side_effect = lambda: inspector.collect("django")
+
+        first = self.collector.submit(first_box)
+        started.wait(5)
+        self.collector.submit(second_box).get(5)
+        release.set()
+        first.get(5)
+
+        inspector.inspect.assert_called_once_with("django")
@@ -1,6 +1,6 @@
 import os
 from pathlib import Path
-from unittest import TestCase
+from unittest import TestCase, mock
 
 from cabrita.components.config import Compose
 
@@ -130,3 +130,18 @@ class TestCompose(TestCase):
     def test_get_from_service(self):
         environment_dict = self.compose.get_from_service("django", "environment")
         self.assertDictEqual(environment_dict, {"DEBUG": "True"})
+
+
+class TestComposeProjectName(TestCase):
+    def setUp(self):
+        self.compose = Compose()
+        self.compose.add_path("/path/to/My.Project/docker-compose.yml")
+        self.compose.add_path("/path/to/override/docker-compose.override.yml")
+
+    @mock.patch.dict(os.environ, {}, clear=True)
+    def test_project_name(self):
+        self.assertEqual(self.compose.project_name, "myproject")
+
+    @mock.patch.dict(os.environ, {"COMPOSE_PROJECT_NAME": "Sheep_Dev"})
+    def test_project_name_from_environment(self):
+        self.assertEqual(self.compose.project_name, "sheep_dev")
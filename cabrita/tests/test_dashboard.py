@@ -1,13 +1,20 @@
 import contextlib
+import threading
+import time
+from datetime import datetime, timedelta
 from io import StringIO
 from unittest import TestCase, mock
 from unittest.mock import MagicMock, Mock
 
+from dashing import dashing
 from dashing.dashing import Split
 
+from cabrita.abc.scheduler import Scheduler
 from cabrita.components.box import Box
 from cabrita.components.config import Config
 from cabrita.components.dashboard import Dashboard
+from cabrita.components.docker import DockerInspect, PortDetail, PortView
+from cabrita.components.watchers import DockerComposeWatch, Watch
 from cabrita.tests import LATEST_CONFIG_PATH
 
 
@@ -65,11 +72,379 @@ class TestDashboard(TestCase):
         self.dashboard.add_box(self.box)
         self.assertTrue(len(self.dashboard.large_boxes), 1)
 
-    @mock.patch("cabrita.components.dashboard.Pool", autospec=True)
+    @mock.patch("cabrita.components.dashboard.Collector", autospec=True)
     def test__update_boxes(self, *mocks):
+        self.dashboard._update_boxes()
         self.dashboard._update_boxes()
         self.assertIsInstance(self.dashboard.user_watches.widget, MagicMock)
 
+    @mock.patch("cabrita.components.dashboard.Collector", autospec=True)
+    def test_collector_is_reused(self, mock_collector):
+        self.dashboard._update_boxes()
+        self.dashboard._update_boxes()
+        mock_collector.assert_called_once_with(workers=len(self.dashboard.all_boxes))
+        self.dashboard.close_collector()
+        mock_collector.return_value.close.assert_called_once()
+        self.assertIsNone(self.dashboard._collector)
+
     @mock.patch("blessed.Terminal")
     def test__get_layout(self, mock_terminal):
         self.assertIsInstance(self.dashboard._get_layout(mock_terminal), Split)
+
+
+class TestDashboardDeadlines(TestCase):
+    def setUp(self):
+        self.config = Config()
+        self.config.data = {"layout": "horizontal"}
+        self.dashboard = Dashboard(self.config)
+        self.dashboard.compose_watch = self._create_watch()
+        self.dashboard.user_watches = self._create_watch()
+        self.dashboard.system_watch = self._create_watch()
+        self.box = Box()
+        self.box.data = {"name": "Slow Box", "timeout": 5, "interval": 0}
+        self.dashboard.large_boxes.append(self.box)
+        self.results = {}
+        self.dashboard._collector = Mock()
+        self.dashboard._collector.submit.side_effect = self._submit
+
+    @staticmethod
+    def _create_watch():
+        watch = Box()
+        watch.data = {"interval": 0}
+        return watch
+
+    def _submit(self, box):
+        result = Mock()
+        result.ready.return_value = box is not self.box
+        result.get.return_value = box.widget
+        self.results[box] = result
+        return result
+
+    def test_fast_boxes_are_applied_while_slow_box_runs(self):
+        self.dashboard._update_boxes()
+        watch_result = self.results[self.dashboard.user_watches]
+        self.dashboard._update_boxes()
+        watch_result.get.assert_called_once_with(0)
+        self.assertIn(self.box, self.dashboard._in_flight)
+        self.assertEqual(
+            [
+                call[0][0] for call in self.dashboard._collector.submit.call_args_list
+            ].count(self.box),
+            1,
+        )
+
+    def test_slow_box_is_marked_stale_and_cancelled(self):
+        self.dashboard._update_boxes()
+        result, started_at = self.dashboard._in_flight[self.box]
+        self.dashboard._in_flight[self.box] = (
+            result,
+            started_at - timedelta(seconds=10),
+        )
+        self.dashboard._update_boxes()
+        self.assertTrue(self.box.cancelled)
+        self.assertIsNotNone(self.box.stale_since)
+        self.assertIn("stale since", self.box.widget.title)
+
+    def test_stale_marker_is_removed_on_new_data(self):
+        self.box.mark_stale()
+        self.dashboard._update_boxes()
+        self.results[self.box].ready.return_value = True
+        self.results[self.box].get.return_value = dashing.Text("new", title="Slow Box")
+        self.dashboard._update_boxes()
+        self.assertIsNone(self.box.stale_since)
+        self.assertEqual(self.box.widget.title, "Slow Box")
+
+
+class TestDashboardEventLoop(TestCase):
+    def setUp(self):
+        self.config = Config()
+        self.config.data = {"layout": "horizontal", "max_fps": 5}
+        self.dashboard = Dashboard(self.config)
+        self.dashboard.compose_watch = Box()
+        self.dashboard.user_watches = Box()
+        self.dashboard.system_watch = Box()
+        self.now = 0.0
+        self.dashboard.scheduler = Scheduler(clock=lambda: self.now, jitter=0)
+        self.dashboard._open_wakeup_pipe()
+        self.term = Mock(spec=["inkey", "width", "height"])
+
+    def tearDown(self):
+        self.dashboard._close_wakeup_pipe()
+
+    def test__schedule_boxes(self):
+        box = Box(docker=Mock(), git=Mock(), cgroup=Mock())
+        self.dashboard.large_boxes.append(box)
+        self.assertFalse(box.can_update)
+
+        self.dashboard._schedule_boxes()
+        self.assertIs(box.scheduler, self.dashboard.scheduler)
+        self.assertIs(box.docker.scheduler, self.dashboard.scheduler)
+        self.assertIs(box.cgroup.scheduler, self.dashboard.scheduler)
+        self.assertTrue(self.dashboard.scheduler.is_registered(box))
+        # Other dashboards use their own scheduler.
+        self.assertFalse(Dashboard(self.config).scheduler.is_registered(box))
+
+    def test__wait_for_event_timeout(self):
+        self.assertListEqual(self.dashboard._wait_for_event(self.term, 0.01), [])
+
+    def test__wait_for_event_notify(self):
+        self.dashboard._notify()
+        self.dashboard._notify()
+        start = time.monotonic()
+        self.dashboard._wait_for_event(self.term, 5)
+        self.assertLess(time.monotonic() - start, 1)
+        # Notifications are drained.
+        start = time.monotonic()
+        self.dashboard._wait_for_event(self.term, 0.05)
+        self.assertGreaterEqual(time.monotonic() - start, 0.04)
+
+    def test__seconds_to_next_update(self):
+        self.assertEqual(self.dashboard._seconds_to_next_update(), 1.0)
+        for box in self.dashboard.all_boxes:
+            box.data = {"interval": 10}
+        self.dashboard._schedule_boxes()
+        for box in self.dashboard.all_boxes:
+            self.assertFalse(box.can_update)
+        self.assertGreater(self.dashboard._seconds_to_next_update(), 9)
+        self.now = 10.0
+        self.assertEqual(self.dashboard._seconds_to_next_update(), 0)
+
+    def test_on_service_change(self):
+        box = Box(docker=Mock())
+        box.data = {"interval": 10}
+        self.dashboard.large_boxes.append(box)
+        self.dashboard._schedule_boxes()
+        self.assertFalse(box.can_update)
+        self.dashboard.scheduler.register((box.docker, "django"), 10, delay=10)
+
+        self.dashboard.on_service_change("redis")
+        self.assertFalse(box.can_update)
+
+        self.dashboard.on_service_change("django")
+        self.assertTrue(box.can_update)
+        self.assertTrue(self.dashboard.scheduler.is_due((box.docker, "django")))
+        start = time.monotonic()
+        self.dashboard._wait_for_event(self.term, 5)
+        self.assertLess(time.monotonic() - start, 1)
+
+    def test_on_service_change_with_strays(self):
+        snapshot = Mock(is_valid=True, strays=[])
+        watch = DockerComposeWatch(
+            config=Mock(), version="test", git=Mock(), snapshot=snapshot
+        )
+        watch.last_update = datetime.now()
+        self.dashboard.compose_watch = watch
+        self.dashboard._schedule_boxes()
+        self.assertFalse(watch.can_update)
+
+        self.dashboard.on_service_change("django")
+        self.assertFalse(watch.can_update)
+
+        snapshot.strays = [{"Name": "/sheep_celery_1", "State": {"Status": "running"}}]
+        self.dashboard.on_service_change("celery")
+        self.assertTrue(watch.can_update)
+
+    @mock.patch("cabrita.components.dashboard.LogTail")
+    def test__handle_log_key(self, tail_mock):
+        box = Box()
+        box._services = ["django", "redis"]
+        self.dashboard.large_boxes.append(box)
+        self.dashboard.docker_snapshot = Mock()
+        container = {"Id": "abc123", "State": {"Running": True}}
+        self.dashboard.docker_snapshot.services = {"django": [container]}
+        tail_mock.side_effect = lambda service, *args, **kwargs: Mock(service=service)
+
+        self.dashboard._handle_log_key("n")
+        self.assertIsNone(self.dashboard.log_tail)
+
+        self.dashboard._handle_log_key("l")
+        tail_mock.assert_called_once_with(
+            "django", container, lines=500, on_update=self.dashboard._notify
+        )
+        first_tail = self.dashboard.log_tail
+        first_tail.start.assert_called_once_with()
+
+        self.dashboard._handle_log_key("n")
+        first_tail.close.assert_called_once_with()
+        self.assertEqual(self.dashboard.log_tail.service, "redis")
+        self.assertEqual(tail_mock.call_args[0][1], None)
+        self.dashboard._handle_log_key("n")
+        self.assertEqual(self.dashboard.log_tail.service, "django")
+        self.dashboard._handle_log_key("b")
+        self.assertEqual(self.dashboard.log_tail.service, "redis")
+
+        last_tail = self.dashboard.log_tail
+        self.dashboard._handle_log_key("l")
+        last_tail.close.assert_called_once_with()
+        self.assertIsNone(self.dashboard.log_tail)
+
+    @mock.patch("cabrita.components.dashboard.LogTail")
+    def test__handle_detail_key(self, tail_mock):
+        box = Box()
+        box._services = ["django", "redis"]
+        self.dashboard.large_boxes.append(box)
+        self.dashboard.docker_snapshot = Mock()
+        self.dashboard.docker_snapshot.services = {}
+
+        self.dashboard._handle_detail_key("n")
+        self.assertIsNone(self.dashboard.detail_panel)
+
+        self.dashboard._handle_log_key("l")
+        log_tail = self.dashboard.log_tail
+        self.dashboard._handle_detail_key("d")
+        log_tail.close.assert_called_once_with()
+        self.assertIsNone(self.dashboard.log_tail)
+        self.assertEqual(self.dashboard.detail_panel.service, "django")
+        self.assertIs(
+            self.dashboard.detail_panel.snapshot, self.dashboard.docker_snapshot
+        )
+        self.assertIs(self.dashboard.detail_panel.cache, self.dashboard.detail_cache)
+
+        self.dashboard._handle_detail_key("n")
+        self.assertEqual(self.dashboard.detail_panel.service, "redis")
+        self.dashboard._handle_detail_key("b")
+        self.assertEqual(self.dashboard.detail_panel.service, "django")
+
+        self.dashboard._handle_log_key("l")
+        self.assertIsNone(self.dashboard.detail_panel)
+        self.dashboard._handle_log_key("l")
+        self.dashboard._handle_detail_key("d")
+        self.dashboard._handle_detail_key("d")
+        self.assertIsNone(self.dashboard.detail_panel)
+
+    @mock.patch("cabrita.components.dashboard.Renderer")
+    @mock.patch("cabrita.components.dashboard.Dashboard._get_layout")
+    @mock.patch("cabrita.components.dashboard.Dashboard._update_boxes")
+    def test__main_loop_redraws_only_when_needed(
+        self, update_mock, layout_mock, renderer_mock
+    ):
+        for box in self.dashboard.all_boxes:
+            box.data = {"interval": 10}
+        self.dashboard._schedule_boxes()
+        for box in self.dashboard.all_boxes:
+            self.assertFalse(box.can_update)
+        self.term.width, self.term.height = 80, 24
+        waits = []
+
+        def _wait(term, timeout):
+            waits.append(timeout)
+            if len(waits) == 3:
+                return ["q"]
+            return []
+
+        with mock.patch.object(self.dashboard, "_wait_for_event", side_effect=_wait):
+            with self.assertRaises(KeyboardInterrupt):
+                self.dashboard._main_loop(self.term)
+
+        renderer_mock.return_value.render.assert_called_once_with(
+            layout_mock.return_value, overlay=None
+        )
+        self.assertGreater(min(waits), 9)
+
+    @mock.patch("cabrita.components.dashboard.Renderer")
+    @mock.patch("cabrita.components.dashboard.Dashboard._get_layout")
+    @mock.patch("cabrita.components.dashboard.Dashboard._update_boxes")
+    def test__main_loop_toggles_hud(self, update_mock, layout_mock, renderer_mock):
+        self.config.data["max_fps"] = 1000
+        for box in self.dashboard.all_boxes:
+            box.data = {"interval": 10}
+        self.dashboard._schedule_boxes()
+        for box in self.dashboard.all_boxes:
+            self.assertFalse(box.can_update)
+        self.term.width, self.term.height = 80, 24
+        renderer_mock.return_value.last_render_time = 0.004
+        keys = [["p"], [], ["q"]]
+        waits = []
+
+        def _wait(term, timeout):
+            waits.append(timeout)
+            time.sleep(0.002)
+            return keys.pop(0)
+
+        with mock.patch.object(self.dashboard, "_wait_for_event", side_effect=_wait):
+            with self.assertRaises(KeyboardInterrupt):
+                self.dashboard._main_loop(self.term)
+
+        self.assertTrue(self.dashboard.show_hud)
+        render_calls = renderer_mock.return_value.render.call_args_list
+        self.assertEqual(len(render_calls), 2)
+        self.assertIsNone(render_calls[0][1]["overlay"])
+        overlay = render_calls[1][1]["overlay"]
+        self.assertIn("frame 4ms", overlay[0])
+        self.assertLessEqual(max(waits[1:]), 1.0)
+
+
+class TestDashboardHeadless(TestCase):
+    def setUp(self):
+        self.config = Config()
+        self.config.data = {"layout": "horizontal"}
+        self.dashboard = Dashboard(self.config)
+        self.dashboard.compose_watch = self._create_watch("Compose")
+        self.dashboard.user_watches = self._create_watch("Watchers")
+        self.dashboard.system_watch = self._create_watch("System")
+        self.dashboard._collector = Mock()
+        self.dashboard._collector.submit.side_effect = self._submit
+
+    @staticmethod
+    def _create_watch(title):
+        watch = Watch()
+        watch.widget = dashing.Text("\x1b[32mOK\x1b[22m", title=title)
+        return watch
+
+    @staticmethod
+    def _submit(box):
+        result = Mock()
+        result.ready.return_value = box.widget.title != "Watchers"
+        result.get.return_value = box.widget
+        return result
+
+    def test_collect_once(self):
+        self.dashboard.collect_once()
+        self.assertEqual(len(self.dashboard._collector.submit.call_args_list), 3)
+        self.assertDictEqual(self.dashboard._in_flight, {})
+        self.assertIsNotNone(self.dashboard.user_watches.stale_since)
+        self.assertIsNone(self.dashboard.system_watch.stale_since)
+
+    def test_snapshot(self):
+        snapshot = self.dashboard.snapshot()
+        self.assertTrue(snapshot["healthy"])
+        self.assertListEqual(snapshot["boxes"], [])
+        self.assertDictEqual(
+            snapshot["watchers"]["system"],
+            {"title": "System", "text": "OK", "healthy": True},
+        )
+        self.dashboard.user_watches.mark_stale()
+        self.assertFalse(self.dashboard.snapshot()["healthy"])
+
+    def test_collect_once_with_timed_out_box(self):
+        self.dashboard._collector = None
+        release = threading.Event()
+        docker = DockerInspect(
+            compose=Mock(),
+            interval=0,
+            port_view=PortView.hidden,
+            port_detail=PortDetail.external,
+            files_to_watch=[],
+            services_to_check_git=[],
+            snapshot=Mock(),
+        )
+        docker.inspect = Mock(side_effect=lambda service: release.wait(5))
+        box = Box(docker=docker, git=Mock())
+        box.data = {"name": "Slow Box", "timeout": 0.2, "show_git": False}
+        box._services = ["django"]
+        self.dashboard.large_boxes.append(box)
+
+        start = time.monotonic()
+        try:
+            self.dashboard.collect_once()
+        finally:
+            self.dashboard.close_collector()
+        self.assertLess(time.monotonic() - start, 1)
+
+        snapshot = self.dashboard.snapshot()
+        release.set()
+        self.assertFalse(snapshot["healthy"])
+        self.assertEqual(
+            snapshot["boxes"][0]["services"]["django"]["status"], "Unknown"
+        )
+        self.assertIsNotNone(snapshot["boxes"][0]["stale_since"])
@@ -0,0 +1,170 @@
+import json
+import threading
+from unittest import TestCase, mock
+
+from cabrita.components.details import (
+    DetailCache,
+    DetailPanel,
+    format_details,
+    state_key,
+)
+from cabrita.tests import INSPECT_DJANGO_CONTAINER
+
+IMAGE_ID = "sha256:f17b832c2c7e7449d763b8a7e78d1c95ce34f19fe75701f1314733d404809d5b"
+
+
+def _slim_container(status="running", pid=12248):
+    return {
+        "Id": "b075cee9bc12b262d99ff7068750acb3ac87ceadbffb0f4d040bb2f17521b7cc",
+        "Name": "/sheep_django_1",
+        "Image": IMAGE_ID,
+        "Config": {"Image": "django:dev", "Tty": False},
+        "State": {"Status": status, "Running": status == "running", "Pid": pid},
+    }
+
+
+class TestDetailPanel(TestCase):
+    def setUp(self):
+        self.full = json.loads(INSPECT_DJANGO_CONTAINER)[0]
+        self.full["RestartCount"] = 2
+        self.full["Mounts"] = [
+            {"Source": "/home/sheep/django", "Destination": "/app", "RW": True}
+        ]
+        self.full["State"]["Health"] = {
+            "Status": "healthy",
+            "FailingStreak": 0,
+            "Log": [
+                {
+                    "Start": "2018-05-15T19:05:00.123Z",
+                    "ExitCode": 0,
+                    "Output": "ok\n",
+                }
+            ],
+        }
+        self.client = mock.Mock(available=True)
+        self.client.inspect_container.return_value = self.full
+        self.client.inspect_image.return_value = {"RepoDigests": ["django@sha256:abc"]}
+        self.updated = threading.Event()
+        self.cache = DetailCache(
+            client=self.client, run=mock.Mock(), on_update=self.updated.set
+        )
+        self.snapshot = mock.Mock()
+        self.snapshot.services = {"django": [_slim_container()]}
+
+    def _lines(self, panel):
+        """Return panel lines, after the background fetch finishes."""
+        self.updated.clear()
+        lines = panel.lines()
+        if "  Fetching..." in lines:
+            self.assertTrue(self.updated.wait(5))
+            lines = panel.lines()
+        return lines
+
+    def test_format_details(self):
+        lines = format_details(self.full, "django@sha256:abc")
+        self.assertEqual(lines[0], "sheep_django_1 (b075cee9bc12)")
+        self.assertEqual(lines[1], "  Status: running  Exit code: 0  Restarts: 2")
+        self.assertEqual(lines[2], "  Image: django:dev django@sha256:abc")
+        self.assertEqual(lines[3], "  Health: healthy (failing streak 0)")
+        self.assertEqual(lines[4], "    2018-05-15T19:05:00 exit 0: ok")
+        self.assertIn("    /home/sheep/django -> /app (rw)", lines)
+        self.assertIn("  Environment:", lines)
+
+    def test_details_are_fetched_only_when_shown(self):
+        panel = DetailPanel("django", self.snapshot, self.cache)
+        self.client.inspect_container.assert_not_called()
+        self._lines(panel)
+        self._lines(panel)
+        self.client.inspect_container.assert_called_once_with(self.full["Id"])
+        self.client.inspect_image.assert_called_once_with(IMAGE_ID)
+
+    def test_cache_until_state_changes(self):
+        panel = DetailPanel("django", self.snapshot, self.cache)
+        self._lines(panel)
+        self.snapshot.services = {"django": [_slim_container(pid=999)]}
+        self._lines(panel)
+        self.assertEqual(self.client.inspect_container.call_count, 2)
+        self.snapshot.services = {"django": [_slim_container("exited", 0)]}
+        self._lines(panel)
+        self._lines(panel)
+        self.assertEqual(self.client.inspect_container.call_count, 3)
+        # Image digest does not change.
+        self.client.inspect_image.assert_called_once_with(IMAGE_ID)
+
+    def test_removed_containers_are_pruned(self):
+        self._lines(DetailPanel("django", self.snapshot, self.cache))
+        self.snapshot.services = {}
+        self.assertListEqual(
+            DetailPanel("django", self.snapshot, self.cache).lines(),
+            ["Container not found."],
+        )
+        self.assertDictEqual(self.cache._containers, {})
+
+    def test_full_snapshot_data_is_used(self):
+        self.snapshot.services = {"django": [self.full]}
+        self._lines(DetailPanel("django", self.snapshot, self.cache))
+        self.client.inspect_container.assert_not_called()
+
+    def test_command_line_fallback(self):
+        self.client.available = False
+        self.client.inspect_container.return_value = None
+        self.client.inspect_image.return_value = None
+        self.cache.run.side_effect = lambda args, **kwargs: (
+            INSPECT_DJANGO_CONTAINER if args[1] == "inspect" else False
+        )
+        lines = self._lines(DetailPanel("django", self.snapshot, self.cache))
+        self.cache.run.assert_any_call(
+            ["docker", "inspect", self.full["Id"]], get_stdout=True
+        )
+        self.assertEqual(lines[2], "  Image: django:dev --")
+
+    def test_failures_are_cached(self):
+        self.client.available = False
+        self.client.inspect_container.return_value = None
+        self.client.inspect_image.return_value = None
+        self.cache.run.return_value = False
+        panel = DetailPanel("django", self.snapshot, self.cache)
+        lines = self._lines(panel)
+        self.assertEqual(lines[2], "  Image: django:dev --")
+        self._lines(panel)
+        self.assertEqual(self.cache.run.call_count, 2)
+        self.snapshot.services = {"django": [_slim_container(pid=999)]}
+        self._lines(panel)
+        self.assertEqual(self.cache.run.call_count, 4)
+
+    def test_fetch_error_is_not_cached(self):
+        container = _slim_container()
+        key = state_key(container)
+        self.client.inspect_container.side_effect = RuntimeError("boom")
+        self.cache._fetching.add(key)
+        with self.assertRaises(RuntimeError):
+            self.cache._fetch(container, key)
+        self.assertNotIn(key, self.cache._fetching)
+        self.assertTrue(self.updated.is_set())
+        self.client.inspect_container.side_effect = None
+        lines = self._lines(DetailPanel("django", self.snapshot, self.cache))
+        self.assertIn("  Environment:", lines)
+
+    def test_fetch_does_not_block_render(self):
+        release = threading.Event()
+        self.client.inspect_container.side_effect = lambda _: (
+            release.wait(5) and self.full
+        )
+        panel = DetailPanel("django", self.snapshot, self.cache)
+        self.assertListEqual(
+            panel.lines(), ["sheep_django_1 (b075cee9bc12)", "  Fetching...", ""]
+        )
+        self.assertFalse(panel.changed)
+        panel.lines()
+        release.set()
+        self.assertTrue(self.updated.wait(5))
+        self.assertTrue(panel.changed)
+        self.assertIn("  Environment:", panel.lines())
+        self.client.inspect_container.assert_called_once_with(self.full["Id"])
+
+    def test_widget(self):
+        self._lines(DetailPanel("django", self.snapshot, self.cache))
+        widget = DetailPanel("django", self.snapshot, self.cache).widget()
+        self.assertFalse(widget.tail)
+        self.assertIn("Details: django", widget.title)
+        self.assertEqual(widget.lines[0], "sheep_django_1 (b075cee9bc12)")
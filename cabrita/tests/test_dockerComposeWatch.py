@@ -1,6 +1,7 @@
 from unittest import TestCase
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, Mock
 
+from cabrita.abc.utils import strip_ansi
 from cabrita.components.config import Config
 from cabrita.components.watchers import DockerComposeWatch
 from cabrita.tests import LATEST_CONFIG_PATH
@@ -28,3 +29,49 @@ class TestDockerComposeWatch(TestCase):
         )
         self.watch._execute()
         self.assertEqual(self.watch._widget.text, response)
+
+
+class TestDockerComposeWatchStrays(TestCase):
+    def setUp(self):
+        config = Mock(compose_files=[], title="Sheep")
+        self.snapshot = Mock(is_valid=True)
+        self.snapshot.strays = [
+            {
+                "Name": "/sheep_celery_1",
+                "Config": {"Labels": {"com.docker.compose.service": "celery"}},
+                "State": {"Status": "running"},
+            },
+            {
+                "Name": "/sheep_django_run_1",
+                "Config": {
+                    "Labels": {
+                        "com.docker.compose.service": "django",
+                        "com.docker.compose.oneoff": "True",
+                    }
+                },
+                "State": {"Status": "exited"},
+            },
+        ]
+        self.watch = DockerComposeWatch(
+            config=config, version="test", git=MagicMock(), snapshot=self.snapshot
+        )
+
+    def test_stray_containers(self):
+        self.assertTrue(self.watch.strays_changed)
+        self.watch._execute()
+        lines = strip_ansi(self.watch._widget.text).splitlines()
+        self.assertIn("Stray containers:", lines)
+        self.assertIn("sheep_celery_1      celery        running", lines)
+        self.assertIn("sheep_django_run_1  django (run)  exited", lines)
+        self.assertFalse(self.watch.strays_changed)
+
+        self.snapshot.strays = self.snapshot.strays[:1]
+        self.assertTrue(self.watch.strays_changed)
+
+    def test_no_stray_containers(self):
+        self.snapshot.strays = []
+        self.watch._execute()
+        self.assertNotIn("Stray", self.watch._widget.text)
+        self.snapshot.is_valid = False
+        self.snapshot.strays = [{"Name": "/sheep_celery_1"}]
+        self.assertFalse(self.watch.strays_changed)
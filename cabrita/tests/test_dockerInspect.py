@@ -1,10 +1,16 @@
-import json
+import datetime
+import os
+import tempfile
 from unittest import TestCase, mock
 
+from cabrita.abc.files import FileIndex
+from cabrita.abc.fingerprint import Fingerprints
 from cabrita.command import CabritaCommand
+from cabrita.components import PortDetail, PortView
+from cabrita.components.docker import DockerInspect, local_timezone
 from cabrita.tests import (
-    INSPECT_DJANGO_CONTAINER,
-    INSPECT_DJANGO_IMAGE,
+    INSPECT_DJANGO_CONTAINER_FORMAT,
+    INSPECT_DJANGO_IMAGE_FORMAT,
     LATEST_CONFIG_PATH,
 )
 
@@ -12,7 +18,7 @@ from cabrita.tests import (
 def return_run_data(*args, **kwargs):
     command = args[0]
     if "inspect" in command:
-        return INSPECT_DJANGO_IMAGE
+        return INSPECT_DJANGO_IMAGE_FORMAT
     if "log" in command:
         return "2018-05-17 11:03:46 -0300"
     return False
@@ -32,7 +38,7 @@ class TestDockerInspect(TestCase):
     def test_inspect(self, *mocks):
         def _return_inspect_data(*args, **kwargs):
             if "sheep_django_1" in args[0]:
-                return INSPECT_DJANGO_CONTAINER
+                return INSPECT_DJANGO_CONTAINER_FORMAT
             else:
                 return None
 
@@ -42,6 +48,8 @@ class TestDockerInspect(TestCase):
             "status": "Running",
             "style": "success",
             "theme": None,
+            "flapping": False,
+            "changes": 0,
         }
         self.docker.run = _return_inspect_data
         self.docker.inspect("django")
@@ -55,14 +63,22 @@ class TestDockerInspect(TestCase):
         test_name = self.docker._get_container_name("django")
         self.assertEqual(test_name, "sheep_django_1")
 
-    @mock.patch("cabrita.abc.utils.run_command", return_value=INSPECT_DJANGO_CONTAINER)
+    @mock.patch(
+        "cabrita.abc.runner.runner.run", return_value=INSPECT_DJANGO_CONTAINER_FORMAT
+    )
     def test__get_inspect_data(self, *mocks):
         test_name = self.docker._get_container_name("django")
         self.docker.run = mocks[0]
         test_data = self.docker._get_inspect_data(test_name)
-        self.assertEqual(test_data, json.loads(INSPECT_DJANGO_CONTAINER)[0])
+        self.assertEqual(test_data["Name"], "/sheep_django_1")
+        self.assertTrue(test_data["State"]["Running"])
+        self.assertEqual(
+            test_data["Config"]["Labels"]["com.docker.compose.service"], "django"
+        )
 
-    @mock.patch("cabrita.abc.utils.run_command", return_value=INSPECT_DJANGO_CONTAINER)
+    @mock.patch(
+        "cabrita.abc.runner.runner.run", return_value=INSPECT_DJANGO_CONTAINER_FORMAT
+    )
     def test__define_status(self, *mocks):
         test_name = self.docker._get_container_name("django")
         self.docker.run = mocks[0]
@@ -72,8 +88,12 @@ class TestDockerInspect(TestCase):
         self.assertEqual(test_style, "success")
         self.assertEqual(test_theme, None)
 
-    @mock.patch("cabrita.abc.utils.run_command", return_value=INSPECT_DJANGO_CONTAINER)
-    @mock.patch("cabrita.abc.utils.run_command", return_value=INSPECT_DJANGO_IMAGE)
+    @mock.patch(
+        "cabrita.abc.runner.runner.run", return_value=INSPECT_DJANGO_CONTAINER_FORMAT
+    )
+    @mock.patch(
+        "cabrita.abc.runner.runner.run", return_value=INSPECT_DJANGO_IMAGE_FORMAT
+    )
     def test__need_build_using_files(self, image_mock, container_mock):
         service_name = "django"
         test_name = self.docker._get_container_name(service_name)
@@ -82,8 +102,10 @@ class TestDockerInspect(TestCase):
         self.docker.run = image_mock
         self.assertFalse(self.docker._need_build(service_name, test_data))
 
-    @mock.patch("cabrita.abc.utils.run_command", return_value=INSPECT_DJANGO_CONTAINER)
-    @mock.patch("cabrita.abc.utils.run_command", side_effect=return_run_data)
+    @mock.patch(
+        "cabrita.abc.runner.runner.run", return_value=INSPECT_DJANGO_CONTAINER_FORMAT
+    )
+    @mock.patch("cabrita.abc.runner.runner.run", side_effect=return_run_data)
     def test__need_build_using_git(self, run_mock, container_mock):
         service_name = "flask"
         test_name = self.docker._get_container_name(service_name)
@@ -91,3 +113,141 @@ class TestDockerInspect(TestCase):
         test_data = self.docker._get_inspect_data(test_name)
         self.docker.run = run_mock
         self.assertTrue(self.docker._need_build(service_name, test_data))
+
+
+class TestDockerInspectFlapping(TestCase):
+    def setUp(self):
+        self.now = 0.0
+        self.snapshot = mock.Mock()
+        self.snapshot.refresh.return_value = True
+        self.docker = DockerInspect(
+            compose=mock.Mock(),
+            interval=1,
+            port_view=PortView.hidden,
+            port_detail=PortDetail.external,
+            files_to_watch=[],
+            services_to_check_git=[],
+            snapshot=self.snapshot,
+            clock=lambda: self.now,
+        )
+        self.docker._get_service_ports = mock.Mock(return_value="")
+        self.docker._need_build = mock.Mock(return_value=False)
+
+    def _inspect(self, status="running", pid=100, health=None):
+        state = {"Status": status, "Running": True, "Paused": False, "Pid": pid}
+        if health:
+            state["Health"] = {"Status": health, "FailingStreak": 0}
+        self.snapshot.services = {"django": [{"State": state}]}
+        with mock.patch("cabrita.components.docker.persist_on_disk"):
+            self.docker.inspect("django")
+        self.now += 10
+        return self.docker.status("django")
+
+    def test_stable_service(self):
+        for _ in range(10):
+            status = self._inspect()
+        self.assertFalse(status["flapping"])
+        self.assertEqual(status["changes"], 0)
+
+    def test_restart_loop(self):
+        # Same status in each poll, but a new main process each time.
+        for pid in range(100, 104):
+            status = self._inspect(pid=pid)
+        self.assertEqual(status["changes"], 3)
+        self.assertFalse(status["flapping"])
+        status = self._inspect(pid=104)
+        self.assertTrue(status["flapping"])
+        self.assertEqual(status["status"], "Running")
+
+    def test_health_flipping(self):
+        for health in ["healthy", "unhealthy"] * 3:
+            status = self._inspect(health=health)
+        self.assertTrue(status["flapping"])
+
+    def test_changes_out_of_window(self):
+        for pid in range(100, 105):
+            self._inspect(pid=pid)
+        self.now += DockerInspect.flap_window
+        status = self._inspect(pid=104)
+        self.assertFalse(status["flapping"])
+        self.assertEqual(len(self.docker._history["django"]), 4)
+
+
+class TestDockerInspectFingerprint(TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.context = os.path.join(self.folder.name, "django")
+        os.makedirs(self.context)
+        self.dockerfile = os.path.join(self.context, "Dockerfile")
+        with open(self.dockerfile, "w") as handler:
+            handler.write("FROM python:3.6\n")
+        os.utime(self.dockerfile, (1000, 1000))
+        compose = mock.Mock()
+        compose.get_facts.return_value = mock.Mock(build_path=self.context)
+        snapshot = mock.Mock()
+        snapshot.image_dates = {
+            "sha256:1": datetime.datetime.fromtimestamp(2000, tz=local_timezone())
+        }
+        self.docker = DockerInspect(
+            compose=compose,
+            interval=1,
+            port_view=PortView.hidden,
+            port_detail=PortDetail.external,
+            files_to_watch=["Dockerfile"],
+            services_to_check_git=[],
+            snapshot=snapshot,
+            use_fingerprint=True,
+        )
+        self.docker.files = FileIndex(use_inotify=False, poll_interval=0)
+        self.docker.fingerprints = Fingerprints(
+            cache_path=os.path.join(self.folder.name, "fingerprints.json"),
+            max_age=30,
+        )
+        self.inspect_data = {
+            "Image": "sha256:1",
+            "Config": {
+                "Image": "django",
+                "Labels": {"com.docker.compose.service": "django"},
+            },
+        }
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def test_touched_file_does_not_need_build(self):
+        self.assertFalse(self.docker._need_build("django", self.inspect_data))
+        os.utime(self.dockerfile, None)
+        self.assertFalse(self.docker._need_build("django", self.inspect_data))
+
+    def test_changed_file_needs_build(self):
+        self.assertFalse(self.docker._need_build("django", self.inspect_data))
+        with open(self.dockerfile, "w") as handler:
+            handler.write("FROM python:3.7\n")
+        self.assertTrue(self.docker._need_build("django", self.inspect_data))
+
+    def test_context_is_walked_only_after_change(self):
+        self.assertFalse(self.docker._need_build("django", self.inspect_data))
+        with open(os.path.join(self.context, "app.py"), "w") as handler:
+            handler.write("print('bye')\n")
+        self.assertFalse(self.docker._need_build("django", self.inspect_data))
+        with open(self.dockerfile, "w") as handler:
+            handler.write("FROM python:3.7\n")
+        self.assertTrue(self.docker._need_build("django", self.inspect_data))
+
+    def test_service_without_build_does_not_inspect_image(self):
+        self.docker.compose.get_facts.return_value = mock.Mock(build_path=None)
+        self.docker.snapshot.image_dates = {}
+        self.docker.engine = mock.Mock()
+        self.docker.run = mock.Mock()
+        self.assertFalse(self.docker._need_build("django", self.inspect_data))
+        self.docker.engine.inspect_image.assert_not_called()
+        self.docker.run.assert_not_called()
+
+    def test_missing_image_does_not_need_build(self):
+        self.docker.snapshot.image_dates = {}
+        self.docker.services_to_check_git = ["django"]
+        self.docker.engine = mock.Mock(available=True)
+        self.docker.engine.inspect_image.return_value = None
+        self.docker.run = mock.Mock(return_value="2018-02-23 18:31:45 -0300")
+        self.assertFalse(self.docker._need_build("django", self.inspect_data))
+        self.docker.run.assert_not_called()
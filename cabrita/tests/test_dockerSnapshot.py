@@ -0,0 +1,293 @@
+import json
+from unittest import TestCase, mock
+
+from cabrita.abc.engine import RETRY_INTERVAL
+from cabrita.components.docker import (
+    CONTAINER_FIELDS,
+    IMAGE_FIELDS,
+    DockerSnapshot,
+    inspect_format,
+    parse_inspect_output,
+)
+from cabrita.tests import (
+    INSPECT_DJANGO_CONTAINER,
+    INSPECT_DJANGO_CONTAINER_FORMAT,
+    INSPECT_DJANGO_IMAGE,
+    INSPECT_DJANGO_IMAGE_FORMAT,
+)
+
+IMAGE_ID = "sha256:f17b832c2c7e7449d763b8a7e78d1c95ce34f19fe75701f1314733d404809d5b"
+CONTAINER_INSPECT = ["docker", "inspect", "--format", inspect_format(CONTAINER_FIELDS)]
+IMAGE_INSPECT = ["docker", "image", "inspect", "--format", inspect_format(IMAGE_FIELDS)]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeStream(list):
+    closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class TestDockerSnapshot(TestCase):
+    def setUp(self):
+        self.compose = mock.Mock()
+        self.compose.project_name = "sheep"
+        self.compose.services = ["django", "redis"]
+        self.compose.is_image.side_effect = lambda service: service != "django"
+        self.clock = FakeClock()
+        self.engine = mock.Mock(available=False)
+        self.snapshot = DockerSnapshot(
+            self.compose, max_age=1.0, clock=self.clock, client=self.engine
+        )
+        self.calls = []
+
+    def fake_run(self, args, get_stdout=False, **kwargs):
+        self.calls.append(args)
+        if args[:2] == ["docker", "ps"]:
+            return "sheep_django_1\nsheep_django_2\n"
+        if args[:3] == ["docker", "image", "inspect"]:
+            return INSPECT_DJANGO_IMAGE_FORMAT
+        if args[:2] == ["docker", "inspect"]:
+            return INSPECT_DJANGO_CONTAINER_FORMAT
+        return False
+
+    def test_refresh(self):
+        self.assertTrue(self.snapshot.refresh(self.fake_run))
+        self.assertListEqual(
+            self.calls,
+            [
+                [
+                    "docker",
+                    "ps",
+                    "-a",
+                    "--filter",
+                    "label=com.docker.compose.project=sheep",
+                    "--format",
+                    "{{.Names}}",
+                ],
+                CONTAINER_INSPECT + ["sheep_django_1", "sheep_django_2"],
+                IMAGE_INSPECT + [IMAGE_ID],
+            ],
+        )
+        self.assertListEqual(list(self.snapshot.containers), ["sheep_django_1"])
+        self.assertListEqual(list(self.snapshot.image_dates), [IMAGE_ID])
+
+    def test_parse_inspect_output(self):
+        container = json.loads(INSPECT_DJANGO_CONTAINER)[0]
+        data = parse_inspect_output(INSPECT_DJANGO_CONTAINER_FORMAT, CONTAINER_FIELDS)
+        self.assertEqual(len(data), 1)
+        for key in ["Id", "Name", "Image"]:
+            self.assertEqual(data[0][key], container[key])
+        for key in ["Status", "Running", "Paused", "Pid"]:
+            self.assertEqual(data[0]["State"][key], container["State"][key])
+        self.assertNotIn("Health", data[0]["State"])
+        self.assertEqual(data[0]["Config"]["Tty"], False)
+        self.assertDictEqual(
+            data[0]["Config"]["Labels"],
+            {
+                "com.docker.compose.service": "django",
+                "com.docker.compose.oneoff": "False",
+                "com.docker.compose.container-number": "1",
+            },
+        )
+
+    def test_parse_inspect_output_with_health(self):
+        line = "\t".join(
+            ["abc", "/sheep_redis_1", IMAGE_ID, "redis", "true", "running"]
+            + ["true", "false", "42", "unhealthy", "4", "redis", "False", "1"]
+        )
+        data = parse_inspect_output(line + "\n\n", CONTAINER_FIELDS)
+        self.assertEqual(len(data), 1)
+        self.assertDictEqual(
+            data[0]["State"]["Health"], {"Status": "unhealthy", "FailingStreak": 4}
+        )
+        self.assertTrue(data[0]["Config"]["Tty"])
+
+    def test_refresh_uses_max_age(self):
+        self.snapshot.refresh(self.fake_run)
+        self.snapshot.refresh(self.fake_run)
+        self.assertEqual(len(self.calls), 3)
+        self.clock.now += 1.0
+        self.snapshot.refresh(self.fake_run)
+        # Image date is cached by image ID.
+        self.assertEqual(len(self.calls), 5)
+
+    def test_image_date_is_removed_with_old_image(self):
+        self.snapshot.refresh(self.fake_run)
+        self.assertEqual(
+            self.snapshot.image_dates[IMAGE_ID].isoformat()[:26],
+            "2018-05-15T15:53:56.199420",
+        )
+        container = json.loads(INSPECT_DJANGO_CONTAINER)[0]
+        container["Image"] = "sha256:new"
+        self.snapshot._set_data([container], [])
+        self.assertDictEqual(self.snapshot.image_dates, {})
+
+    def test_refresh_in_batches(self):
+        self.snapshot.batch_size = 1
+        self.snapshot.refresh(self.fake_run)
+        inspect_calls = [args for args in self.calls if "inspect" in args]
+        self.assertListEqual(
+            inspect_calls,
+            [
+                CONTAINER_INSPECT + ["sheep_django_1"],
+                CONTAINER_INSPECT + ["sheep_django_2"],
+                IMAGE_INSPECT + [IMAGE_ID],
+            ],
+        )
+
+    def test_refresh_failure(self):
+        self.assertFalse(self.snapshot.refresh(lambda *args, **kwargs: False))
+        self.assertFalse(self.snapshot.is_valid)
+
+    def test_refresh_from_engine(self):
+        container = json.loads(INSPECT_DJANGO_CONTAINER)[0]
+        self.engine.available = True
+        self.engine.containers.return_value = [{"Id": container["Id"]}]
+        self.engine.inspect_container.return_value = container
+        self.engine.inspect_image.return_value = json.loads(INSPECT_DJANGO_IMAGE)[0]
+        self.assertTrue(self.snapshot.refresh(self.fake_run))
+        self.engine.containers.assert_called_once_with("sheep")
+        self.engine.inspect_container.assert_called_once_with(container["Id"])
+        self.assertListEqual(self.calls, [])
+        self.assertListEqual(list(self.snapshot.containers), ["sheep_django_1"])
+        self.engine.inspect_image.assert_called_once_with(IMAGE_ID)
+        self.assertListEqual(list(self.snapshot.image_dates), [IMAGE_ID])
+
+    def test_refresh_engine_failure_uses_cli(self):
+        self.engine.available = True
+        self.engine.containers.return_value = None
+        self.assertTrue(self.snapshot.refresh(self.fake_run))
+        self.assertEqual(len(self.calls), 3)
+
+    def _event(self, action, name="sheep_django_1"):
+        return {
+            "Action": action,
+            "Actor": {
+                "ID": "abc123",
+                "Attributes": {"name": name, "com.docker.compose.service": "django"},
+            },
+        }
+
+    def test_follow_events(self):
+        container = json.loads(INSPECT_DJANGO_CONTAINER)[0]
+        self.engine.available = True
+        self.engine.containers.return_value = []
+        self.engine.inspect_container.return_value = container
+        stream = FakeStream([self._event("start"), self._event("destroy")])
+        changed = []
+
+        def _events(filters):
+            if stream.closed:
+                self.snapshot.close()
+                return None
+            self.assertListEqual(filters["label"], ["com.docker.compose.project=sheep"])
+            return stream
+
+        def _listener(service):
+            changed.append((service, list(self.snapshot.containers)))
+            # Stream is open long enough to reconnect at once.
+            self.clock.now += RETRY_INTERVAL
+
+        self.engine.events.side_effect = _events
+        self.snapshot._listeners.append(_listener)
+        self.snapshot._follow_events()
+
+        self.assertTrue(stream.closed)
+        self.assertFalse(self.snapshot.following)
+        self.assertListEqual(
+            changed,
+            [
+                ("django", []),
+                ("redis", []),
+                ("django", ["sheep_django_1"]),
+                ("django", []),
+            ],
+        )
+        self.engine.inspect_container.assert_called_once_with("abc123")
+
+    def test_follow_events_waits_after_failed_resync(self):
+        self.engine.available = True
+        self.engine.containers.return_value = None
+        streams = []
+
+        def _events(filters):
+            streams.append(FakeStream())
+            return streams[-1]
+
+        self.engine.events.side_effect = _events
+        self.snapshot._closed = mock.Mock()
+        self.snapshot._closed.is_set.side_effect = [False, False, True]
+        self.snapshot._follow_events()
+
+        self.assertEqual(len(streams), 2)
+        self.assertTrue(all(stream.closed for stream in streams))
+        self.assertListEqual(
+            self.snapshot._closed.wait.call_args_list,
+            [mock.call(RETRY_INTERVAL), mock.call(RETRY_INTERVAL)],
+        )
+        self.assertFalse(self.snapshot.following)
+
+    def test_follow_events_waits_after_short_stream(self):
+        self.engine.available = True
+        self.engine.containers.return_value = []
+        self.engine.events.return_value = FakeStream()
+        self.snapshot._closed = mock.Mock()
+        self.snapshot._closed.is_set.side_effect = [False, True]
+        self.snapshot._follow_events()
+
+        self.snapshot._closed.wait.assert_called_once_with(RETRY_INTERVAL)
+
+    def test_refresh_while_following_events(self):
+        self.snapshot.refresh(self.fake_run)
+        self.snapshot.following = True
+        self.clock.now += 10
+        self.snapshot.refresh(self.fake_run)
+        self.assertEqual(len(self.calls), 3)
+        self.clock.now += self.snapshot.resync_interval
+        self.snapshot.refresh(self.fake_run)
+        self.assertEqual(len(self.calls), 5)
+
+    def test_services(self):
+        def _container(number, oneoff="False", service="django"):
+            return {
+                "Name": "/sheep_{}_{}".format(service, number),
+                "Image": IMAGE_ID,
+                "Config": {
+                    "Image": "django:dev",
+                    "Labels": {
+                        "com.docker.compose.service": service,
+                        "com.docker.compose.container-number": str(number),
+                        "com.docker.compose.oneoff": oneoff,
+                    },
+                },
+            }
+
+        containers = [
+            _container(2),
+            _container(1),
+            _container(3, oneoff="True"),
+            _container(1, service="celery"),
+        ]
+        self.engine.available = True
+        self.engine.containers.return_value = [{"Id": n} for n in range(4)]
+        self.engine.inspect_container.side_effect = containers
+        self.engine.inspect_image.return_value = {}
+        self.snapshot.refresh(self.fake_run)
+        self.assertListEqual(
+            [data["Name"] for data in self.snapshot.services["django"]],
+            ["/sheep_django_1", "/sheep_django_2"],
+        )
+        self.assertListEqual(
+            [data["Name"] for data in self.snapshot.strays],
+            ["/sheep_celery_1", "/sheep_django_3"],
+        )
+        self.assertNotIn("celery", self.snapshot.services)
@@ -0,0 +1,204 @@
+import json
+import os
+import socketserver
+import struct
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler
+from unittest import TestCase
+from urllib.parse import parse_qs, urlparse
+
+from cabrita.abc.engine import EngineClient
+
+CONTAINER = {"Id": "abc123", "Name": "/sheep_django_1", "Config": {"Image": "django"}}
+EVENTS = [
+    {"Type": "container", "Action": "die", "Actor": {"ID": "abc123"}},
+    {"Type": "container", "Action": "start", "Actor": {"ID": "abc123"}},
+]
+LOG_FRAMES = [
+    (1, b"Starting server\nListen"),
+    (2, b"ing on 8000\n" + b"x" * 5000 + b"\n"),
+    (1, b"GET / 200\r\n"),
+]
+
+
+class FakeEngineHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.server.paths.append(self.path)
+        url = urlparse(self.path)
+        routes = {
+            "/containers/json": [CONTAINER],
+            "/containers/sheep_django_1/json": CONTAINER,
+            "/images/django:dev/json": {"Id": "sha256:123"},
+            "/system/df": {"LayersSize": 10},
+        }
+        if url.path == "/events":
+            self.send_events()
+            return
+        if url.path == "/containers/abc123/logs":
+            self.send_logs()
+            return
+        if url.path not in routes:
+            body = b'{"message": "No such object"}'
+            self.send_response(404)
+        else:
+            data = routes[url.path]
+            body = data.encode() if isinstance(data, str) else json.dumps(data).encode()
+            self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_events(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for event in EVENTS:
+            line = json.dumps(event).encode() + b"\n"
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(line), line))
+            self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+
+    def send_logs(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/vnd.docker.raw-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for stream_type, data in LOG_FRAMES:
+            frame = struct.pack(">BxxxL", stream_type, len(data)) + data
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(frame), frame))
+            self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+
+    def log_message(self, *args):
+        pass
+
+
+class FakeEngine(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path):
+        super(FakeEngine, self).__init__(path, FakeEngineHandler)
+        self.paths = []
+        self.connections = 0
+
+    def process_request(self, request, client_address):
+        self.connections += 1
+        super(FakeEngine, self).process_request(request, client_address)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestEngineClient(TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.socket_path = os.path.join(self.folder.name, "docker.sock")
+        self.server = FakeEngine(self.socket_path)
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, kwargs={"poll_interval": 0.01}
+        )
+        self.thread.start()
+        self.clock = FakeClock()
+        self.client = EngineClient(
+            host="unix://{}".format(self.socket_path), clock=self.clock
+        )
+
+    def tearDown(self):
+        self.client.close()
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+        self.folder.cleanup()
+
+    def test_host_from_environment(self):
+        os.environ["DOCKER_HOST"] = "tcp://127.0.0.1:2375"
+        try:
+            self.assertEqual(EngineClient().host, "tcp://127.0.0.1:2375")
+        finally:
+            del os.environ["DOCKER_HOST"]
+
+    def test_containers(self):
+        self.assertListEqual(self.client.containers("sheep"), [CONTAINER])
+        query = parse_qs(urlparse(self.server.paths[0]).query)
+        self.assertEqual(query["all"], ["1"])
+        self.assertDictEqual(
+            json.loads(query["filters"][0]),
+            {"label": ["com.docker.compose.project=sheep"]},
+        )
+
+    def test_inspect(self):
+        self.assertDictEqual(self.client.inspect_container("sheep_django_1"), CONTAINER)
+        self.assertDictEqual(
+            self.client.inspect_image("django:dev"), {"Id": "sha256:123"}
+        )
+        self.assertDictEqual(self.client.system_df(), {"LayersSize": 10})
+
+    def test_not_found(self):
+        self.assertIsNone(self.client.inspect_container("not_found"))
+        self.assertTrue(self.client.available)
+
+    def test_keep_alive(self):
+        for _ in range(5):
+            self.client.inspect_container("sheep_django_1")
+        self.assertEqual(self.server.connections, 1)
+        self.assertEqual(self.client.requests, 5)
+
+    def test_reconnect(self):
+        self.client.inspect_container("sheep_django_1")
+        # Simulate a keep-alive connection closed by engine.
+        self.client._connection.sock.close()
+        self.assertDictEqual(self.client.inspect_container("sheep_django_1"), CONTAINER)
+        self.assertEqual(self.server.connections, 2)
+
+    def test_engine_not_available(self):
+        client = EngineClient(
+            host="unix://{}".format(os.path.join(self.folder.name, "missing.sock")),
+            clock=self.clock,
+        )
+        self.assertIsNone(client.system_df())
+        self.assertFalse(client.available)
+        self.assertIsNone(client.system_df())
+        self.assertEqual(client.requests, 1)
+        self.clock.now += 30
+        self.assertTrue(client.available)
+
+    def test_events(self):
+        stream = self.client.events({"type": ["container"]})
+        self.assertListEqual(list(stream), EVENTS)
+        stream.close()
+        query = parse_qs(urlparse(self.server.paths[0]).query)
+        self.assertDictEqual(json.loads(query["filters"][0]), {"type": ["container"]})
+        # Events use their own connection.
+        self.client.inspect_container("sheep_django_1")
+        self.assertEqual(self.server.connections, 2)
+
+    def test_events_not_available(self):
+        client = EngineClient(
+            host="unix://{}".format(os.path.join(self.folder.name, "missing.sock")),
+            clock=self.clock,
+        )
+        self.assertIsNone(client.events({"type": ["container"]}))
+        self.assertFalse(client.available)
+
+    def test_logs(self):
+        stream = self.client.logs("abc123", tail=100)
+        lines = list(stream)
+        stream.close()
+        self.assertListEqual(
+            lines,
+            ["Starting server", "Listening on 8000", "x" * 4096, "GET / 200"],
+        )
+        query = parse_qs(urlparse(self.server.paths[0]).query)
+        self.assertEqual(query["follow"], ["1"])
+        self.assertEqual(query["tail"], ["100"])
+        self.assertIsNone(self.client.logs("not_found", tail=100))
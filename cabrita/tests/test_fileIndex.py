@@ -0,0 +1,89 @@
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from unittest import TestCase
+
+from cabrita.abc.files import FileIndex
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestFileIndex(TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.context = self.folder.name
+        os.makedirs(os.path.join(self.context, "requirements"))
+        self._touch("requirements.txt", 1000)
+        self._touch("requirements/base.txt", 2000)
+        self.clock = FakeClock()
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def _touch(self, file, mtime):
+        path = os.path.join(self.context, file)
+        with open(path, "w") as handler:
+            handler.write("django\n")
+        os.utime(path, (mtime, mtime))
+
+    def test_newest(self):
+        index = FileIndex(use_inotify=False, clock=self.clock)
+        self.assertIsNone(index.newest(self.context))
+        index.watch(self.context, ["requirements.txt", "requirements/base.txt"])
+        self.assertEqual(index.newest(self.context), 2000)
+        self.assertEqual(index.newest(self.context, ["requirements.txt"]), 1000)
+        self.assertIsNone(index.newest(self.context, ["Pipfile"]))
+
+    def test_polling(self):
+        index = FileIndex(use_inotify=False, poll_interval=2, clock=self.clock)
+        index.watch(self.context, ["requirements.txt", "Pipfile"])
+        self._touch("Pipfile", 3000)
+        # Files are checked again only after the poll interval.
+        self.assertEqual(index.newest(self.context), 1000)
+        self.clock.now += 2
+        self.assertEqual(index.newest(self.context), 3000)
+
+    def test_watch_adds_new_files(self):
+        index = FileIndex(use_inotify=False, clock=self.clock)
+        index.watch(self.context, ["requirements.txt"])
+        index.watch(self.context, ["requirements.txt", "requirements/base.txt"])
+        self.assertEqual(index.newest(self.context), 2000)
+
+    @unittest.skipUnless(sys.platform.startswith("linux"), "inotify needs Linux")
+    def test_inotify(self):
+        index = FileIndex(clock=self.clock)
+        changed = threading.Event()
+        contexts = []
+
+        def _listener(context):
+            contexts.append(context)
+            changed.set()
+
+        index.subscribe(_listener)
+        try:
+            index.watch(self.context, ["requirements.txt", "requirements/base.txt"])
+            self.assertIsNotNone(index._inotify)
+            # Save the file like editors do: write a copy and rename it.
+            self._touch("base.txt.tmp", 5000)
+            os.rename(
+                os.path.join(self.context, "base.txt.tmp"),
+                os.path.join(self.context, "requirements/base.txt"),
+            )
+            self.assertTrue(changed.wait(5))
+            self.assertEqual(index.newest(self.context), 5000)
+            self.assertEqual(contexts[0], self.context)
+
+            changed.clear()
+            os.remove(os.path.join(self.context, "requirements/base.txt"))
+            self.assertTrue(changed.wait(5))
+            self.assertEqual(index.newest(self.context), 1000)
+        finally:
+            index.close()
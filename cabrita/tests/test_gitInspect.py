@@ -9,6 +9,10 @@ def return_git_result(*args, **kwargs) -> Union[str, bool]:
     command = args[0]
     if "describe" in command:
         return "2.0.1"
+    if "rev-list" in command:
+        return "457ac8c"
+    if "fetch" in command:
+        return True
     if "rev-parse" in command:
         return "457ac8c"
     if "branch" in command:
@@ -39,27 +43,27 @@ class TestGitInspect(TestCase):
         command.prepare_dashboard()
         cls.git = command.dashboard.all_boxes[-1].git
 
-    @mock.patch("cabrita.abc.utils.run_command", side_effect=return_git_result)
+    @mock.patch("cabrita.abc.runner.runner.run", side_effect=return_git_result)
     def test_get_git_revision_from_path(self, *mocks):
         self.git.run = mocks[0]
         test_string = self.git.get_git_revision_from_path(path="/", show_branch=True)
         self.assertEqual(test_string, "✎ 2.0.1")
 
-    @mock.patch("cabrita.abc.utils.run_command", side_effect=return_git_result)
+    @mock.patch("cabrita.abc.runner.runner.run", side_effect=return_git_result)
     def test_get_git_revision(self, *mocks):
         self.git.run = mocks[0]
         test_revision = self.git.get_git_revision("django")
         self.assertEqual(test_revision, "✎ 2.0.1")
 
     @mock.patch("os.path.isdir", return_value=True)
-    @mock.patch("cabrita.abc.utils.run_command", side_effect=return_git_result)
+    @mock.patch("cabrita.abc.runner.runner.run", side_effect=return_git_result)
     def test_get_behind_state(self, *mocks):
         self.git.run = mocks[0]
         test_behind = self.git.get_behind_state("/")
         self.assertEqual(test_behind, "[31mNEED PULL[22m")
 
     @mock.patch("cabrita.components.git.persist_on_disk")
-    @mock.patch("cabrita.abc.utils.run_command", side_effect=return_git_result)
+    @mock.patch("cabrita.abc.runner.runner.run", side_effect=return_git_result)
     def test_inspect(self, *mocks):
         self.git.run = mocks[0]
         self.git.inspect("django")
@@ -70,21 +74,21 @@ class TestGitInspect(TestCase):
         )
         self.assertEqual(self.git.status("django"), expected_result)
 
-    @mock.patch("cabrita.abc.utils.run_command", side_effect=return_git_result)
+    @mock.patch("cabrita.abc.runner.runner.run", side_effect=return_git_result)
     def test__get_modifications_in_target_branch(self, *mocks):
         self.git.run = mocks[0]
         self.git.path = "/"
         result = self.git._get_modifications_in_target_branch("django")
         self.assertEqual(result, (4, 4))
 
-    @mock.patch("cabrita.abc.utils.run_command", side_effect=return_git_result)
+    @mock.patch("cabrita.abc.runner.runner.run", side_effect=return_git_result)
     def test__get_modifications_in_branch(self, *mocks):
         self.git.run = mocks[0]
         self.git.path = "/"
         result = self.git._get_modifications_in_branch()
         self.assertEqual(result, (1, 2))
 
-    @mock.patch("cabrita.abc.utils.run_command", side_effect=return_git_result)
+    @mock.patch("cabrita.abc.runner.runner.run", side_effect=return_git_result)
     def test__get_active_branch(self, *mocks):
         self.git.run = mocks[0]
         result = self.git._get_active_branch("/")
@@ -95,7 +99,7 @@ class TestGitInspect(TestCase):
         result = self.git._get_abbreviate_name(long_branch_name)
         self.assertEqual(result, "very_long_br...")
 
-    @mock.patch("cabrita.abc.utils.run_command", side_effect=return_git_result)
+    @mock.patch("cabrita.abc.runner.runner.run", side_effect=return_git_result)
     def test__get_commits(self, *mocks):
         from cabrita.components.git import GitDirection
 
@@ -105,7 +109,7 @@ class TestGitInspect(TestCase):
         self.assertEqual(result_ahead, 1)
         self.assertEqual(result_behind, 2)
 
-    @mock.patch("cabrita.abc.utils.run_command", side_effect=return_git_result)
+    @mock.patch("cabrita.abc.runner.runner.run", side_effect=return_git_result)
     def test__get_commits_from_target(self, *mocks):
         from cabrita.components.git import GitDirection
 
@@ -0,0 +1,118 @@
+import threading
+from io import StringIO
+from unittest import TestCase, mock
+
+from blessed import Terminal
+from dashing import dashing
+
+from cabrita.components.logs import LogTail
+from cabrita.components.renderer import Renderer
+
+CONTAINER = {"Id": "abc123", "Name": "/sheep_django_1", "Config": {"Tty": False}}
+
+
+class FakeStream:
+    def __init__(self, lines):
+        self.lines = lines
+        self.release = threading.Event()
+        self.exhausted = threading.Event()
+        self.closed = False
+
+    def __iter__(self):
+        yield from self.lines
+        self.exhausted.set()
+        # Wait like a followed stream until closed.
+        self.release.wait(5)
+
+    def close(self):
+        self.closed = True
+        self.release.set()
+
+
+class TestLogTail(TestCase):
+    def setUp(self):
+        self.stream = FakeStream(["line {}".format(i) for i in range(1000)])
+        self.client = mock.Mock()
+        self.client.logs.return_value = self.stream
+        self.notified = threading.Event()
+        self.notify_calls = []
+
+    def _on_update(self):
+        self.notify_calls.append(1)
+        self.notified.set()
+
+    def _tail(self, container=CONTAINER):
+        return LogTail(
+            "django",
+            container,
+            lines=10,
+            on_update=self._on_update,
+            client=self.client,
+        )
+
+    def _wait_for_lines(self, tail):
+        self.assertTrue(tail._stream.exhausted.wait(5))
+        self.assertTrue(self.notified.wait(5))
+
+    def test_ring_buffer(self):
+        tail = self._tail()
+        tail.widget()
+        tail.start()
+        self._wait_for_lines(tail)
+        self.client.logs.assert_called_once_with("abc123", 10, False)
+        self.assertEqual(len(tail.lines), 10)
+        self.assertEqual(tail.lines[-1], "line 999")
+        tail.close()
+        self.assertTrue(self.stream.closed)
+        self.assertFalse(tail._thread.is_alive())
+
+    def test_notify_once_until_read(self):
+        tail = self._tail()
+        tail.widget()
+        tail.start()
+        self._wait_for_lines(tail)
+        self.assertEqual(len(self.notify_calls), 1)
+        self.assertTrue(tail.changed)
+        widget = tail.widget()
+        self.assertFalse(tail.changed)
+        self.assertEqual(widget.lines[0], "line 990")
+        self.assertIn("sheep_django_1", widget.title)
+        tail.close()
+
+    def test_container_not_found(self):
+        tail = self._tail(container=None)
+        tail.start()
+        self.assertListEqual(list(tail.lines), ["Container not found."])
+        self.client.logs.assert_not_called()
+        tail.close()
+
+    @mock.patch("cabrita.components.logs.ProcessLogStream")
+    def test_command_line_fallback(self, process_mock):
+        process_mock.return_value = FakeStream(["from cli"])
+        self.client.logs.return_value = None
+        self.client.available = False
+        tail = self._tail()
+        tail.widget()
+        tail.start()
+        self._wait_for_lines(tail)
+        process_mock.assert_called_once_with("abc123", 10)
+        self.assertListEqual(list(tail.lines), ["from cli"])
+        tail.close()
+
+    def test_widget_shows_last_lines(self):
+        tail = self._tail()
+        tail._append("\x1b[31mfirst\x1b[0m")
+        for i in range(9):
+            tail._append("line {} {}".format(i, "x" * 60))
+        term = Terminal(kind="xterm-256color", force_styling=True)
+        output = StringIO()
+        layout = dashing.HSplit(tail.widget(), terminal=term, main=True)
+        with mock.patch.object(Terminal, "width", 40), mock.patch.object(
+            Terminal, "height", 6
+        ):
+            Renderer(term, stream=output).render(layout)
+        screen = output.getvalue()
+        self.assertNotIn("first", screen)
+        self.assertNotIn("line 4", screen)
+        self.assertIn("line 8", screen)
+        self.assertNotIn("x" * 40, screen)
@@ -0,0 +1,50 @@
+from unittest import TestCase
+from unittest.mock import Mock
+
+from cabrita.components.perf import PerfStats, hud_lines, percentile
+
+
+class TestPerfStats(TestCase):
+    def setUp(self):
+        self.now = 0.0
+        self.perf = PerfStats(clock=lambda: self.now)
+
+    def test_percentile(self):
+        values = [float(value) for value in range(1, 101)]
+        self.assertIsNone(percentile([], 50))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 95), 95)
+        self.assertEqual(percentile([3.0], 95), 3)
+
+    def test_add(self):
+        self.assertIsNone(self.perf.last_duration)
+        self.perf.add(collect_time=0.5, render_time=0.25, calls=3)
+        self.assertEqual(self.perf.last_duration, 0.75)
+        self.assertEqual(self.perf.last_render_time, 0.25)
+        self.assertEqual(self.perf.latency(50), 0.75)
+
+    def test_calls_per_minute(self):
+        self.perf.add(collect_time=0.1, render_time=0.1, calls=3)
+        self.now = 30.0
+        self.perf.add(collect_time=0.1, render_time=0.1, calls=2)
+        self.assertEqual(self.perf.calls_per_minute, 5)
+        self.now = 61.0
+        self.assertEqual(self.perf.calls_per_minute, 2)
+
+    def test_seconds_since_success(self):
+        self.assertIsNone(self.perf.seconds_since_success)
+        self.perf.mark_success()
+        self.now = 5.0
+        self.assertEqual(self.perf.seconds_since_success, 5)
+
+    def test_hud_lines(self):
+        box = Mock(title="Django Apps", perf=self.perf)
+        self.perf.add(collect_time=1.5, render_time=0.02, calls=4)
+        self.perf.mark_success()
+        lines = hud_lines([box], frame_time=0.003)
+        self.assertEqual(lines[0], "Performance (p to close) - frame 3ms")
+        self.assertIn("Cmd/min", lines[1])
+        self.assertListEqual(
+            lines[3].split(),
+            ["Django", "Apps", "1.5s", "20ms", "1.5s", "1.5s", "4", "0ms", "ago"],
+        )
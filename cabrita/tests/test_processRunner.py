@@ -0,0 +1,89 @@
+import sys
+import threading
+import time
+from unittest import TestCase
+
+from cabrita.abc.runner import ProcessRunner
+
+
+class TestProcessRunner(TestCase):
+    def setUp(self):
+        self.runner = ProcessRunner(max_concurrency=2, timeout=5)
+
+    def test_get_kind(self):
+        self.assertEqual(
+            self.runner.get_kind(["git", "status", "--porcelain"]), "git status"
+        )
+        self.assertEqual(self.runner.get_kind(["curl", "-f", "localhost"]), "curl")
+
+    def test_run(self):
+        self.assertTrue(self.runner.run([sys.executable, "-c", "pass"]))
+        self.assertFalse(self.runner.run([sys.executable, "-c", "exit(1)"]))
+
+    def test_run_get_stdout(self):
+        ret = self.runner.run(
+            [sys.executable, "-c", "print('a b; echo c')"], get_stdout=True
+        )
+        self.assertEqual(ret, "a b; echo c\n")
+
+    def test_run_with_cwd(self):
+        ret = self.runner.run(
+            [sys.executable, "-c", "import os; print(os.getcwd())"],
+            cwd="/",
+            get_stdout=True,
+        )
+        self.assertEqual(ret.strip(), "/")
+        self.assertFalse(self.runner.run(["ls"], cwd="/path/not/found"))
+
+    def test_run_missing_command(self):
+        self.assertFalse(self.runner.run(["command-not-found-for-cabrita"]))
+
+    def test_run_timeout(self):
+        start = time.monotonic()
+        ret = self.runner.run(
+            [sys.executable, "-c", "import time; time.sleep(5)"], timeout=0.2
+        )
+        self.assertFalse(ret)
+        self.assertLess(time.monotonic() - start, 4)
+        self.assertEqual(self.runner.stats[sys.executable]["timeouts"], 1)
+
+    def test_stats(self):
+        self.runner.run([sys.executable, "-c", "pass"])
+        self.runner.run([sys.executable, "-c", "exit(1)"])
+        stats = self.runner.stats[sys.executable]
+        self.assertEqual(stats["calls"], 2)
+        self.assertEqual(stats["failures"], 1)
+        self.assertGreater(stats["mean_time"], 0)
+        self.runner.reset_stats()
+        self.assertDictEqual(self.runner.stats, {})
+
+    def test_concurrency_limit(self):
+        script = "import time; time.sleep(0.3)"
+        threads = [
+            threading.Thread(
+                target=self.runner.run, args=([sys.executable, "-c", script],)
+            )
+            for _ in range(4)
+        ]
+        start = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # Only two commands can run at same time.
+        self.assertGreaterEqual(time.monotonic() - start, 0.6)
+
+    def test_thread_calls(self):
+        self.runner.run([sys.executable, "-c", "pass"])
+        self.assertEqual(self.runner.thread_calls(), 1)
+        other_thread_calls = []
+
+        def _run():
+            self.runner.run([sys.executable, "-c", "pass"])
+            other_thread_calls.append(self.runner.thread_calls())
+
+        thread = threading.Thread(target=_run)
+        thread.start()
+        thread.join()
+        self.assertListEqual(other_thread_calls, [1])
+        self.assertEqual(self.runner.thread_calls(), 1)
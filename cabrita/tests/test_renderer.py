@@ -0,0 +1,89 @@
+from io import StringIO
+from unittest import TestCase, mock
+
+from blessed import Terminal
+from dashing import dashing
+
+from cabrita.components.renderer import (
+    DEFAULT_STYLE,
+    Renderer,
+    apply_sgr,
+    sgr_for_style,
+)
+
+
+class TestRenderer(TestCase):
+    def setUp(self):
+        self.term = Terminal(kind="xterm-256color", force_styling=True)
+        self.stream = StringIO()
+        self.renderer = Renderer(self.term, stream=self.stream)
+
+    def _layout(self, text):
+        return dashing.HSplit(
+            dashing.Text(text, color=6, border_color=5, title="Box"),
+            dashing.Text("Static", color=6, border_color=5, title="Watch"),
+            terminal=self.term,
+            main=True,
+        )
+
+    def _render(self, text):
+        with mock.patch.object(Terminal, "width", 40), mock.patch.object(
+            Terminal, "height", 10
+        ):
+            return self.renderer.render(self._layout(text))
+
+    def test_render_full_frame(self):
+        size = self._render("django  Running")
+        output = self.stream.getvalue()
+        self.assertEqual(size, len(output))
+        self.assertTrue(output.startswith(self.term.clear))
+        self.assertIn("django  Running", output)
+        self.assertIn("Static", output)
+
+    def test_render_unchanged_frame(self):
+        self._render("django  Running")
+        self.assertEqual(self._render("django  Running"), 0)
+
+    def test_render_only_changed_cells(self):
+        first_size = self._render("django  Running")
+        size = self._render("django  Exited")
+        frame = self.stream.getvalue()[-size:]
+        self.assertLess(size, first_size / 5)
+        self.assertIn("Exited", frame)
+        self.assertNotIn("Static", frame)
+        self.assertNotIn(self.term.clear, frame)
+
+    def test_reset(self):
+        self._render("django  Running")
+        self.renderer.reset()
+        size = self._render("django  Running")
+        self.assertTrue(self.stream.getvalue()[-size:].startswith(self.term.clear))
+
+    def test__draw_wide_characters(self):
+        screen = self.renderer._draw(self.term.move(0, 0) + "界a", 4, 1)
+        self.assertListEqual([char for char, style in screen[0]], ["界", "", "a", " "])
+
+    def test_apply_sgr(self):
+        style = apply_sgr(DEFAULT_STYLE, "38;5;6")
+        style = apply_sgr(style, "48;5;16")
+        style = apply_sgr(style, "1")
+        self.assertEqual(style, ("38;5;6", "48;5;16", frozenset({"1"})))
+        self.assertEqual(apply_sgr(style, "22"), ("38;5;6", "48;5;16", frozenset()))
+        self.assertEqual(apply_sgr(style, ""), DEFAULT_STYLE)
+
+    def test_sgr_for_style(self):
+        self.assertEqual(sgr_for_style(("32", None, frozenset({"2"}))), "\x1b[0;2;32m")
+
+    def test_render_overlay(self):
+        self._render("django  Running")
+        with mock.patch.object(Terminal, "width", 40), mock.patch.object(
+            Terminal, "height", 10
+        ):
+            size = self.renderer.render(
+                self._layout("django  Running"), overlay=["HUD line"]
+            )
+        frame = self.stream.getvalue()[-size:]
+        self.assertIn("HUD line", frame)
+        self.assertIsNotNone(self.renderer.last_render_time)
+        screen = self.renderer._front
+        self.assertEqual("".join(char for char, _ in screen[1][29:39]), " HUD line ")
@@ -28,3 +28,30 @@ class TestRun(TestCase):
         runner = CliRunner()
         with self.assertRaises(ValueError):
             runner.invoke(run, catch_exceptions=False)
+
+    @mock.patch("cabrita.command.CabritaCommand.execute_once", return_value=1)
+    @mock.patch("cabrita.command.CabritaCommand.execute")
+    @mock.patch("cabrita.run.check_version", return_value="test")
+    def test_run_once(self, *mocks):
+        from cabrita.run import run
+
+        os.environ["CABRITA_PATH"] = LATEST_CONFIG_PATH
+        runner = CliRunner()
+        result = runner.invoke(run, ["--once", "--json"])
+        self.assertEqual(result.exit_code, 1)
+        mocks[0].assert_not_called()
+        mocks[1].assert_not_called()
+        mocks[2].assert_called_once_with(as_json=True)
+
+    @mock.patch("cabrita.command.CabritaCommand.execute_once", return_value=0)
+    @mock.patch("cabrita.command.CabritaCommand.execute")
+    @mock.patch("cabrita.run.check_version", return_value="test")
+    def test_run_json_implies_once(self, *mocks):
+        from cabrita.run import run
+
+        os.environ["CABRITA_PATH"] = LATEST_CONFIG_PATH
+        runner = CliRunner()
+        result = runner.invoke(run, ["--json"])
+        self.assertEqual(result.exit_code, 0)
+        mocks[1].assert_not_called()
+        mocks[2].assert_called_once_with(as_json=True)
@@ -0,0 +1,103 @@
+import random
+from unittest import TestCase
+
+from cabrita.abc.scheduler import Scheduler
+
+
+class TestScheduler(TestCase):
+    def setUp(self):
+        self.now = 0.0
+        self.scheduler = Scheduler(clock=lambda: self.now, jitter=0)
+
+    def test_register(self):
+        self.scheduler.register("django", 5)
+        self.assertTrue(self.scheduler.is_registered("django"))
+        self.assertTrue(self.scheduler.is_due("django"))
+        self.assertFalse(self.scheduler.is_due("flask"))
+
+    def test_register_with_delay(self):
+        self.scheduler.register("django", 5, delay=5)
+        self.assertFalse(self.scheduler.is_due("django"))
+        self.now = 5.0
+        self.assertTrue(self.scheduler.is_due("django"))
+
+    def test_register_updates_interval(self):
+        self.scheduler.register("django", 5)
+        self.scheduler.register("django", 10)
+        self.scheduler.done("django")
+        self.assertEqual(self.scheduler.seconds_to_next(), 10)
+
+    def test_done(self):
+        self.scheduler.register("django", 5)
+        self.scheduler.start("django")
+        self.now = 2.0
+        self.scheduler.done("django")
+        self.assertFalse(self.scheduler.is_due("django"))
+        self.now = 7.0
+        self.assertTrue(self.scheduler.is_due("django"))
+
+    def test_start(self):
+        self.assertFalse(self.scheduler.start("django"))
+        self.scheduler.register("django", 5)
+        self.assertTrue(self.scheduler.start("django"))
+        self.assertFalse(self.scheduler.start("django"))
+        self.scheduler.done("django")
+        self.assertTrue(self.scheduler.start("django"))
+
+    def test_unregister(self):
+        self.scheduler.register("django", 5)
+        self.scheduler.unregister("django")
+        self.assertFalse(self.scheduler.is_registered("django"))
+        self.assertIsNone(self.scheduler.seconds_to_next())
+
+    def test_seconds_to_next(self):
+        self.assertIsNone(self.scheduler.seconds_to_next())
+        self.scheduler.register("django", 5, delay=5)
+        self.scheduler.register("flask", 3, delay=3)
+        self.scheduler.register("worker", 1, delay=1, group="other")
+        self.assertEqual(self.scheduler.seconds_to_next(), 3)
+        self.assertEqual(self.scheduler.seconds_to_next("other"), 1)
+        self.now = 4.0
+        self.assertEqual(self.scheduler.seconds_to_next(), 0)
+
+    def test_seconds_to_next_ignores_running_tasks(self):
+        self.scheduler.register("django", 5, delay=5)
+        self.scheduler.register("flask", 3, delay=3)
+        self.scheduler.start("flask")
+        self.assertEqual(self.scheduler.seconds_to_next(), 5)
+        self.scheduler.done("flask")
+        self.assertEqual(self.scheduler.seconds_to_next(), 3)
+
+    def test_trigger(self):
+        self.scheduler.register("django", 5, delay=5)
+        self.assertTrue(self.scheduler.trigger("django"))
+        self.assertTrue(self.scheduler.is_due("django"))
+        self.assertEqual(self.scheduler.seconds_to_next(), 0)
+        self.assertFalse(self.scheduler.trigger("flask"))
+
+    def test_trigger_running_task(self):
+        self.scheduler.register("django", 5)
+        self.scheduler.start("django")
+        self.scheduler.trigger("django")
+        self.scheduler.done("django")
+        self.assertTrue(self.scheduler.is_due("django"))
+        self.scheduler.start("django")
+        self.scheduler.done("django")
+        self.assertFalse(self.scheduler.is_due("django"))
+
+    def test_heap_is_compacted(self):
+        self.scheduler.register("django", 1)
+        for _ in range(100):
+            self.scheduler.done("django")
+        self.assertLessEqual(len(self.scheduler._heaps["default"]), 18)
+        self.assertEqual(self.scheduler.seconds_to_next(), 1)
+
+    def test_jitter(self):
+        scheduler = Scheduler(clock=lambda: self.now, jitter=0.1, rng=random.Random(1))
+        dues = []
+        for index in range(10):
+            scheduler.register(index, 10)
+            scheduler.done(index)
+            dues.append(scheduler._tasks[index].due)
+        self.assertTrue(all(9 <= due <= 11 for due in dues))
+        self.assertGreater(len(set(dues)), 1)
@@ -0,0 +1,87 @@
+import os
+import tempfile
+from unittest import TestCase, mock
+
+from cabrita.components import PortDetail
+from cabrita.components.config import Compose, format_ports
+
+COMPOSE_DATA = """
+version: "3"
+services:
+  django:
+    build:
+      context: ./django
+    ports:
+      - "8081:8080"
+  worker:
+    build: ./django
+    expose:
+      - "8080"
+  redis:
+    image: redis
+    container_name: sheep_redis
+    ports:
+      - "6379:6379"
+  postgres:
+    image: postgres
+"""
+
+
+class TestServiceFacts(TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        path = os.path.join(self.folder.name, "docker-compose.yml")
+        with open(path, "w") as file:
+            file.write(COMPOSE_DATA)
+        self.compose = Compose()
+        self.compose.console = mock.Mock()
+        self.compose.add_path(path, self.folder.name)
+        self.compose.load_file_data()
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def test_format_ports(self):
+        self.assertDictEqual(
+            format_ports(["8081:8080", "8082:8080"]),
+            {
+                PortDetail.external: "↘ 8081/8082",
+                PortDetail.internal: "↗ 8080",
+                PortDetail.both: "↘ 8081/8082 ↗ 8080",
+            },
+        )
+        self.assertEqual(format_ports(["6379:6379"])[PortDetail.internal], "⇄ 6379")
+        self.assertEqual(format_ports(None)[PortDetail.both], "")
+
+    def test_facts(self):
+        django = self.compose.get_facts("Django")
+        self.assertFalse(django.is_image)
+        self.assertEqual(django.build_path, os.path.join(self.folder.name, "django"))
+        self.assertEqual(django.ports[PortDetail.external], "↘ 8081")
+        self.assertIsNone(django.container_name)
+
+        worker = self.compose.get_facts("worker")
+        self.assertEqual(worker.build_path, os.path.join(self.folder.name, "django"))
+        self.assertEqual(worker.ports[PortDetail.internal], "↗ 8080")
+
+        redis = self.compose.get_facts("redis")
+        self.assertTrue(redis.is_image)
+        self.assertIsNone(redis.build_path)
+        self.assertEqual(redis.container_name, "sheep_redis")
+
+        self.assertEqual(self.compose.get_facts("postgres").ports[PortDetail.both], "")
+        self.assertIsNone(self.compose.get_facts("flower"))
+
+    def test_facts_are_built_once(self):
+        facts = self.compose.facts
+        self.compose.get_facts("django")
+        self.assertIs(self.compose.facts, facts)
+
+    def test_compose_lookups(self):
+        self.assertTrue(self.compose.is_image("redis"))
+        self.assertFalse(self.compose.is_image("worker"))
+        self.assertTrue(self.compose.is_image("flower"))
+        self.assertEqual(
+            self.compose.get_build_path("django"),
+            os.path.join(self.folder.name, "django"),
+        )
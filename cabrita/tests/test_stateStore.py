@@ -0,0 +1,42 @@
+import threading
+from unittest import TestCase
+
+from cabrita.abc.base import StateStore
+
+
+class TestStateStore(TestCase):
+    def setUp(self):
+        self.store = StateStore()
+
+    def test_get(self):
+        self.assertIsNone(self.store.get("django"))
+        self.assertEqual(self.store.get("django", "Fetching..."), "Fetching...")
+
+    def test_set_and_get_item(self):
+        self.store["django"] = {"status": "Running"}
+        self.assertIn("django", self.store)
+        self.assertEqual(self.store["django"], {"status": "Running"})
+        self.assertEqual(len(self.store), 1)
+
+    def test_pop(self):
+        self.store["django"] = "Running"
+        self.assertEqual(self.store.pop("django"), "Running")
+        self.assertNotIn("django", self.store)
+
+    def test_items(self):
+        self.store["django"] = "Running"
+        items = self.store.items()
+        self.store["flask"] = "Exited"
+        self.assertListEqual(items, [("django", "Running")])
+
+    def test_concurrent_writes(self):
+        def _write(index):
+            for value in range(100):
+                self.store[(index, value)] = value
+
+        threads = [threading.Thread(target=_write, args=(i,)) for i in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(self.store), 1000)
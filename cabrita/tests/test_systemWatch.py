@@ -24,19 +24,37 @@ class TestSystemWatch(TestCase):
         command.prepare_dashboard()
         cls.watch = command.dashboard.system_watch
 
-    @mock.patch("cabrita.components.watchers.run_command", return_value=DOCKER_DF_DATA)
+    @mock.patch("cabrita.components.watchers.engine.system_df", return_value=None)
+    @mock.patch("cabrita.components.watchers.runner.run", return_value=DOCKER_DF_DATA)
     def test__get_docker_folder_size(self, *mocks):
         size = self.watch._get_docker_folder_size()
         self.assertEqual(size, 44902809337.856)
 
-    @mock.patch("cabrita.components.watchers.run_command", return_value=DOCKER_DF_DATA)
+    @mock.patch("cabrita.components.watchers.runner.run")
+    @mock.patch(
+        "cabrita.components.watchers.engine.system_df",
+        return_value={
+            "LayersSize": 1000,
+            "Containers": [{"SizeRw": 10}, {}],
+            "Volumes": [{"UsageData": {"Size": 100}}, {"UsageData": {"Size": -1}}],
+            "BuildCache": [{"Size": 1}],
+        },
+    )
+    def test__get_docker_folder_size_from_engine(self, _, mock_run):
+        size = self.watch._get_docker_folder_size()
+        self.assertEqual(size, 1111.0)
+        mock_run.assert_not_called()
+
+    @mock.patch("cabrita.components.watchers.engine.system_df", return_value=None)
+    @mock.patch("cabrita.components.watchers.runner.run", return_value=DOCKER_DF_DATA)
     def test_run(self, *mocks):
         from dashing import dashing
 
         self.watch.run()
         self.assertIsInstance(self.watch.widget, dashing.VSplit)
 
-    @mock.patch("cabrita.components.watchers.run_command", return_value=DOCKER_DF_DATA)
+    @mock.patch("cabrita.components.watchers.engine.system_df", return_value=None)
+    @mock.patch("cabrita.components.watchers.runner.run", return_value=DOCKER_DF_DATA)
     def test__execute(self, *mocks):
         from dashing import dashing
 
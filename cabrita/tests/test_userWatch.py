@@ -16,10 +16,9 @@ class TestUserWatch(TestCase):
         command.prepare_dashboard()
         cls.watch = command.dashboard.user_watches
 
-    @mock.patch("cabrita.components.watchers.run_command", return_value=True)
-    @mock.patch("cabrita.abc.utils.run_command", side_effect=return_git_result)
+    @mock.patch("cabrita.components.watchers.runner.run", return_value=True)
     def test__execute(self, *mocks):
-        self.watch.git.run = mocks[0]
+        self.watch.git.run = mock.Mock(side_effect=return_git_result)
         self.watch._execute()
         expected_result = (
             "--------  ------------------  ---------\n"
@@ -56,7 +55,7 @@ class TestUserWatch(TestCase):
         }
         self.assertDictEqual(self.watch.ping, expected_dict)
 
-    @mock.patch("cabrita.components.watchers.run_command", return_value=False)
+    @mock.patch("cabrita.components.watchers.runner.run", return_value=False)
     def test__get_ping_result(self, *mocks):
         self.watch._get_ping_result(self.watch.ping["ngrok"], "ngrok")
         expected_list = ["\x1b[31mNgrok Access\x1b[22m", "\x1b[31mDOWN\x1b[22m"]